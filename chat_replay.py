@@ -0,0 +1,375 @@
+"""
+Chat-replay load generator.
+
+Replays the real stream traffic in past-chats/ into the hub:
+  - chat-messages.txt  (`user:message`)      → `twitch_message` {username, message}
+  - stuff-i-said.txt   (`HH:MM:SS.fffText`)  → `spoken_word_context` {context}
+
+and listens for `bot_reply` to measure how long Nami takes to answer and
+whether replies keep up as the input rate climbs.
+
+Pacing:
+  speed=1        real time (corpus gaps; lines without usable stamps are
+                 spaced CHAT_GAP_S / MIC_GAP_S apart)
+  speed=10       the same schedule, 10× faster
+  rate=5         constant 5 events/s, ignoring the corpus timing
+  burst={...}    on top of either: every `every_s` seconds, fire `size`
+                 extra chat lines at `rate`/s (a raid)
+
+Runs inside the launcher (`/launcher/loadgen/*`) or standalone:
+
+    python chat_replay.py --hub http://localhost:8002 --speed 10 --duration 120
+
+Needs the optional `python-socketio` client.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import socketio  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    socketio = None
+
+CORPUS_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), "past-chats")
+CHAT_FILE    = "chat-messages.txt"
+MIC_FILE     = "stuff-i-said.txt"
+CHAT_GAP_S   = 2.0
+MIC_GAP_S    = 3.0
+BOT_NAMES    = {"nami", "peepingnami"}
+BUCKET_S     = 10.0
+PENDING_TTL  = 120.0     # unanswered messages older than this are counted as missed
+DRAIN_S      = 10.0      # how long to wait for late replies after the last send
+
+CHAT_EVENT   = "twitch_message"
+MIC_EVENT    = "spoken_word_context"
+REPLY_EVENT  = "bot_reply"
+
+_MIC_RE = re.compile(r"^(\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,3}))?(.*)$")
+
+
+# ── Corpus ────────────────────────────────────────────────────────────────────
+
+def load_corpus(corpus_dir: str = CORPUS_DIR) -> List[Tuple[float, str, Dict[str, Any]]]:
+    """Merged (offset seconds, event, payload) list in real-time order."""
+    chat: List[Tuple[float, str, Dict[str, Any]]] = []
+    try:
+        with open(os.path.join(corpus_dir, CHAT_FILE), encoding="utf-8") as f:
+            for line in f:
+                user, sep, message = line.rstrip("\n").partition(":")
+                if not sep or not message.strip() or user.lower() in BOT_NAMES:
+                    continue
+                chat.append((len(chat) * CHAT_GAP_S, CHAT_EVENT,
+                             {"username": user.strip(), "message": message.strip()}))
+    except FileNotFoundError:
+        pass
+
+    mic: List[Tuple[float, str, Dict[str, Any]]] = []
+    try:
+        with open(os.path.join(corpus_dir, MIC_FILE), encoding="utf-8") as f:
+            last = None
+            t = 0.0
+            for line in f:
+                m = _MIC_RE.match(line.rstrip("\n"))
+                text = (m.group(5) if m else line).strip()
+                if not text:
+                    continue
+                stamp = None
+                if m:
+                    stamp = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + int(m.group(3)) \
+                        + int((m.group(4) or "0").ljust(3, "0")) / 1000
+                # Stamps are only trusted when they move forward; the corpus
+                # often repeats one stamp for a whole batch.
+                if stamp is not None and last is not None and stamp > last:
+                    t += stamp - last
+                elif mic:
+                    t += MIC_GAP_S
+                last = stamp if stamp is not None else last
+                mic.append((t, MIC_EVENT, {"context": text}))
+    except FileNotFoundError:
+        pass
+
+    return sorted(chat + mic, key=lambda e: e[0])
+
+
+def schedule(
+    corpus: List[Tuple[float, str, Dict[str, Any]]],
+    speed: float = 1.0,
+    rate: Optional[float] = None,
+    burst: Optional[Dict[str, float]] = None,
+    loop: bool = True,
+) -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+    """Yield (send-at offset seconds, event, payload), forever if `loop`."""
+    if not corpus:
+        return
+    chats = [e for e in corpus if e[1] == CHAT_EVENT] or corpus
+    span = corpus[-1][0] + (1.0 / rate if rate else CHAT_GAP_S)
+
+    def base() -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+        for cycle in (itertools.count() if loop else range(1)):
+            for i, (t, ev, payload) in enumerate(corpus):
+                if rate:
+                    yield ((cycle * len(corpus) + i) / rate, ev, payload)
+                else:
+                    yield ((cycle * span + t) / speed, ev, payload)
+
+    def bursts() -> Iterator[Tuple[float, str, Dict[str, Any]]]:
+        every, size, brate = burst["every_s"], int(burst["size"]), burst["rate"]
+        src = itertools.cycle(chats)
+        for n in itertools.count(1):
+            for k in range(size):
+                _, ev, payload = next(src)
+                yield (n * every + k / brate, ev, payload)
+
+    streams = [base()]
+    if burst:
+        streams.append(bursts())
+    # Merge the (already sorted) streams lazily.
+    heads = [next(s, None) for s in streams]
+    while any(h is not None for h in heads):
+        i = min((i for i, h in enumerate(heads) if h is not None), key=lambda i: heads[i][0])
+        yield heads[i]
+        heads[i] = next(streams[i], None)
+
+
+# ── Replay run ────────────────────────────────────────────────────────────────
+
+def _pct(vals: List[float], p: float) -> Optional[float]:
+    if not vals:
+        return None
+    vals = sorted(vals)
+    return round(vals[min(int(len(vals) * p), len(vals) - 1)] * 1000, 1)
+
+
+def _check_positive(name: str, value: Any) -> None:
+    # Zero or NaN here would divide by zero or spin the scheduler without sleeping.
+    if not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+        raise ValueError(f"{name} must be a positive number, got {value!r}")
+
+
+class ReplayRun:
+    """One load-generation run against a hub."""
+
+    def __init__(
+        self,
+        hub_url: str,
+        speed: float = 1.0,
+        rate: Optional[float] = None,
+        burst: Optional[Dict[str, float]] = None,
+        duration_s: Optional[float] = None,
+        corpus_dir: str = CORPUS_DIR,
+    ) -> None:
+        _check_positive("speed", speed)
+        if rate is not None:
+            _check_positive("rate", rate)
+        if duration_s is not None:
+            _check_positive("duration_s", duration_s)
+        if burst:
+            if not all(k in burst for k in ("every_s", "size", "rate")):
+                raise ValueError("burst needs every_s, size and rate")
+            for k in ("every_s", "size", "rate"):
+                _check_positive(f"burst.{k}", burst[k])
+            if int(burst["size"]) < 1:
+                raise ValueError("burst.size must be at least 1")
+        if socketio is None:
+            raise RuntimeError("python-socketio is not installed")
+        self.hub_url    = hub_url
+        self.speed      = speed
+        self.rate       = rate
+        self.burst      = burst
+        self.duration_s = duration_s
+        self.corpus     = load_corpus(corpus_dir)
+        if not self.corpus:
+            raise ValueError(f"no replayable lines in {corpus_dir}")
+
+        self.started_at: Optional[float] = None
+        self.sent_until: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.state      = "idle"
+        self.error: Optional[str] = None
+        self.sent: Dict[str, int] = {}
+        self.send_errors = 0
+        self.replies    = 0
+        self.missed     = 0
+        self.max_lag_ms = 0.0
+        self.latencies: List[float] = []
+        # message text → send time, for matching replies back to their cause
+        self._pending: Deque[Tuple[float, str]] = deque()
+        self._buckets: Dict[int, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._sio = None
+
+    def _bucket(self, now: float) -> Dict[str, Any]:
+        key = int((now - self.started_at) // BUCKET_S)
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = {"t": key * BUCKET_S, "sent": 0, "replies": 0, "latencies": []}
+        return b
+
+    def _on_reply(self, data: Any) -> None:
+        now = time.monotonic()
+        self.replies += 1
+        prompt = json.dumps(data, ensure_ascii=False).lower() if data is not None else ""
+        # Attribute the reply to the oldest pending message it quotes; fall
+        # back to the oldest pending message at all.
+        match = next((p for p in self._pending if p[1] and p[1] in prompt), None)
+        if match is None and self._pending:
+            match = self._pending[0]
+        if match is not None:
+            self._pending.remove(match)
+            latency = now - match[0]
+            self.latencies.append(latency)
+            b = self._bucket(now)
+            b["replies"] += 1
+            b["latencies"].append(latency)
+
+    async def _run(self) -> None:
+        sio = socketio.AsyncClient(reconnection=True)
+        self._sio = sio
+
+        @sio.on(REPLY_EVENT)
+        async def _reply(data=None):
+            self._on_reply(data)
+
+        try:
+            await sio.connect(self.hub_url, wait_timeout=10)
+        except Exception as e:
+            self.state, self.error = "failed", f"connect: {e}"
+            self.finished_at = time.time()
+            return
+
+        self.state = "running"
+        t0 = time.monotonic()
+        self.started_at = t0
+        try:
+            for offset, event, payload in schedule(self.corpus, self.speed, self.rate, self.burst):
+                if self.duration_s is not None and offset >= self.duration_s:
+                    break
+                delay = t0 + offset - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag_ms = max(self.max_lag_ms, -delay * 1000)
+                try:
+                    await sio.emit(event, payload)
+                except Exception:
+                    self.send_errors += 1
+                    continue
+                now = time.monotonic()
+                self.sent[event] = self.sent.get(event, 0) + 1
+                self._bucket(now)["sent"] += 1
+                if event == CHAT_EVENT:
+                    self._pending.append((now, payload["message"].lower()))
+                while self._pending and now - self._pending[0][0] > PENDING_TTL:
+                    self._pending.popleft()
+                    self.missed += 1
+            self.sent_until = time.monotonic()
+            # Give in-flight replies a moment to land.
+            drain_until = self.sent_until + DRAIN_S
+            while self._pending and time.monotonic() < drain_until:
+                await asyncio.sleep(0.25)
+            self.state = "finished"
+        except asyncio.CancelledError:
+            self.state = "stopped"
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+        finally:
+            self.finished_at = time.time()
+            try:
+                await sio.disconnect()
+            except Exception:
+                pass
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def wait(self) -> None:
+        if self._task:
+            await self._task
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = ((self.sent_until or time.monotonic()) - self.started_at) if self.started_at else 0.0
+        total_sent = sum(self.sent.values())
+        timeline = []
+        for key in sorted(self._buckets):
+            b = self._buckets[key]
+            timeline.append({
+                "t":           b["t"],
+                "sent_per_s":  round(b["sent"] / BUCKET_S, 2),
+                "replies":     b["replies"],
+                "p95_ms":      _pct(b["latencies"], 0.95),
+            })
+        return {
+            "state":        self.state,
+            "error":        self.error,
+            "hub":          self.hub_url,
+            "speed":        self.speed,
+            "rate":         self.rate,
+            "burst":        self.burst,
+            "elapsed_s":    round(elapsed, 1),
+            "sent":         dict(self.sent),
+            "send_errors":  self.send_errors,
+            "throughput_per_s": round(total_sent / elapsed, 2) if elapsed else 0.0,
+            "max_schedule_lag_ms": round(self.max_lag_ms, 1),
+            "replies":      self.replies,
+            "unanswered":   len(self._pending),
+            "missed":       self.missed,
+            "reply_latency": {
+                "p50_ms": _pct(self.latencies, 0.50),
+                "p95_ms": _pct(self.latencies, 0.95),
+                "p99_ms": _pct(self.latencies, 0.99),
+            },
+            "timeline":     timeline,
+        }
+
+
+def _parse_burst(spec: Optional[str]) -> Optional[Dict[str, float]]:
+    """`"every_s=30,size=50,rate=20"` → dict."""
+    if not spec:
+        return None
+    out = {}
+    for part in spec.split(","):
+        k, _, v = part.partition("=")
+        out[k.strip()] = float(v)
+    return out
+
+
+async def _main(args) -> None:
+    run = ReplayRun(args.hub, speed=args.speed, rate=args.rate,
+                    burst=_parse_burst(args.burst), duration_s=args.duration)
+    run.start()
+    try:
+        while run._task and not run._task.done():
+            await asyncio.sleep(5.0)
+            r = run.report()
+            print(f"[Replay] {r['elapsed_s']:>6.0f}s sent={sum(r['sent'].values())} "
+                  f"replies={r['replies']} unanswered={r['unanswered']} p95={r['reply_latency']['p95_ms']}ms")
+    finally:
+        await run.stop()
+    print(json.dumps(run.report(), indent=2))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Replay past-chats into the hub and measure reply latency")
+    ap.add_argument("--hub", default="http://localhost:8002")
+    ap.add_argument("--speed", type=float, default=1.0, help="time multiplier (1, 2, 10, 100…)")
+    ap.add_argument("--rate", type=float, default=None, help="constant events/s instead of corpus timing")
+    ap.add_argument("--burst", default=None, help="every_s=30,size=50,rate=20")
+    ap.add_argument("--duration", type=float, default=60.0, help="seconds of schedule to replay")
+    asyncio.run(_main(ap.parse_args()))
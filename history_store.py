@@ -0,0 +1,390 @@
+"""
+Long-term service history for the Nami Launcher, in SQLite.
+
+The launcher feeds it three kinds of facts:
+  - events:  status transitions (offline → starting → online …), starts,
+             stops and unexpected exits
+  - samples: one row per service per sampler tick — health-probe outcome
+             and latency, CPU % and RSS of the service's process tree
+
+All writes go through a queue to one writer thread, which batches them
+into a single transaction per second (WAL mode, synchronous=NORMAL), so
+the event loop never waits on disk.
+
+The same thread rolls raw samples up into per-minute and per-hour tables
+(counts and sums, so averages compose) and enforces retention on each
+tier. Summaries for weeks of streams then read a few hundred pre-aggregated
+hour rows through the (service, bucket) primary key instead of scanning
+raw samples.
+"""
+
+import os
+import queue
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import psutil  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    psutil = None
+
+FLUSH_S      = 1.0
+BATCH_MAX    = 500
+ROLLUP_S     = 60.0
+
+# Retention per tier (seconds).
+RAW_KEEP     = 2 * 86400
+MINUTE_KEEP  = 30 * 86400
+HOUR_KEEP    = 400 * 86400
+EVENT_KEEP   = 400 * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    ts      REAL    NOT NULL,
+    service TEXT    NOT NULL,
+    kind    TEXT    NOT NULL,      -- status | start | stop | exit
+    detail  TEXT
+);
+CREATE INDEX IF NOT EXISTS events_by_service ON events (service, kind, ts);
+CREATE INDEX IF NOT EXISTS events_by_ts      ON events (ts);
+
+CREATE TABLE IF NOT EXISTS samples (
+    ts         INTEGER NOT NULL,   -- epoch seconds
+    service    TEXT    NOT NULL,
+    up         INTEGER NOT NULL,   -- health probe passed
+    latency_ms REAL,
+    cpu        REAL,               -- % of one core
+    rss_mb     REAL
+);
+CREATE INDEX IF NOT EXISTS samples_by_ts ON samples (ts);
+"""
+
+# minute / hour rollups share one shape; sums rather than averages so
+# coarser tiers (and any query range) can be aggregated exactly.
+_ROLLUP_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    service  TEXT    NOT NULL,
+    bucket   INTEGER NOT NULL,     -- epoch seconds at the start of the bucket
+    n        INTEGER NOT NULL,
+    up_n     INTEGER NOT NULL,
+    lat_n    INTEGER NOT NULL,
+    lat_sum  REAL    NOT NULL,
+    lat_max  REAL,
+    res_n    INTEGER NOT NULL,
+    cpu_sum  REAL    NOT NULL,
+    cpu_max  REAL,
+    rss_sum  REAL    NOT NULL,
+    rss_max  REAL,
+    PRIMARY KEY (service, bucket)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS {name}_by_bucket ON {name} (bucket);
+"""
+
+_META = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=10.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+# ── Resource sampling ─────────────────────────────────────────────────────────
+
+class ResourceSampler:
+    """CPU % and RSS for groups of PIDs, with psutil if installed and a
+    single `ps` call per tick otherwise."""
+
+    def __init__(self) -> None:
+        self._procs: Dict[int, Any] = {}
+
+    def _psutil_one(self, pid: int, seen: set) -> Optional[Tuple[float, float]]:
+        # Process objects are kept between ticks: cpu_percent() measures
+        # since the previous call on the same object.
+        try:
+            root = self._procs.get(pid)
+            if root is None or not root.is_running():
+                root = self._procs[pid] = psutil.Process(pid)
+                root.cpu_percent(None)  # prime; the first reading is always 0
+            cpu, rss = 0.0, 0
+            for p in [root] + root.children(recursive=True):
+                p = self._procs.setdefault(p.pid, p)
+                seen.add(p.pid)
+                try:
+                    cpu += p.cpu_percent(None)
+                    rss += p.memory_info().rss
+                except psutil.Error:
+                    continue
+            return cpu, rss / 1048576
+        except psutil.Error:
+            return None
+
+    def _ps(self, pids: List[int]) -> Dict[int, Tuple[float, float]]:
+        # Note: on Linux `pcpu` is the lifetime average, not the current rate.
+        try:
+            out = subprocess.check_output(
+                ["ps", "-o", "pid=,pcpu=,rss=", "-p", ",".join(str(p) for p in pids)],
+                text=True, stderr=subprocess.DEVNULL,
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return {}
+        result = {}
+        for line in out.splitlines():
+            parts = line.split()
+            if len(parts) == 3:
+                try:
+                    result[int(parts[0])] = (float(parts[1]), int(parts[2]) / 1024)
+                except ValueError:
+                    continue
+        return result
+
+    def sample(self, groups: Dict[str, List[int]]) -> Dict[str, Tuple[float, float]]:
+        """{service: [pids]} → {service: (cpu %, rss MB)} summed per service."""
+        pids = sorted({p for ps in groups.values() for p in ps})
+        if not pids:
+            return {}
+        if psutil is not None:
+            seen: set = set()
+            per_pid = {p: r for p in pids if (r := self._psutil_one(p, seen)) is not None}
+            for gone in set(self._procs) - seen:
+                del self._procs[gone]
+        else:
+            per_pid = self._ps(pids)
+        out = {}
+        for service, ps in groups.items():
+            vals = [per_pid[p] for p in ps if p in per_pid]
+            if vals:
+                out[service] = (sum(v[0] for v in vals), sum(v[1] for v in vals))
+        return out
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+
+class HistoryStore:
+    def __init__(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        conn = _connect(path)
+        with conn:
+            conn.executescript(_SCHEMA)
+            conn.executescript(_ROLLUP_TABLE.format(name="minute"))
+            conn.executescript(_ROLLUP_TABLE.format(name="hour"))
+            conn.execute(_META)
+        conn.close()
+        self._q: "queue.Queue[Optional[Tuple[str, tuple]]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, daemon=True, name="history-writer")
+        self._thread.start()
+
+    # ── Producers (any thread) ───────────────────────────────────────────────
+
+    def event(self, service: str, kind: str, detail: Optional[str] = None,
+              ts: Optional[float] = None) -> None:
+        self._q.put(("events", (ts or time.time(), service, kind, detail)))
+
+    def sample(self, service: str, up: bool, latency_ms: Optional[float],
+               cpu: Optional[float], rss_mb: Optional[float], ts: Optional[float] = None) -> None:
+        self._q.put(("samples", (int(ts or time.time()), service, int(up), latency_ms, cpu, rss_mb)))
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._thread.join(timeout=10)
+
+    # ── Writer thread ────────────────────────────────────────────────────────
+
+    def _writer(self) -> None:
+        conn = _connect(self.path)
+        last_rollup = 0.0
+        done = False
+        while not done:
+            batch: Dict[str, List[tuple]] = {"events": [], "samples": []}
+            deadline = time.monotonic() + FLUSH_S
+            count = 0
+            while count < BATCH_MAX:
+                try:
+                    item = self._q.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    done = True
+                    break
+                batch[item[0]].append(item[1])
+                count += 1
+            try:
+                if count:
+                    with conn:
+                        conn.executemany("INSERT INTO events VALUES (?,?,?,?)", batch["events"])
+                        conn.executemany("INSERT INTO samples VALUES (?,?,?,?,?,?)", batch["samples"])
+                if done or time.monotonic() - last_rollup >= ROLLUP_S:
+                    last_rollup = time.monotonic()
+                    self._rollup(conn)
+            except sqlite3.Error as e:
+                print(f"[History] ❌ write failed: {e}")
+        conn.close()
+
+    def _mark(self, conn: sqlite3.Connection, key: str, default: int) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _rollup(self, conn: sqlite3.Connection) -> None:
+        now = int(time.time())
+        with conn:
+            # Raw → minute: recount every (service, minute) that got a sample
+            # since the last rollup, found by rowid rather than by ts — a
+            # sample can be late or arrive in an out-of-order batch, and its
+            # minute must be recounted whenever that happens.
+            done = self._mark(conn, "samples_rolled", 0)
+            top = conn.execute("SELECT MAX(rowid) FROM samples").fetchone()[0] or done
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS dirty "
+                         "(service TEXT, bucket INTEGER, PRIMARY KEY (service, bucket)) WITHOUT ROWID")
+            conn.execute("DELETE FROM dirty")
+            conn.execute("""
+                INSERT OR IGNORE INTO dirty
+                SELECT DISTINCT service, ts - ts % 60 FROM samples WHERE rowid > ? AND rowid <= ?
+            """, (done, top))
+            conn.execute("""
+                INSERT OR REPLACE INTO minute
+                SELECT s.service, d.bucket, COUNT(*), SUM(s.up),
+                       COUNT(s.latency_ms), TOTAL(s.latency_ms), MAX(s.latency_ms),
+                       COUNT(s.cpu), TOTAL(s.cpu), MAX(s.cpu), TOTAL(s.rss_mb), MAX(s.rss_mb)
+                FROM dirty d JOIN samples s
+                  ON s.service = d.service AND s.ts >= d.bucket AND s.ts < d.bucket + 60
+                GROUP BY d.service, d.bucket
+            """)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('samples_rolled', ?)", (top,))
+
+            # Minute → hour: hours completed since the last rollup, plus any
+            # older hour whose minutes were just recounted.
+            hupto = now - now % 3600
+            hdone = self._mark(conn, "hour_done", hupto - MINUTE_KEEP)
+            conn.execute("""
+                INSERT OR REPLACE INTO hour
+                SELECT service, bucket - bucket % 3600, SUM(n), SUM(up_n),
+                       SUM(lat_n), TOTAL(lat_sum), MAX(lat_max),
+                       SUM(res_n), TOTAL(cpu_sum), MAX(cpu_max), TOTAL(rss_sum), MAX(rss_max)
+                FROM minute
+                WHERE bucket < ? AND (bucket >= ? OR (service, bucket - bucket % 3600) IN
+                                      (SELECT service, bucket - bucket % 3600 FROM dirty))
+                GROUP BY service, bucket - bucket % 3600
+            """, (hupto, hdone))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('hour_done', ?)", (hupto,))
+
+            conn.execute("DELETE FROM samples WHERE ts < ?", (now - RAW_KEEP,))
+            conn.execute("DELETE FROM minute WHERE bucket < ?", (now - MINUTE_KEEP,))
+            conn.execute("DELETE FROM hour WHERE bucket < ?", (now - HOUR_KEEP,))
+            conn.execute("DELETE FROM events WHERE ts < ?", (now - EVENT_KEEP,))
+            # If retention removed the newest rowid, SQLite will hand it out
+            # again; pull the mark back so those rows still count as new.
+            conn.execute("""
+                UPDATE meta SET value = MIN(value, COALESCE((SELECT MAX(rowid) FROM samples), 0))
+                WHERE key = 'samples_rolled'
+            """)
+
+    # ── Queries (call from a worker thread) ──────────────────────────────────
+
+    def _rows(self, conn: sqlite3.Connection, service: Optional[str], t_from: int,
+              group: str) -> Iterable[tuple]:
+        """Aggregates per (service, group key) over [t_from, now): complete
+        hours from `hour`, the tail since the last hour rollup from `minute`."""
+        hour_done = self._mark(conn, "hour_done", 0)
+        where = "AND service = ?" if service else ""
+        args: Tuple = (service,) if service else ()
+        return conn.execute(f"""
+            SELECT service, {group} AS g, SUM(n), SUM(up_n), SUM(lat_n), TOTAL(lat_sum), MAX(lat_max),
+                   SUM(res_n), TOTAL(cpu_sum), MAX(cpu_max), TOTAL(rss_sum), MAX(rss_max)
+            FROM (
+                SELECT * FROM hour   WHERE bucket >= ? AND bucket <  ? {where}
+                UNION ALL
+                SELECT * FROM minute WHERE bucket >= ? {where}
+            )
+            GROUP BY service, g ORDER BY service, g
+        """, (t_from, hour_done, *args, max(t_from, hour_done), *args)).fetchall()
+
+    @staticmethod
+    def _combine(rows: List[tuple]) -> tuple:
+        """Sum a service's aggregate rows into one (max for the *_max columns)."""
+        cols = list(zip(*rows))
+
+        def maxed(col):
+            vals = [v for v in col if v is not None]
+            return max(vals) if vals else None
+
+        return (rows[0][0], None, sum(cols[2]), sum(cols[3]), sum(cols[4]), sum(cols[5]), maxed(cols[6]),
+                sum(cols[7]), sum(cols[8]), maxed(cols[9]), sum(cols[10]), maxed(cols[11]))
+
+    @staticmethod
+    def _fold(row: tuple) -> Dict[str, Any]:
+        _, _, n, up_n, lat_n, lat_sum, lat_max, res_n, cpu_sum, cpu_max, rss_sum, rss_max = row
+        return {
+            "samples":        n,
+            "uptime_pct":     round(100.0 * up_n / n, 2) if n else None,
+            "latency_avg_ms": round(lat_sum / lat_n, 1) if lat_n else None,
+            "latency_max_ms": round(lat_max, 1) if lat_max is not None else None,
+            "cpu_avg":        round(cpu_sum / res_n, 1) if res_n else None,
+            "cpu_max":        round(cpu_max, 1) if cpu_max is not None else None,
+            "rss_avg_mb":     round(rss_sum / res_n, 1) if res_n else None,
+            "rss_max_mb":     round(rss_max, 1) if rss_max is not None else None,
+        }
+
+    def summary(self, service: Optional[str] = None, days: float = 7.0) -> Dict[str, Any]:
+        """Uptime, restarts and per-day trends for the last `days`."""
+        t_from = int(time.time() - days * 86400)
+        conn = _connect(self.path)
+        try:
+            days_rows: Dict[str, List[tuple]] = {}
+            for r in self._rows(conn, service, t_from, "bucket - bucket % 86400"):
+                days_rows.setdefault(r[0], []).append(r)
+            trends = {svc: [{"day": time.strftime("%Y-%m-%d", time.gmtime(r[1])), **self._fold(r)}
+                            for r in rows] for svc, rows in days_rows.items()}
+            totals = {svc: self._fold(self._combine(rows)) for svc, rows in days_rows.items()}
+            where = "AND service = ?" if service else ""
+            counts: Dict[str, Dict[str, int]] = {}
+            for svc, kind, n in conn.execute(f"""
+                SELECT service, kind, COUNT(*) FROM events
+                WHERE kind IN ('start', 'exit') AND ts >= ? {where}
+                GROUP BY service, kind
+            """, (t_from, *((service,) if service else ()))):
+                counts.setdefault(svc, {})[kind] = n
+        finally:
+            conn.close()
+
+        names = sorted(set(totals) | set(counts))
+        return {
+            "days": days,
+            "services": {
+                name: {
+                    **totals.get(name, {}),
+                    "starts":  counts.get(name, {}).get("start", 0),
+                    "crashes": counts.get(name, {}).get("exit", 0),
+                    "trend":   trends.get(name, []),
+                } for name in names
+            },
+        }
+
+    def series(self, service: str, resolution: str = "minute", hours: float = 24.0) -> List[Dict[str, Any]]:
+        table = {"minute": "minute", "hour": "hour"}[resolution]
+        t_from = int(time.time() - hours * 3600)
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(f"""
+                SELECT service, bucket, n, up_n, lat_n, lat_sum, lat_max,
+                       res_n, cpu_sum, cpu_max, rss_sum, rss_max
+                FROM {table} WHERE service = ? AND bucket >= ? ORDER BY bucket
+            """, (service, t_from)).fetchall()
+        finally:
+            conn.close()
+        return [{"t": r[1], **self._fold(r)} for r in rows]
+
+    def events(self, service: str, last: int = 100) -> List[Dict[str, Any]]:
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT ts, kind, detail FROM events WHERE service = ? ORDER BY ts DESC LIMIT ?",
+                (service, last),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [{"ts": ts, "kind": kind, "detail": detail} for ts, kind, detail in rows]
@@ -0,0 +1,220 @@
+"""
+Hub event-rate meter for the Nami Launcher.
+
+Connects to the Socket.IO hub (:8002) as one more passive client and
+counts everything that flows past it — `vision_context`, `audio_context`,
+`twitch_message`, `director_state`, … — without emitting anything.
+
+Per event type it keeps:
+  - rolling counts and payload bytes over the last WINDOW_S seconds
+  - a log-bucketed histogram of inter-arrival gaps
+  - flags: `silent` when an event that normally arrives regularly has been
+    missing for much longer than its usual gap (vision_service stalled),
+    `burst` when its short-term rate is far above its window rate
+    (sensory_data flooding the hub)
+
+Requires the optional `python-socketio` client; the launcher runs fine
+without it and `/launcher/hub_stats` just reports the tap as unavailable.
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    import socketio  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    socketio = None
+
+WINDOW_S        = 60.0    # rolling window for rates
+BURST_WINDOW_S  = 5.0     # short window compared against WINDOW_S for bursts
+BURST_FACTOR    = 4.0     # short-term rate ≥ this × window rate ⇒ burst
+BURST_MIN_COUNT = 20      # …and at least this many events in BURST_WINDOW_S
+SILENT_FACTOR   = 10.0    # gone for ≥ this × typical gap ⇒ silent
+SILENT_MIN_S    = 15.0    # …and for at least this long
+RECONNECT_S     = 5.0
+BUCKET_S        = 1.0     # granularity of the rolling window
+
+# Upper bounds (seconds) of the gap histogram buckets; the last bucket is open.
+GAP_BUCKETS: List[float] = [0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+
+def _gap_label(i: int) -> str:
+    if i == len(GAP_BUCKETS):
+        return f">{GAP_BUCKETS[-1]:g}s"
+    return f"<={GAP_BUCKETS[i]:g}s"
+
+
+def _payload_size(args: Tuple[Any, ...]) -> int:
+    size = 0
+    for a in args:
+        if isinstance(a, (bytes, bytearray)):
+            size += len(a)
+        elif isinstance(a, str):
+            size += len(a.encode("utf-8"))
+        else:
+            try:
+                size += len(json.dumps(a, separators=(",", ":"), default=str))
+            except Exception:
+                size += len(str(a))
+    return size
+
+
+class EventStats:
+    __slots__ = ("count", "bytes", "first_seen", "last_seen", "recent",
+                 "gap_hist", "gap_ewma")
+
+    def __init__(self) -> None:
+        self.count      = 0
+        self.bytes      = 0
+        self.first_seen = 0.0
+        self.last_seen  = 0.0
+        # [bucket start, events, payload bytes] per BUCKET_S inside WINDOW_S —
+        # bounded however fast the event arrives, whether or not anyone polls.
+        self.recent: Deque[List[float]] = deque(maxlen=int(WINDOW_S / BUCKET_S) + 1)
+        self.gap_hist   = [0] * (len(GAP_BUCKETS) + 1)
+        self.gap_ewma: Optional[float] = None
+
+    def record(self, now: float, size: int) -> None:
+        if self.count:
+            gap = now - self.last_seen
+            for i, bound in enumerate(GAP_BUCKETS):
+                if gap <= bound:
+                    self.gap_hist[i] += 1
+                    break
+            else:
+                self.gap_hist[-1] += 1
+            self.gap_ewma = gap if self.gap_ewma is None else 0.9 * self.gap_ewma + 0.1 * gap
+        else:
+            self.first_seen = now
+        self.count     += 1
+        self.bytes     += size
+        self.last_seen  = now
+        start = now - now % BUCKET_S
+        if self.recent and self.recent[-1][0] == start:
+            self.recent[-1][1] += 1
+            self.recent[-1][2] += size
+        else:
+            self.trim(now)
+            self.recent.append([start, 1, size])
+
+    def trim(self, now: float) -> None:
+        cutoff = now - WINDOW_S
+        while self.recent and self.recent[0][0] < cutoff:
+            self.recent.popleft()
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        self.trim(now)
+        window   = min(WINDOW_S, max(now - self.first_seen, 1e-6))
+        n_window = sum(n for _, n, _ in self.recent)
+        b_window = sum(b for _, _, b in self.recent)
+        n_burst  = sum(n for t, n, _ in self.recent if t >= now - BURST_WINDOW_S)
+        rate     = n_window / window
+        idle     = now - self.last_seen
+
+        burst = (
+            n_burst >= BURST_MIN_COUNT
+            and n_burst / BURST_WINDOW_S >= BURST_FACTOR * rate
+        ) if window > BURST_WINDOW_S else False
+        silent = (
+            self.gap_ewma is not None
+            and self.count >= 3
+            and idle >= max(SILENT_MIN_S, SILENT_FACTOR * self.gap_ewma)
+        )
+        return {
+            "count":          self.count,
+            "bytes":          self.bytes,
+            "rate_per_s":     round(rate, 3),
+            "bytes_per_s":    round(b_window / window, 1),
+            "burst_rate_per_s": round(n_burst / BURST_WINDOW_S, 3),
+            "idle_s":         round(idle, 2),
+            "typical_gap_s":  round(self.gap_ewma, 4) if self.gap_ewma is not None else None,
+            "gap_histogram":  {_gap_label(i): n for i, n in enumerate(self.gap_hist)},
+            "silent":         silent,
+            "burst":          burst,
+        }
+
+
+class HubTap:
+    """Passive Socket.IO listener that meters per-event traffic on the hub."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.events: Dict[str, EventStats] = {}
+        self.connected = False
+        self.connected_since: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._sio = None
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def available() -> bool:
+        return socketio is not None
+
+    def _on_event(self, event: str, *args: Any) -> None:
+        stats = self.events.get(event)
+        if stats is None:
+            stats = self.events[event] = EventStats()
+        stats.record(time.monotonic(), _payload_size(args))
+
+    async def start(self) -> None:
+        if socketio is None:
+            self.last_error = "python-socketio not installed"
+            return
+        sio = socketio.AsyncClient(reconnection=True, reconnection_delay=RECONNECT_S)
+
+        @sio.on("*")
+        async def _any(event, *args):
+            self._on_event(event, *args)
+
+        @sio.event
+        async def connect():
+            self.connected = True
+            self.connected_since = time.time()
+            self.last_error = None
+            print(f"[HubTap] 📡 Connected to {self.url}")
+
+        @sio.event
+        async def disconnect(*_):
+            self.connected = False
+            print("[HubTap] Disconnected")
+
+        self._sio = sio
+        self._task = asyncio.create_task(self._connect_loop())
+
+    async def _connect_loop(self) -> None:
+        # The hub may not be up yet (autostart races us) — keep trying until the
+        # first connect succeeds; after that socketio's own reconnection owns it.
+        while True:
+            try:
+                await self._sio.connect(self.url, wait_timeout=5)
+                return
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                await asyncio.sleep(RECONNECT_S)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+        if self._sio is not None:
+            try:
+                await self._sio.disconnect()
+            except Exception:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        per_event = {name: st.snapshot(now) for name, st in sorted(self.events.items())}
+        return {
+            "url":             self.url,
+            "connected":       self.connected,
+            "connected_since": self.connected_since,
+            "last_error":      self.last_error,
+            "window_s":        WINDOW_S,
+            "events":          per_event,
+            "silent":          [n for n, s in per_event.items() if s["silent"]],
+            "bursting":        [n for n, s in per_event.items() if s["burst"]],
+            "total_rate_per_s": round(sum(s["rate_per_s"] for s in per_event.values()), 3),
+        }
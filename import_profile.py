@@ -0,0 +1,149 @@
+"""
+Import-time profiles and bytecode pre-warming for managed Python services.
+
+When a service is started with import profiling on, the launcher sets
+PYTHONPROFILEIMPORTTIME=1 (the environment form of `-X importtime`) and
+diverts the `import time:` lines the interpreter writes to stderr into an
+ImportProfile instead of the service's log buffer. The profile rebuilds
+the import tree so `/launcher/services/{name}/imports` can show which
+imports dominate a slow boot — and whether an import cleanup helped.
+
+`prewarm_targets` / `prewarm` precompile each service's source tree with
+the service's *own* interpreter (bytecode is version-specific), so the
+first boot after a pull doesn't pay for compiling every module.
+"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+IMPORTTIME_PREFIX = "import time:"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S.*)$")
+
+# Never descend into these while precompiling.
+PREWARM_EXCLUDE = r"(node_modules|[/\\]\.git|[/\\]\.?venv|site-packages|__pycache__)"
+
+
+class ImportProfile:
+    """Import tree assembled from `-X importtime` output, one per boot."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.roots: List[Dict[str, Any]] = []
+        self.lines = 0
+        # importtime prints children before their parent (post-order), so
+        # finished subtrees wait here, keyed by depth, until the parent shows up.
+        self._pending: Dict[Tuple[Optional[str], int], List[Dict[str, Any]]] = {}
+
+    def feed(self, line: str, step: Optional[str] = None) -> None:
+        m = _LINE_RE.match(line.rstrip())
+        if not m:
+            return  # the header line, or something garbled
+        self_us, cum_us, indent, module = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        depth = max((len(indent) - 1) // 2, 0)
+        with self._lock:
+            node = {
+                "module":      module,
+                "self_us":     self_us,
+                "cumulative_us": cum_us,
+                "children":    self._pending.pop((step, depth + 1), []),
+            }
+            if step is not None:
+                node["step"] = step
+            if depth == 0:
+                self.roots.append(node)
+            else:
+                self._pending.setdefault((step, depth), []).append(node)
+            self.lines += 1
+
+    @staticmethod
+    def _prune(node: Dict[str, Any], top: int, depth: int) -> Dict[str, Any]:
+        kids = sorted(node["children"], key=lambda n: n["cumulative_us"], reverse=True)
+        out = {k: v for k, v in node.items() if k != "children"}
+        if depth > 1 and kids:
+            out["children"] = [ImportProfile._prune(k, top, depth - 1) for k in kids[:top]]
+            if len(kids) > top:
+                out["children_omitted"] = len(kids) - top
+        return out
+
+    def _walk(self):
+        stack = list(self.roots)
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node["children"])
+
+    def report(self, top: int = 20, depth: int = 3) -> Dict[str, Any]:
+        with self._lock:
+            roots = sorted(self.roots, key=lambda n: n["cumulative_us"], reverse=True)
+            flat  = sorted(self._walk(), key=lambda n: n["self_us"], reverse=True)[:top]
+            return {
+                "started_at":      self.started_at,
+                "imports":         self.lines,
+                "total_ms":        round(sum(n["cumulative_us"] for n in self.roots) / 1000, 1),
+                "tree":            [self._prune(n, top, depth) for n in roots[:top]],
+                "slowest_self":    [
+                    {"module": n["module"], "self_us": n["self_us"], "cumulative_us": n["cumulative_us"]}
+                    for n in flat
+                ],
+            }
+
+
+# ── Bytecode pre-warm ─────────────────────────────────────────────────────────
+
+def is_python(exe: Any) -> bool:
+    return os.path.basename(str(exe)).startswith("python")
+
+
+def _source_dir(cmd: List[Any], cwd: str) -> str:
+    """Directory holding a command's own code: the script's folder, or for
+    `-m pkg.mod` the package folder under cwd (cwd itself as a fallback)."""
+    if "-m" in cmd:
+        module = str(cmd[cmd.index("-m") + 1]).split(".")[0]
+        pkg = os.path.join(cwd, module)
+        return pkg if os.path.isdir(pkg) else cwd
+    script = str(cmd[-1])
+    return os.path.dirname(script) if script.endswith(".py") else cwd
+
+
+def prewarm_targets(defn: Dict[str, Any], default_cwd: str) -> List[Tuple[str, str]]:
+    """(interpreter, source dir) pairs for every Python process of a service."""
+    procs = defn.get("steps") or [defn]
+    out = []
+    for proc in procs:
+        cmd = proc.get("cmd") or []
+        if not cmd or not is_python(cmd[0]):
+            continue
+        cwd = proc.get("cwd", defn.get("cwd", default_cwd))
+        target = (str(cmd[0]), _source_dir(cmd, cwd))
+        if os.path.isdir(target[1]) and target not in out:
+            out.append(target)
+    return out
+
+
+async def prewarm(python: str, directory: str, timeout: float = 300.0) -> Dict[str, Any]:
+    """Run `python -m compileall` over `directory` in a subprocess."""
+    t0 = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        python, "-m", "compileall", "-q", "-j", "0", "-x", PREWARM_EXCLUDE, directory,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {"dir": directory, "python": python, "ok": False, "reason": "timeout"}
+    return {
+        "dir":       directory,
+        "python":    python,
+        "ok":        proc.returncode == 0,
+        "code":      proc.returncode,
+        "seconds":   round(time.monotonic() - t0, 2),
+        "output":    out.decode("utf-8", errors="replace").strip().splitlines()[-20:],
+    }
@@ -0,0 +1,320 @@
+"""
+In-process hosting for lightweight Python services.
+
+A service def with `"hosting": "inprocess"` (or listed in
+LAUNCHER_INPROCESS) whose cmd runs under the launcher's own interpreter is
+not spawned as a child process. Instead the launcher imports its entry
+module and runs it on a dedicated worker thread with its own event loop:
+
+    "app": "main:app"     ASGI app → served by uvicorn on the def's port
+    "app": "main:serve"   async function → awaited; it binds the port itself
+
+Without "app", the entry is derived from the cmd (`…/main.py` or
+`-m pkg.mod`) with attribute `app`. The service keeps its port and health
+contract; only the process boundary goes away.
+
+What changes for the service:
+  - it shares the launcher's process: cwd, os.environ, sys.argv and
+    sys.modules. Defs with an "env" block are always spawned (the process
+    environment can't be scoped to one thread), and services whose
+    top-level module names collide with another in-process service are
+    refused. Its directory is on sys.path only while it runs.
+  - output written from its thread (and its loop's executor threads) is
+    routed to its log; threads it creates itself print to the launcher's.
+  - an exception (or sys.exit) out of the entry point restarts it after a
+    backoff; more than MAX_RESTARTS within RESTART_WINDOW_S gives up and
+    reports the service as exited.
+
+InProcessService quacks like subprocess.Popen, so start/stop/health code
+treats it like any other managed process.
+"""
+
+import asyncio
+import gc
+import importlib
+import importlib.util
+import inspect
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import uvicorn
+except ImportError:  # pragma: no cover - the launcher itself runs on uvicorn
+    uvicorn = None
+
+THREAD_PREFIX    = "inproc:"
+MAX_RESTARTS     = 5
+RESTART_WINDOW_S = 60.0
+RESTART_BACKOFF  = [0.5, 1.0, 2.0, 5.0, 10.0]
+DEFAULT_BIND     = "0.0.0.0"
+
+
+def wants_inprocess(name: str, defn: Dict[str, Any], forced: List[str]) -> bool:
+    return defn.get("hosting") == "inprocess" or name in forced
+
+
+def eligible(defn: Dict[str, Any]) -> Optional[str]:
+    """None if the def can be hosted in-process, else the reason it can't."""
+    if defn.get("steps"):
+        return "multi-step services are always spawned"
+    if defn.get("rolling"):
+        return "rolling services need two instances"
+    if defn.get("env"):
+        return "its env would leak into the launcher and every later child"
+    cmd = defn.get("cmd") or []
+    if not cmd or os.path.realpath(str(cmd[0])) != os.path.realpath(sys.executable):
+        return "cmd does not run under the launcher's interpreter"
+    return None
+
+
+def entry_spec(defn: Dict[str, Any]) -> str:
+    if defn.get("app"):
+        return defn["app"]
+    cmd = defn["cmd"]
+    if "-m" in cmd:
+        return f"{cmd[cmd.index('-m') + 1]}:app"
+    return f"{os.path.splitext(os.path.basename(str(cmd[1])))[0]}:app"
+
+
+# ── Output routing ────────────────────────────────────────────────────────────
+
+class _RoutedStream:
+    """sys.stdout/stderr stand-in that sends writes from a hosted service's
+    threads to that service's line callback, and everything else through."""
+
+    def __init__(self, fallback) -> None:
+        self._fallback = fallback
+        self._buf: Dict[int, str] = {}
+
+    def _sink(self) -> Optional[Callable[[str], None]]:
+        name = threading.current_thread().name
+        if not name.startswith(THREAD_PREFIX):
+            return None
+        # "inproc:<service>" or, for its executor threads, "inproc:<service>|_<n>"
+        return _sinks.get(name[len(THREAD_PREFIX):].split("|", 1)[0])
+
+    def write(self, s: str) -> int:
+        sink = self._sink()
+        if sink is None:
+            return self._fallback.write(s)
+        tid = threading.get_ident()
+        data = self._buf.pop(tid, "") + s
+        *lines, rest = data.split("\n")
+        for line in lines:
+            sink(line)
+        if rest:
+            self._buf[tid] = rest
+        return len(s)
+
+    def flush(self) -> None:
+        self._fallback.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def __getattr__(self, attr):
+        return getattr(self._fallback, attr)
+
+
+_sinks: Dict[str, Callable[[str], None]] = {}
+_install_lock = threading.Lock()
+
+
+def _install_streams() -> None:
+    with _install_lock:
+        if not isinstance(sys.stdout, _RoutedStream):
+            sys.stdout = _RoutedStream(sys.stdout)
+        if not isinstance(sys.stderr, _RoutedStream):
+            sys.stderr = _RoutedStream(sys.stderr)
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+
+# service name → module names it owns, to catch collisions between services.
+_owned_modules: Dict[str, set] = {}
+# service name → the sys.path entry it added
+_added_paths: Dict[str, str] = {}
+
+
+def _local_modules(cwd: str) -> set:
+    try:
+        return {os.path.splitext(f)[0] for f in os.listdir(cwd)
+                if f.endswith(".py") or os.path.isfile(os.path.join(cwd, f, "__init__.py"))}
+    except OSError:
+        return set()
+
+
+def _load(name: str, spec: str, cwd: str) -> Any:
+    mod_name, _, attr = spec.partition(":")
+    attr = attr or "app"
+    path = os.path.join(cwd, mod_name + ".py")
+    as_script = "." not in mod_name and os.path.exists(path)
+    # The entry script gets a private module name (below), so only its
+    # siblings can collide with another service's.
+    mine = _local_modules(cwd) - ({mod_name} if as_script else set())
+    for other, mods in _owned_modules.items():
+        clash = mine & mods if other != name else set()
+        if clash:
+            raise RuntimeError(f"module name(s) {sorted(clash)} already loaded by in-process {other}")
+    _owned_modules[name] = mine
+
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+        _added_paths[name] = cwd
+    if as_script:
+        module_spec = importlib.util.spec_from_file_location(f"_inproc_{name}_{mod_name}", path)
+        module = importlib.util.module_from_spec(module_spec)
+        sys.modules[module_spec.name] = module
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(mod_name)
+    try:
+        return getattr(module, attr)
+    except AttributeError:
+        raise RuntimeError(f"{mod_name} has no attribute {attr!r}") from None
+
+
+def _unload(name: str) -> None:
+    """Undo _load's process-wide changes once the service has stopped."""
+    _owned_modules.pop(name, None)
+    path = _added_paths.pop(name, None)
+    if path is not None and path not in _added_paths.values():
+        try:
+            sys.path.remove(path)
+        except ValueError:
+            pass
+    prefix = f"_inproc_{name}_"
+    for mod in [m for m in sys.modules if m.startswith(prefix)]:
+        del sys.modules[mod]
+
+
+# ── Popen look-alike ──────────────────────────────────────────────────────────
+
+class InProcessService:
+    def __init__(self, name: str, defn: Dict[str, Any], cwd: str,
+                 on_line: Callable[[str], None], target: Any = None) -> None:
+        """`target`, if given, is an ASGI app / async function to run as-is
+        instead of importing the def's entry point."""
+        self.name       = name
+        self.port       = defn["port"]
+        self.bind       = defn.get("bind", DEFAULT_BIND)
+        self.spec       = entry_spec(defn) if target is None else getattr(target, "__name__", repr(target))
+        self.target     = target
+        self.cwd        = cwd
+        self.args       = [f"<in-process {self.spec}>"]
+        self.pid        = os.getpid()
+        self.returncode: Optional[int] = None
+        self.restarts   = 0
+        self._on_line   = on_line
+        self._stop      = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server    = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread    = threading.Thread(target=self._main, daemon=True,
+                                           name=f"{THREAD_PREFIX}{name}")
+
+    def start(self) -> "InProcessService":
+        _install_streams()
+        _sinks[self.name] = self._on_line
+        self._thread.start()
+        return self
+
+    # ── Worker thread ────────────────────────────────────────────────────────
+
+    async def _serve(self, target: Any) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop.set_default_executor(
+            ThreadPoolExecutor(thread_name_prefix=f"{THREAD_PREFIX}{self.name}|"))
+        if inspect.iscoroutinefunction(target):
+            self._task = asyncio.current_task()
+            await target()
+            return
+        if uvicorn is None:
+            raise RuntimeError("uvicorn is required to host ASGI apps in-process")
+        config = uvicorn.Config(target, host=self.bind, port=self.port, log_level="info")
+        self._server = uvicorn.Server(config)
+        await self._server.serve()
+
+    def _main(self) -> None:
+        try:
+            self._run()
+        finally:
+            if self.target is None:
+                _unload(self.name)
+
+    def _run(self) -> None:
+        try:
+            target = self.target if self.target is not None else _load(self.name, self.spec, self.cwd)
+        except BaseException:
+            self._on_line(f"❌ In-process import of {self.spec} failed:")
+            for line in traceback.format_exc().splitlines():
+                self._on_line(line)
+            self.returncode = 1
+            return
+
+        crashes: List[float] = []
+        while not self._stop.is_set():
+            try:
+                asyncio.run(self._serve(target))
+                if self._stop.is_set():
+                    break
+                self._on_line(f"⚠️  {self.spec} returned on its own")
+            except asyncio.CancelledError:
+                if self._stop.is_set():
+                    break
+            except BaseException as e:
+                if self._stop.is_set():
+                    break
+                self._on_line(f"💥 {self.spec} crashed: {e!r}")
+                for line in traceback.format_exc().splitlines():
+                    self._on_line(line)
+
+            now = time.monotonic()
+            crashes = [t for t in crashes if now - t < RESTART_WINDOW_S] + [now]
+            if len(crashes) > MAX_RESTARTS:
+                self._on_line(f"❌ Gave up after {MAX_RESTARTS} restarts in {RESTART_WINDOW_S:.0f}s")
+                self.returncode = 1
+                return
+            delay = RESTART_BACKOFF[min(len(crashes), len(RESTART_BACKOFF)) - 1]
+            self._on_line(f"🔄 Restarting in-process in {delay:g}s")
+            self.restarts += 1
+            if self._stop.wait(delay):
+                break
+            # The dead run's frames may still hold listening sockets; free
+            # them before the new run tries to bind the same port.
+            gc.collect()
+        self.returncode = 0
+
+    # ── Popen interface ──────────────────────────────────────────────────────
+
+    def poll(self) -> Optional[int]:
+        if self.returncode is None and not self._thread.is_alive() and self._thread.ident:
+            self.returncode = 1
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        self._thread.join(timeout)
+        return self.poll()
+
+    def _shutdown(self, force: bool) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.should_exit = True
+            self._server.force_exit = force
+        elif self._loop is not None and self._task is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._task.cancel)
+            except RuntimeError:
+                pass  # loop already closed
+
+    def terminate(self) -> None:
+        self._shutdown(force=False)
+
+    def kill(self) -> None:
+        # A thread can't be killed; force_exit skips uvicorn's graceful drain.
+        self._shutdown(force=True)
@@ -11,7 +11,11 @@ Each step is started and health-checked in order before moving to the next.
 """
 
 import asyncio
-import re
+import copy
+import itertools
+import json
+import math
+import runpy
 import subprocess
 import threading
 import time
@@ -20,15 +24,13 @@ import sys
 import httpx
 import uvicorn
 import webbrowser
-
-# Match leading `[HH:MM:SS]` or `[HH:MM:SS.fff]` stamps the child already wrote.
-_PRESTAMP_RE = re.compile(r"^\[\d{2}:\d{2}:\d{2}(\.\d{1,6})?\]\s")
-from collections import deque
+from urllib.parse import urlsplit, urlunsplit
 from contextlib import asynccontextmanager
 from typing import Optional, Dict, Any, List
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -43,17 +45,109 @@ if os.path.isdir(_SECRETS_DIR):
             load_dotenv(os.path.join(_SECRETS_DIR, _fname), override=False)
             print(f"[Launcher] 🔐 Loaded secrets from {_fname}")
 
+import service_defs
 from service_defs import SERVICE_DEFS, BOOT_RETRIES, UI_DIR, conda_python
+from log_store import ServiceLog, normalize_level, merge_timeline, wall_to_mono_ns, LEVEL_RANK, REPEAT_FLUSH_S
+import log_archive
+from hub_stats import HubTap
+from span_collector import SpanCollector, parse_batch
+import state_journal
+from remote_agents import AgentPool, AgentRejected, AgentUnavailable, parse_agents, START_TIMEOUT
+from port_proxy import TcpProxy
+import import_profile
+from import_profile import ImportProfile, IMPORTTIME_PREFIX
+import live_profiler
+from loop_monitor import LoopLagMonitor
+from chat_replay import ReplayRun
+import inprocess_host
+from inprocess_host import InProcessService
+import static_site
+from history_store import HistoryStore, ResourceSampler, HOUR_KEEP
 
 LAUNCHER_PORT = int(os.environ.get("LAUNCHER_PORT", 8010))
 
-# Each service stores a list of Popen objects (one per step, or just one for simple services)
+# Multi-node placement: services whose def names another `host` are run by
+# the launcher agent on that node (see remote_agents.py). An agent only
+# manages the services placed on its own LAUNCHER_NODE.
+LAUNCHER_ROLE   = "agent" if "--agent" in sys.argv else os.environ.get("LAUNCHER_ROLE", "primary")
+LAUNCHER_NODE   = os.environ.get("LAUNCHER_NODE", "local")
+LAUNCHER_AGENTS = parse_agents(os.environ.get("LAUNCHER_AGENTS", ""))
+IS_AGENT        = LAUNCHER_ROLE == "agent"
+
+# Runtime state (session log archives, …) lives here, next to the launcher —
+# one directory per node, so a primary and an agent on the same machine don't
+# share (and overwrite) each other's journal, history and archives.
+LAUNCHER_STATE_DIR = os.environ.get("LAUNCHER_STATE_DIR", os.path.join(UI_DIR, ".launcher", LAUNCHER_NODE))
+ARCHIVE_DIR        = os.path.join(LAUNCHER_STATE_DIR, "sessions")
+ARCHIVE_ENABLED    = os.environ.get("LAUNCHER_ARCHIVE", "1") != "0"
+ARCHIVE_KEEP       = int(os.environ.get("LAUNCHER_ARCHIVE_KEEP", 20))
+
+# Optional passive listener on the hub that meters per-event traffic.
+HUB_URL         = os.environ.get("LAUNCHER_HUB_URL", "http://localhost:8002")
+HUB_TAP_ENABLED = os.environ.get("LAUNCHER_HUB_TAP", "0") == "1"
+
+# Profile imports (`-X importtime`) for every Python service on every boot,
+# rather than only for defs with "importtime": True or ?importtime=true starts.
+IMPORTTIME_ALL = os.environ.get("LAUNCHER_IMPORTTIME", "0") == "1"
+
+# Log ingest limits per service (see log_store.py); a def's "log_rate" overrides.
+LOG_RATE  = float(os.environ.get("LAUNCHER_LOG_RATE", 200))
+LOG_BURST = float(os.environ.get("LAUNCHER_LOG_BURST", 1000))
+
+# Event-loop lag sampler + slow-callback attribution (see loop_monitor.py).
+LOOP_MONITOR_ENABLED = os.environ.get("LAUNCHER_LOOP_MONITOR", "1") != "0"
+SLOW_CALLBACK_MS     = float(os.environ.get("LAUNCHER_SLOW_CALLBACK_MS", 100))
+
+# Host these sys.executable services on a launcher thread instead of a child
+# process, in addition to defs with "hosting": "inprocess" (see inprocess_host.py).
+INPROCESS = [n.strip() for n in os.environ.get("LAUNCHER_INPROCESS", "").split(",") if n.strip()]
+
+# Steps with "mode": "static" serve a cached production build instead of a dev
+# server; builds are keyed by a hash of their sources (see static_site.py).
+STATIC_CACHE_DIR = os.path.join(LAUNCHER_STATE_DIR, "static")
+
+# Reload SERVICE_DEFS when service_defs.py or services.json changes on disk.
+WATCH_DEFS   = os.environ.get("LAUNCHER_WATCH_DEFS", "1") != "0"
+WATCH_DEFS_S = 2.0
+
+# Long-term service history (status, probes, CPU/RSS) in SQLite — see history_store.py.
+HISTORY_ENABLED    = os.environ.get("LAUNCHER_HISTORY", "1") != "0"
+HISTORY_SAMPLE_S   = float(os.environ.get("LAUNCHER_HISTORY_SAMPLE_S", 5))
+HISTORY_EVENTS_MAX = 10000   # rows per /history/{name}/events request
+
+# Detached mode: children run in their own session and write to log files, so
+# they survive a launcher restart and get re-adopted from the journal on boot.
+DETACHED     = os.environ.get("LAUNCHER_DETACHED", "0") == "1"
+JOURNAL_PATH = os.path.join(LAUNCHER_STATE_DIR, "journal.json")
+OUTPUT_DIR   = os.path.join(LAUNCHER_STATE_DIR, "output")
+
+# Each service stores a list of Popen objects (one per step, or just one for simple services).
+# Processes re-adopted from the journal are AdoptedProcess, which quacks like Popen.
 _procs:    Dict[str, List[subprocess.Popen]] = {k: [] for k in SERVICE_DEFS}
-_logs:     Dict[str, deque]                  = {k: deque(maxlen=500) for k in SERVICE_DEFS}
+# pid → {"step", "start_time", "log_path"} for everything in _procs, for the journal.
+_proc_meta: Dict[int, Dict[str, Any]]        = {}
+_logs:     Dict[str, ServiceLog]             = {}   # filled by _new_log() below
 _starting: set                               = set()
 _stopping: set                               = set()
+_swapping: set                               = set()
+# Public-port proxies for services with a `rolling` block (see port_proxy.py).
+_proxies:  Dict[str, TcpProxy]               = {}
+# Import-time profile of each service's last profiled boot.
+_import_profiles: Dict[str, ImportProfile]   = {}
+_importtime_on:   set                        = set()
 
 http_client: Optional[httpx.AsyncClient] = None
+_archive:    Optional[log_archive.SessionArchive] = None
+_hub_tap:    Optional[HubTap] = None
+_spans = SpanCollector()
+_agents = AgentPool(LAUNCHER_AGENTS if not IS_AGENT else {})
+_loop_monitor = LoopLagMonitor(slow_ms=SLOW_CALLBACK_MS)
+_replay:      Optional[ReplayRun] = None
+_history:     Optional[HistoryStore] = None
+# Services the launcher was asked to keep up (started and not stopped since);
+# only these are sampled, so a deliberately stopped service isn't "down".
+_expected_up: set = set()
+_last_status: Dict[str, str] = {}
 
 # ── Health checks ─────────────────────────────────────────────────────────────
 
@@ -87,8 +181,29 @@ async def _check(hc: str, url_or_port) -> bool:
     return await _tcp_health("127.0.0.1", url_or_port)
 
 
+def _with_port(url: str, port: int) -> str:
+    parts = urlsplit(url)
+    return urlunsplit(parts._replace(netloc=f"{parts.hostname}:{port}"))
+
+
+def _health_target(defn: Dict[str, Any], port: Optional[int] = None):
+    """(check type, url or port) for a service — or for one of its rolling
+    instances when `port` names the backend port instead of the public one."""
+    hc = defn.get("health_check", "tcp")
+    if hc == "http":
+        url = defn.get("health_url", f"http://localhost:{defn['port']}/health")
+        return hc, (_with_port(url, port) if port is not None else url)
+    return hc, (port if port is not None else defn["port"])
+
+
 async def _health_check(name: str) -> bool:
     defn = SERVICE_DEFS[name]
+    proxy = _proxies.get(name)
+    if proxy is not None:
+        # The proxy itself always accepts TCP — check the live instance behind it.
+        if proxy.backend is None:
+            return False
+        return await _check(*_health_target(defn, proxy.backend))
     if defn.get("health_check") == "http":
         return await _http_health(defn.get("health_url", f"http://localhost:{defn['port']}/health"))
     return await _tcp_health("127.0.0.1", defn["port"])
@@ -103,30 +218,116 @@ async def _wait_for(hc: str, url_or_port, retries: int, interval: float = 0.5) -
 
 # ── Logging ───────────────────────────────────────────────────────────────────
 
-def _append_log(name: str, line: str) -> None:
-    stripped = line.rstrip()
-    # If the child already wrote a timestamp at write-time, trust it — it's
-    # more accurate than our read-time clock when the pipe drains in a burst.
-    if _PRESTAMP_RE.match(stripped):
-        _logs[name].append(stripped)
-    else:
-        _logs[name].append(f"[{time.strftime('%H:%M:%S')}] {stripped}")
+def _archive_record(name: str, rec) -> None:
+    if _archive:
+        _archive.submit(name, rec.to_dict())
+
+
+def _new_log(name: str) -> ServiceLog:
+    # Rate limit per service: defs may set "log_rate" (lines/s) for chatty services.
+    rate = float(SERVICE_DEFS[name].get("log_rate", LOG_RATE))
+    return ServiceLog(maxlen=500, rate=rate, burst=max(LOG_BURST, rate),
+                      sink=lambda rec: _archive_record(name, rec))
+
+
+_logs.update({k: _new_log(k) for k in SERVICE_DEFS})
+
 
+def _append_log(name: str, line: str, step: Optional[str] = None) -> None:
+    _logs[name].append(line, step=step)
 
-def _stream_output(name: str, pipe) -> None:
+
+def _ingest_output(name: str, line: str, step: Optional[str] = None) -> None:
+    """Route one line of child output: `-X importtime` lines feed the
+    service's ImportProfile, everything else goes to its log."""
+    if line.startswith(IMPORTTIME_PREFIX):
+        profile = _import_profiles.get(name)
+        if profile is not None:
+            profile.feed(line, step)
+        return
+    _append_log(name, line, step)
+
+
+def _stream_output(name: str, pipe, step: Optional[str] = None) -> None:
     try:
         for raw in iter(pipe.readline, b""):
-            _append_log(name, raw.decode("utf-8", errors="replace"))
+            _ingest_output(name, raw.decode("utf-8", errors="replace"), step)
     except Exception:
         pass
 
 
+def _is_local(name: str) -> bool:
+    return SERVICE_DEFS[name].get("host", "local") == LAUNCHER_NODE
+
+
+def _local_services() -> List[str]:
+    return [n for n in SERVICE_DEFS if _is_local(n)]
+
+
+async def _remote_call(name: str, method: str, path: str, **kw) -> Any:
+    """Forward a service request to the agent on the service's host."""
+    node = SERVICE_DEFS[name].get("host", "local")
+    if IS_AGENT:
+        raise HTTPException(404, f"Service '{name}' runs on {node!r}, not on this agent ({LAUNCHER_NODE!r})")
+    try:
+        return await _agents.get(node).request(method, path, **kw)
+    except AgentRejected as e:
+        raise HTTPException(e.status, e.detail)
+    except AgentUnavailable as e:
+        _append_log(name, f"❌ {e}")
+        raise HTTPException(502, str(e))
+
+
 def _procs_alive(name: str) -> bool:
     return any(p.poll() is None for p in _procs[name])
 
+
+def _status_of(name: str, alive: bool, healthy: bool) -> str:
+    if name in _starting:   return "starting"
+    if name in _stopping:   return "stopping"
+    if healthy:             return "online"
+    if alive:               return "unhealthy"
+    return "offline"
+
 # ── Start a single process step ───────────────────────────────────────────────
 
-def _launch_proc(name: str, cmd: list, cwd: str, env: dict) -> subprocess.Popen:
+def _output_path(name: str, step: Optional[str]) -> str:
+    suffix = "" if step is None else "." + "".join(c if c.isalnum() else "_" for c in step)
+    return os.path.join(OUTPUT_DIR, f"{name}{suffix}.log")
+
+
+def _launch_inprocess(name: str, cwd: str) -> InProcessService:
+    _append_log(name, f"🧵 Hosting in-process ({inprocess_host.entry_spec(SERVICE_DEFS[name])})")
+    return InProcessService(name, SERVICE_DEFS[name], cwd,
+                            lambda line: _ingest_output(name, line)).start()
+
+
+def _launch_static(name: str, step: dict, cwd: str, label: str) -> InProcessService:
+    """Build (or reuse) the step's production bundle and serve it on a
+    launcher thread. Blocking — the build itself can take minutes."""
+    spec = step["static"]
+    on_line = lambda line: _ingest_output(name, line, label)
+    root, _ = static_site.ensure_build(
+        cwd, spec, os.path.join(STATIC_CACHE_DIR, name, "".join(c if c.isalnum() else "_" for c in label)),
+        on_line,
+    )
+    proxy_config = spec.get("proxy_config")
+    if proxy_config and not os.path.isabs(proxy_config):
+        proxy_config = os.path.join(cwd, proxy_config)
+    app = static_site.make_app(root, static_site.load_proxy_config(proxy_config))
+    _append_log(name, f"🧵 Serving {root} on :{step['port']}", label)
+    return InProcessService(name, {"port": step["port"], "bind": step.get("bind", "127.0.0.1")},
+                            cwd, on_line, target=app).start()
+
+
+def _launch_proc(name: str, cmd: list, cwd: str, env: dict, step: Optional[str] = None) -> subprocess.Popen:
+    defn = SERVICE_DEFS[name]
+    if step is None and inprocess_host.wants_inprocess(name, defn, INPROCESS):
+        reason = inprocess_host.eligible(defn)
+        if reason is None:
+            return _launch_inprocess(name, cwd)
+        _append_log(name, f"⚠️  Can't host in-process ({reason}) — spawning instead")
+
     proc_env = os.environ.copy()
     proc_env.update(env)
     # Force the child Python to flush stdout per line instead of block-buffering
@@ -135,24 +336,146 @@ def _launch_proc(name: str, cmd: list, cwd: str, env: dict) -> subprocess.Popen:
     # like the service "wakes up" periodically and dumping ~100 events at the
     # same timestamp.
     proc_env.setdefault("PYTHONUNBUFFERED", "1")
-    p = subprocess.Popen(
-        cmd,
-        cwd=cwd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        env=proc_env,
-    )
-    threading.Thread(target=_stream_output, args=(name, p.stdout), daemon=True).start()
+    if name in _importtime_on:
+        # Same as `-X importtime`, but works whatever the cmd looks like.
+        proc_env["PYTHONPROFILEIMPORTTIME"] = "1"
+    if SERVICE_DEFS[name].get("profiling") and import_profile.is_python(cmd[0]):
+        live_profiler.bootstrap_env(proc_env, name, step)
+
+    if DETACHED:
+        # Write to a file rather than a pipe (a pipe would SIGPIPE the child
+        # once the launcher exits) and leave our process group so Ctrl+C on
+        # the launcher doesn't reach it.
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        log_path = _output_path(name, step)
+        with open(log_path, "wb") as out:
+            p = subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                stdout=out,
+                stderr=subprocess.STDOUT,
+                env=proc_env,
+                start_new_session=True,
+            )
+        state_journal.start_follower(log_path, lambda line: _ingest_output(name, line, step), p)
+    else:
+        log_path = None
+        p = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=proc_env,
+        )
+        threading.Thread(target=_stream_output, args=(name, p.stdout, step), daemon=True).start()
+
+    _proc_meta[p.pid] = {
+        "step":       step,
+        "start_time": state_journal.process_start_time(p.pid),
+        "log_path":   log_path,
+    }
     return p
 
+# ── State journal ─────────────────────────────────────────────────────────────
+
+# Live-state keys that survive a launcher restart: only the operator's own
+# choices. Everything else is re-derived — in particular the offline-safety
+# timer, whose armed_at would be hours stale after a restart and fire at once.
+_JOURNALED_LIVE_KEYS = ("override", "manual_live")
+_last_journal: Optional[str] = None
+_journal_lock = asyncio.Lock()
+
+
+async def _journal_save() -> None:
+    """Persist managed PIDs and live-state. No-op when nothing changed.
+
+    The snapshot is taken on the loop; the file write runs in a worker
+    thread. The lock keeps writes in call order."""
+    async with _journal_lock:
+        await _journal_write()
+
+
+async def _journal_write() -> None:
+    global _last_journal
+    services = {}
+    for name, procs in _procs.items():
+        if name not in SERVICE_DEFS or not _is_local(name):
+            continue
+        if any(isinstance(p, InProcessService) for p in procs):
+            # Part of it dies with the launcher; journaling the rest would
+            # half-adopt it after a restart.
+            continue
+        entries = []
+        for p in procs:
+            meta = _proc_meta.get(p.pid, {})
+            entries.append({"pid": p.pid, **meta})
+        if entries:
+            services[name] = entries
+    state = {
+        "detached":   DETACHED,
+        "services":   services,
+        "live_state": {k: _live_state[k] for k in _JOURNALED_LIVE_KEYS},
+    }
+    snapshot = repr(state)
+    if snapshot == _last_journal:
+        return
+    try:
+        await asyncio.to_thread(state_journal.save, JOURNAL_PATH, state)
+        _last_journal = snapshot
+    except Exception as e:
+        print(f"[Journal] ❌ save failed: {e}")
+
+
+def _journal_restore() -> None:
+    """Re-adopt still-running children and restore live-state from the journal."""
+    data = state_journal.load(JOURNAL_PATH)
+    if not data:
+        return
+
+    for key, value in (data.get("live_state") or {}).items():
+        if key in _JOURNALED_LIVE_KEYS:
+            _live_state[key] = value
+
+    for name, entries in (data.get("services") or {}).items():
+        if name not in SERVICE_DEFS or not _is_local(name):
+            # Another node's service — its own launcher owns those PIDs.
+            continue
+        alive = [e for e in entries if e.get("log_path")
+                 and state_journal.same_process(e["pid"], e.get("start_time"))]
+        if not alive:
+            continue
+        adopted = [state_journal.AdoptedProcess(e["pid"], e["start_time"]) for e in alive]
+        if len(alive) < len(entries):
+            # A multi-step service lost a step while we were down — don't
+            # half-adopt it; stop the survivors so it can be started cleanly.
+            print(f"[Journal] ⚠️  {name}: {len(alive)}/{len(entries)} processes survived — stopping them")
+            for p in adopted:
+                p.terminate()
+            continue
+        _procs[name] = adopted
+        for e, p in zip(alive, adopted):
+            _proc_meta[p.pid] = {k: e.get(k) for k in ("step", "start_time", "log_path", "port")}
+            state_journal.start_follower(
+                e["log_path"],
+                lambda line, n=name, st=e.get("step"): _ingest_output(n, line, st),
+                p,
+                backfill=state_journal.TAIL_BACKFILL,
+            )
+        _append_log(name, f"🔗 Re-adopted after launcher restart (PIDs {[p.pid for p in adopted]})")
+        _expected_up.add(name)
+        print(f"   🔗 Re-adopted {name} (PIDs {[p.pid for p in adopted]})")
+
 # ── Service control ───────────────────────────────────────────────────────────
 
-async def start_service(name: str) -> Dict[str, Any]:
+async def start_service(name: str, importtime: bool = False) -> Dict[str, Any]:
     defn = SERVICE_DEFS.get(name)
     if not defn:
         raise HTTPException(404, f"Unknown service: {name}")
     if not defn.get("managed"):
         raise HTTPException(400, f"Service '{name}' is not managed by the launcher")
+    if not _is_local(name):
+        return await _remote_call(name, "POST", f"/launcher/services/{name}/start",
+                                  params={"importtime": importtime}, timeout=START_TIMEOUT)
     if _procs_alive(name):
         return {"ok": False, "reason": "already_running"}
     if name in _starting:
@@ -161,6 +484,14 @@ async def start_service(name: str) -> Dict[str, Any]:
     _starting.add(name)
     _procs[name] = []
     _append_log(name, f"--- Starting {defn['label']} ---")
+    _expected_up.add(name)
+    _history_event(name, "start")
+    if importtime or defn.get("importtime") or IMPORTTIME_ALL:
+        _importtime_on.add(name)
+        _import_profiles[name] = ImportProfile()
+        _append_log(name, "⏱️  Import-time profiling on")
+    else:
+        _importtime_on.discard(name)
 
     steps = defn.get("steps")
 
@@ -176,10 +507,18 @@ async def start_service(name: str) -> Dict[str, Any]:
                 env  = step.get("env", {})
                 label = step.get("label", f"step {i}")
 
-                _append_log(name, f"[{i}/{len(steps)}] Starting {label}…")
-                _append_log(name, f"    cmd: {' '.join(str(c) for c in cmd)}")
-
-                p = _launch_proc(name, cmd, cwd, env)
+                _append_log(name, f"[{i}/{len(steps)}] Starting {label}…", label)
+                if step.get("mode") == "static" and step.get("static"):
+                    try:
+                        p = await asyncio.to_thread(_launch_static, name, step, cwd, label)
+                    except Exception as e:
+                        _append_log(name, f"❌ {label}: {e}", label)
+                        await asyncio.to_thread(_kill_all, name)
+                        return {"ok": False, "reason": f"{label} build_failed"}
+                else:
+                    _append_log(name, f"    cmd: {' '.join(str(c) for c in cmd)}", label)
+                    # Popen (fork/exec) can block for a long time — keep it off the loop.
+                    p = await asyncio.to_thread(_launch_proc, name, cmd, cwd, env, label)
                 _procs[name].append(p)
 
                 # Determine health target for this step
@@ -189,14 +528,14 @@ async def start_service(name: str) -> Dict[str, Any]:
                 healthy = await _wait_for(hc, hcu, retries=per_step)
 
                 if p.poll() is not None:
-                    _append_log(name, f"❌ {label} exited early (code {p.returncode})")
-                    _kill_all(name)
+                    _append_log(name, f"❌ {label} exited early (code {p.returncode})", label)
+                    await asyncio.to_thread(_kill_all, name)
                     return {"ok": False, "reason": f"{label} process_died"}
 
                 if not healthy:
-                    _append_log(name, f"⚠️  {label} health timed out — continuing anyway")
+                    _append_log(name, f"⚠️  {label} health timed out — continuing anyway", label)
                 else:
-                    _append_log(name, f"✅ {label} is ready")
+                    _append_log(name, f"✅ {label} is ready", label)
 
         else:
             # ── Single-process service ────────────────────────────────────────
@@ -211,42 +550,51 @@ async def start_service(name: str) -> Dict[str, Any]:
             cmd = defn["cmd"]
             cwd = defn.get("cwd", UI_DIR)
             env = defn.get("env", {})
+            backend = None
+            if defn.get("rolling"):
+                backend = await _rolling_prepare(name)
+                cmd, env = _instance_cmd_env(defn, backend)
             _append_log(name, f"    cmd: {' '.join(str(c) for c in cmd)}")
 
-            p = _launch_proc(name, cmd, cwd, env)
+            p = await asyncio.to_thread(_launch_proc, name, cmd, cwd, env)
             _procs[name].append(p)
+            if backend is not None:
+                _proc_meta[p.pid]["port"] = backend
 
             retries = BOOT_RETRIES.get(name, 20)
-            healthy = await _wait_for(
-                defn.get("health_check", "tcp"),
-                defn.get("health_url") if defn.get("health_check") == "http" else defn["port"],
-                retries=retries,
-            )
+            healthy = await _wait_for(*_health_target(defn, backend), retries=retries)
 
             if p.poll() is not None:
                 _append_log(name, f"❌ Process exited early (code {p.returncode})")
                 _procs[name] = []
+                await _close_proxy(name)
                 return {"ok": False, "reason": "process_died", "code": p.returncode}
 
             if not healthy:
                 _append_log(name, f"⚠️  Running but health check timed out — treating as online")
+            if backend is not None:
+                _proxies[name].set_backend(backend)
+                _append_log(name, f"🔀 :{defn['port']} → :{backend}")
 
         # ── All steps up ─────────────────────────────────────────────────────
         pids = [p.pid for p in _procs[name]]
         _append_log(name, f"✅ {defn['label']} ready (PIDs {pids})")
 
         if defn.get("open_url"):
-            webbrowser.open(defn["open_url"])
+            # Blocks until the browser handler returns — run it in a worker thread.
+            await asyncio.to_thread(webbrowser.open, defn["open_url"])
             _append_log(name, f"🌐 Opened {defn['open_url']}")
 
         return {"ok": True, "pid": _procs[name][0].pid if _procs[name] else None}
 
     except Exception as e:
         _append_log(name, f"❌ Failed to start: {e}")
-        _kill_all(name)
+        await asyncio.to_thread(_kill_all, name)
+        await _close_proxy(name)
         return {"ok": False, "reason": str(e)}
     finally:
         _starting.discard(name)
+        await _journal_save()
 
 
 def _kill_all(name: str) -> None:
@@ -256,48 +604,69 @@ def _kill_all(name: str) -> None:
                 p.terminate()
         except Exception:
             pass
+        _proc_meta.pop(p.pid, None)
     _procs[name] = []
 
 
+def _signal_procs(procs: List[subprocess.Popen], method: str) -> None:
+    for p in procs:
+        try:
+            if p.poll() is None:
+                getattr(p, method)()
+        except Exception:
+            pass
+
+
+async def _terminate_procs(procs: List[subprocess.Popen], grace_s: float = 5.0) -> List[Optional[int]]:
+    """SIGTERM `procs` (last step first), SIGKILL whatever outlives `grace_s`.
+
+    Signalling runs in a worker thread: for adopted processes it may shell
+    out to `ps`, and a mass stop shouldn't stall health checks or routes."""
+    # Stop in reverse order (UI before backend)
+    await asyncio.to_thread(_signal_procs, list(reversed(procs)), "terminate")
+
+    for _ in range(int(grace_s / 0.1)):
+        await asyncio.sleep(0.1)
+        if not any(p.poll() is None for p in procs):
+            break
+    else:
+        await asyncio.to_thread(_signal_procs, procs, "kill")
+        await asyncio.sleep(0.3)
+
+    return [p.returncode for p in procs]
+
+
 async def stop_service(name: str) -> Dict[str, Any]:
     defn = SERVICE_DEFS.get(name)
     if not defn:
         raise HTTPException(404, f"Unknown service: {name}")
     if not defn.get("managed"):
         raise HTTPException(400, f"Service '{name}' is not managed by the launcher")
+    if not _is_local(name):
+        return await _remote_call(name, "POST", f"/launcher/services/{name}/stop")
 
+    if name in _swapping:
+        # Mid-swap the proxy and _procs are about to change hands.
+        return {"ok": False, "reason": "busy"}
     if not _procs_alive(name):
         _procs[name] = []
+        # A rolling service whose instances all died can still hold its port.
+        await _close_proxy(name)
         return {"ok": False, "reason": "not_running"}
     if name in _stopping:
         return {"ok": False, "reason": "already_stopping"}
 
     _stopping.add(name)
     _append_log(name, f"--- Stopping {defn['label']} ---")
+    _expected_up.discard(name)
+    _history_event(name, "stop")
 
     try:
-        # Stop in reverse order (UI before backend)
-        for p in reversed(_procs[name]):
-            try:
-                p.terminate()
-            except Exception:
-                pass
-
-        for _ in range(50):
-            await asyncio.sleep(0.1)
-            if not _procs_alive(name):
-                break
-        else:
-            for p in _procs[name]:
-                try:
-                    if p.poll() is None:
-                        p.kill()
-                except Exception:
-                    pass
-            await asyncio.sleep(0.3)
-
-        codes = [p.returncode for p in _procs[name]]
+        codes = await _terminate_procs(_procs[name])
+        for p in _procs[name]:
+            _proc_meta.pop(p.pid, None)
         _procs[name] = []
+        await _close_proxy(name)
         _append_log(name, f"✅ Stopped (exit codes {codes})")
         return {"ok": True, "codes": codes}
 
@@ -306,6 +675,111 @@ async def stop_service(name: str) -> Dict[str, Any]:
         return {"ok": False, "reason": str(e)}
     finally:
         _stopping.discard(name)
+        await _journal_save()
+
+# ── Blue/green (rolling) restarts ─────────────────────────────────────────────
+# A service def may opt in with
+#     "rolling": {"ports": [blue, green], "port_env": "PORT"}
+# Its instances then run on the blue/green ports (passed via `{port}` in cmd
+# and/or the `port_env` variable) behind a TcpProxy on the public port.
+
+ROLLING_DRAIN_S = 10.0
+
+
+def _instance_cmd_env(defn: Dict[str, Any], port: int):
+    cmd = [c.replace("{port}", str(port)) if isinstance(c, str) else c for c in defn["cmd"]]
+    env = dict(defn.get("env", {}))
+    port_env = defn["rolling"].get("port_env")
+    if port_env:
+        env[port_env] = str(port)
+    return cmd, env
+
+
+async def _rolling_prepare(name: str) -> int:
+    """Make sure the public-port proxy is listening; return the idle backend port."""
+    defn  = SERVICE_DEFS[name]
+    proxy = _proxies.get(name)
+    if proxy is None:
+        proxy = _proxies[name] = TcpProxy(defn["port"])
+    if not proxy.listening:
+        await proxy.start()
+    ports = defn["rolling"]["ports"]
+    return next((p for p in ports if p != proxy.backend), ports[0])
+
+
+async def _close_proxy(name: str) -> None:
+    """Release a rolling service's public port."""
+    proxy = _proxies.pop(name, None)
+    if proxy is not None:
+        await proxy.close()
+
+
+async def rolling_restart(name: str) -> Dict[str, Any]:
+    """Start a new instance on the idle port, switch the proxy once it's
+    healthy, drain the old instance's connections, then stop it."""
+    defn  = SERVICE_DEFS[name]
+    proxy = _proxies.get(name)
+    if name in _starting or name in _stopping or name in _swapping:
+        return {"ok": False, "reason": "busy"}
+    if proxy is None or proxy.backend is None or not _procs_alive(name):
+        return {"ok": False, "reason": "not_running"}
+
+    _swapping.add(name)
+    old_procs = list(_procs[name])
+    old_port  = proxy.backend
+    try:
+        new_port = await _rolling_prepare(name)
+        _append_log(name, f"--- Rolling restart of {defn['label']}: :{old_port} → :{new_port} ---")
+        _history_event(name, "start", "rolling")
+        cmd, env = _instance_cmd_env(defn, new_port)
+        p = await asyncio.to_thread(_launch_proc, name, cmd, defn.get("cwd", UI_DIR), env)
+        _proc_meta[p.pid]["port"] = new_port
+
+        healthy = await _wait_for(*_health_target(defn, new_port), retries=BOOT_RETRIES.get(name, 20))
+        if p.poll() is not None or not healthy:
+            reason = "process_died" if p.poll() is not None else "health_timeout"
+            _append_log(name, f"❌ New instance on :{new_port} failed ({reason}) — keeping :{old_port}")
+            await _terminate_procs([p])
+            _proc_meta.pop(p.pid, None)
+            return {"ok": False, "reason": reason, "active_port": old_port}
+
+        proxy.set_backend(new_port)
+        _procs[name] = [p]
+        await _journal_save()
+        _append_log(name, f"🔀 Traffic switched to :{new_port}; draining :{old_port}")
+
+        drained = await proxy.drain(old_port, ROLLING_DRAIN_S)
+        if not drained:
+            _append_log(name, f"⚠️  {proxy.connections(old_port)} connection(s) still open on :{old_port} "
+                              f"after {ROLLING_DRAIN_S:.0f}s — stopping anyway")
+        codes = await _terminate_procs(old_procs)
+        for old in old_procs:
+            _proc_meta.pop(old.pid, None)
+        _append_log(name, f"✅ Rolling restart complete (PID {p.pid} on :{new_port}, old exit codes {codes})")
+        return {"ok": True, "pid": p.pid, "active_port": new_port, "drained": drained}
+    except Exception as e:
+        _append_log(name, f"❌ Rolling restart failed: {e}")
+        return {"ok": False, "reason": str(e)}
+    finally:
+        _swapping.discard(name)
+        await _journal_save()
+
+
+async def _rolling_resume() -> None:
+    """Re-open proxies for rolling services re-adopted from the journal."""
+    for name, procs in _procs.items():
+        defn = SERVICE_DEFS[name]
+        if not defn.get("rolling") or not procs:
+            continue
+        port = _proc_meta.get(procs[0].pid, {}).get("port")
+        if port is None:
+            continue
+        try:
+            await _rolling_prepare(name)
+            _proxies[name].set_backend(port)
+            _append_log(name, f"🔀 :{defn['port']} → :{port} (resumed)")
+        except OSError as e:
+            _append_log(name, f"❌ Could not reopen proxy on :{defn['port']}: {e}")
 
 # ── App lifecycle ─────────────────────────────────────────────────────────────
 
@@ -403,7 +877,10 @@ async def _live_state_tick() -> None:
 
 async def _offline_safety_enforce() -> None:
     """Stop every running managed service except SAFETY_KEEP_ALIVE."""
-    targets = [n for n in SERVICE_DEFS if n not in SAFETY_KEEP_ALIVE and _procs_alive(n)]
+    # Remote services are included unconditionally — their agent answers
+    # "not_running" if there's nothing to stop.
+    targets = [n for n in SERVICE_DEFS
+               if n not in SAFETY_KEEP_ALIVE and (_procs_alive(n) if _is_local(n) else SERVICE_DEFS[n].get("managed"))]
     if not targets:
         return
     print(f"[Safety] Stopping {len(targets)} service(s): {', '.join(targets)}")
@@ -483,6 +960,7 @@ async def _live_state_loop() -> None:
             await _offline_safety_tick()
         except Exception as e:
             print(f"[Safety] tick error: {e}")
+        await _journal_save()
         await asyncio.sleep(LIVE_POLL_INTERVAL_S)
 
 
@@ -502,18 +980,222 @@ async def _autostart_services() -> None:
             print(f"   ✅ {name} autostarted (PID {result.get('pid')})")
 
 
+# ── Service history ───────────────────────────────────────────────────────────
+
+def _history_event(name: str, kind: str, detail: Optional[str] = None) -> None:
+    if _history:
+        _history.event(name, kind, detail)
+
+
+async def _timed_health(name: str):
+    t0 = time.perf_counter()
+    healthy = await _health_check(name)
+    return healthy, (time.perf_counter() - t0) * 1000.0
+
+
+async def _history_loop() -> None:
+    """Every HISTORY_SAMPLE_S: probe every local managed service, record status
+    transitions, and sample probe/CPU/RSS for the ones meant to be up."""
+    sampler = ResourceSampler()
+    while True:
+        await asyncio.sleep(HISTORY_SAMPLE_S)
+        try:
+            names = [n for n in _local_services() if SERVICE_DEFS[n].get("managed")]
+            probes = await asyncio.gather(*(_timed_health(n) for n in names))
+            # In-process services share our PID — their CPU/RSS isn't separable.
+            groups = {n: [p.pid for p in _procs.get(n, []) if p.poll() is None
+                          and not isinstance(p, InProcessService)] for n in names}
+            resources = await asyncio.to_thread(sampler.sample, groups)
+            now = time.time()
+            for name, (healthy, latency_ms) in zip(names, probes):
+                if name not in SERVICE_DEFS:
+                    continue
+                alive  = _procs_alive(name)
+                status = _status_of(name, alive, healthy)
+                prev   = _last_status.get(name)
+                if prev is not None and status != prev:
+                    _history.event(name, "status", f"{prev} → {status}", ts=now)
+                    if status == "offline" and prev in ("online", "unhealthy") and name in _expected_up:
+                        codes = [p.returncode for p in _procs.get(name, [])]
+                        _history.event(name, "exit", f"exit codes {codes}", ts=now)
+                _last_status[name] = status
+                if name in _expected_up and status not in ("starting", "stopping"):
+                    cpu, rss = resources.get(name, (None, None))
+                    _history.sample(name, healthy, latency_ms if healthy else None, cpu, rss, ts=now)
+        except Exception as e:
+            print(f"[History] ⚠️  sampler tick failed: {e}")
+
+
+# ── Hot reload of service definitions ────────────────────────────────────────
+
+_reload_lock = asyncio.Lock()
+
+
+def _load_fresh_defs():
+    """Re-run service_defs.py and re-apply the data file, without touching
+    the live SERVICE_DEFS. Raises on any problem."""
+    ns = runpy.run_path(service_defs.__file__, run_name="service_defs_reload")
+    defs    = copy.deepcopy(ns["BUILTIN_DEFS"])
+    retries = dict(ns["BUILTIN_RETRIES"])
+    service_defs.apply_overrides(defs, retries)
+    return defs, retries
+
+
+async def reload_defs() -> Dict[str, Any]:
+    """Validate the on-disk defs and apply them: removed services are stopped,
+    changed running ones restarted, cosmetic changes applied in place.
+    Nothing is touched unless the new defs validate."""
+    async with _reload_lock:
+        try:
+            defs, retries = await asyncio.to_thread(_load_fresh_defs)
+        except Exception as e:
+            return {"ok": False, "errors": [f"{type(e).__name__}: {e}"]}
+        errors = service_defs.validate_defs(defs, retries)
+        if errors:
+            return {"ok": False, "errors": errors}
+
+        diff = service_defs.diff_defs(SERVICE_DEFS, defs)
+        restart_needed = [n for n, keys in diff["changed"].items()
+                          if not set(keys) <= service_defs.RELOAD_IN_PLACE]
+        affected = diff["removed"] + restart_needed
+        busy = [n for n in affected if n in _starting or n in _stopping or n in _swapping]
+        if busy:
+            return {"ok": False, "busy": True,
+                    "errors": [f"{', '.join(busy)} busy starting/stopping — retry shortly"]}
+
+        to_stop = [n for n in affected if _is_local(n) and _procs_alive(n)]
+        restart = [n for n in to_stop if n in restart_needed]
+        if to_stop:
+            await asyncio.gather(*(stop_service(n) for n in to_stop))
+
+        # Mutate in place — every module holds a reference to these dicts.
+        SERVICE_DEFS.clear()
+        SERVICE_DEFS.update(defs)
+        BOOT_RETRIES.clear()
+        BOOT_RETRIES.update(retries)
+        for name in diff["removed"]:
+            _procs.pop(name, None)
+            _logs.pop(name, None)
+            _import_profiles.pop(name, None)
+            _importtime_on.discard(name)
+            _expected_up.discard(name)
+            _last_status.pop(name, None)
+        for name in diff["added"]:
+            _procs[name] = []
+            _logs[name] = _new_log(name)
+            _append_log(name, "➕ Added by definition reload")
+        for name, keys in diff["changed"].items():
+            if "log_rate" in keys:
+                _logs[name].rate = float(defs[name].get("log_rate", LOG_RATE))
+            _append_log(name, f"🔁 Definition reloaded (changed: {', '.join(keys)})")
+
+        for name in restart:
+            if _is_local(name):
+                asyncio.create_task(start_service(name))
+        await _journal_save()
+
+        if diff["added"] or diff["removed"] or diff["changed"]:
+            print(f"[Reload] 🔁 +{len(diff['added'])} -{len(diff['removed'])} "
+                  f"~{len(diff['changed'])} service def(s); restarting {restart or 'none'}")
+        return {"ok": True, **diff, "restarted": restart}
+
+
+async def _log_flush_loop() -> None:
+    """Write out `repeated ×N` runs of services that went quiet mid-run, so
+    they reach the archive and timeline followers. Reads only preview them;
+    this is the one place a run is committed without a new line arriving."""
+    while True:
+        await asyncio.sleep(REPEAT_FLUSH_S)
+        for log in list(_logs.values()):
+            log.flush(min_age_s=REPEAT_FLUSH_S)
+
+
+def _verify_adopted() -> int:
+    """Start-time check of every adopted PID; returns how many are still alive."""
+    alive = 0
+    for procs in list(_procs.values()):
+        for p in list(procs):
+            if isinstance(p, state_journal.AdoptedProcess) and p.verify() is None:
+                alive += 1
+    return alive
+
+
+async def _adopted_verify_loop() -> None:
+    """Catch PID reuse for processes adopted from the journal. The check may
+    shell out to `ps`, so it runs in a thread instead of inside poll(), which
+    route handlers and the history loop call on the event loop."""
+    while True:
+        await asyncio.sleep(state_journal.VERIFY_EVERY_S)
+        if not await asyncio.to_thread(_verify_adopted):
+            return  # all replaced or gone — nothing adopts mid-run
+
+
+def _defs_stamp():
+    stamps = []
+    for path in (service_defs.__file__, service_defs.SERVICES_FILE):
+        try:
+            stamps.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+async def _defs_watch_loop() -> None:
+    last = _defs_stamp()
+    while True:
+        await asyncio.sleep(WATCH_DEFS_S)
+        stamp = _defs_stamp()
+        if stamp == last:
+            continue
+        result = await reload_defs()
+        if not result["ok"]:
+            print(f"[Reload] ❌ Service defs not applied: {'; '.join(result['errors'])}")
+            if result.get("busy"):
+                continue  # same change, next tick
+        last = stamp
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global http_client
+    global http_client, _archive, _hub_tap, _history
     http_client = httpx.AsyncClient()
     try:
+        if LOOP_MONITOR_ENABLED:
+            _loop_monitor.start()
+        if ARCHIVE_ENABLED:
+            try:
+                _archive = log_archive.SessionArchive(ARCHIVE_DIR, keep=ARCHIVE_KEEP)
+                print(f"   🗄️  Archiving logs to {_archive.dir}")
+            except Exception as e:
+                print(f"   ⚠️  Log archive disabled: {e}")
+        if HISTORY_ENABLED:
+            try:
+                _history = HistoryStore(os.path.join(LAUNCHER_STATE_DIR, "history.sqlite3"))
+                asyncio.create_task(_history_loop())
+            except Exception as e:
+                print(f"   ⚠️  Service history disabled: {e}")
+        _journal_restore()
+        if any(isinstance(p, state_journal.AdoptedProcess) for ps in _procs.values() for p in ps):
+            asyncio.create_task(_adopted_verify_loop())
+        await _rolling_resume()
+        if DETACHED:
+            print(f"   🪢 Detached mode — services survive launcher restarts ({JOURNAL_PATH})")
+            rolling = [n for n in _local_services() if SERVICE_DEFS[n].get("rolling")]
+            if rolling:
+                print(f"   ⚠️  Rolling service(s) {', '.join(rolling)} lose their public port while the "
+                      f"launcher is down — their proxy runs inside it")
         print(f"🚀 Launcher ready on :{LAUNCHER_PORT}")
         print(f"   Desktop Monitor Python : {conda_python('gemini-screen-watcher')}")
         print(f"   Director Engine Python : {conda_python('director-engine')}")
         print(f"   Nami / TTS Python      : {conda_python('nami')}")
+        if IS_AGENT:
+            print(f"   🛰️  Agent mode — node {LAUNCHER_NODE!r}, managing {len(_local_services())} service(s)")
         for name, defn in SERVICE_DEFS.items():
             if not defn.get("managed"):
                 continue
+            if not _is_local(name):
+                print(f"   🛰️  {defn['label']:25s} → {defn.get('host', 'local')!r}")
+                continue
             if defn.get("steps"):
                 print(f"   ✅ {defn['label']:25s} → {len(defn['steps'])}-step service")
             elif defn.get("no_entry_check"):
@@ -527,17 +1209,50 @@ async def lifespan(app: FastAPI):
                     entry = defn["cmd"][-1]
                     print(f"   {'✅' if os.path.exists(entry) else '❌'} {defn['label']:25s} → {entry}")
 
-        # Kick off autostart in the background — don't block the HTTP server coming up.
-        asyncio.create_task(_autostart_services())
-        # Live-state driver: polls twitch_service, drives mic on stream.online/offline.
-        asyncio.create_task(_live_state_loop())
+        if not IS_AGENT:
+            _agents.start()
+            # Kick off autostart in the background — don't block the HTTP server coming up.
+            asyncio.create_task(_autostart_services())
+            # Live-state driver: polls twitch_service, drives mic on stream.online/offline.
+            asyncio.create_task(_live_state_loop())
+        asyncio.create_task(_log_flush_loop())
+        if WATCH_DEFS:
+            asyncio.create_task(_defs_watch_loop())
+        if HUB_TAP_ENABLED and not IS_AGENT:
+            _hub_tap = HubTap(HUB_URL)
+            await _hub_tap.start()
+            if not HubTap.available():
+                print(f"   ⚠️  Hub tap disabled: {_hub_tap.last_error}")
 
         yield
     finally:
-        for name in SERVICE_DEFS:
-            if _procs_alive(name):
-                print(f"  Stopping {name}...")
-                _kill_all(name)
+        if DETACHED:
+            for name in SERVICE_DEFS:
+                # In-process steps die with us, so the whole service goes —
+                # it can't be re-adopted whole (youtube_hub in static mode).
+                if any(isinstance(p, InProcessService) for p in _procs[name]):
+                    print(f"  Stopping {name} (hosted in-process, can't survive a restart)...")
+                    _kill_all(name)
+            await _journal_save()
+            running = [n for n in SERVICE_DEFS if _procs_alive(n)]
+            if running:
+                print(f"  Leaving {len(running)} detached service(s) running: {', '.join(running)}")
+        else:
+            for name in SERVICE_DEFS:
+                if _procs_alive(name):
+                    print(f"  Stopping {name}...")
+                    _kill_all(name)
+            await _journal_save()
+        if _replay:
+            await _replay.stop()
+        if _hub_tap:
+            await _hub_tap.stop()
+        await _agents.close()
+        _loop_monitor.stop()
+        if _history:
+            _history.close()
+        if _archive:
+            _archive.close()
         if http_client:
             await http_client.aclose()
 
@@ -550,18 +1265,49 @@ app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], all
 @app.get("/launcher/services")
 async def list_services():
     result = []
-    for name, defn in SERVICE_DEFS.items():
+    remote_nodes = sorted({SERVICE_DEFS[n].get("host", "local") for n in SERVICE_DEFS if not _is_local(n)})
+    remote: Dict[str, Any] = {}
+    if remote_nodes and not IS_AGENT:
+        for node, answer in (await _agents.services(remote_nodes)).items():
+            if isinstance(answer, Exception):
+                remote[node] = answer
+            else:
+                remote[node] = {s["id"]: s for s in answer}
+
+    for name, defn in list(SERVICE_DEFS.items()):
+        if not _is_local(name):
+            if IS_AGENT:
+                continue
+            node = defn.get("host", "local")
+            answer = remote.get(node)
+            entry = answer.get(name) if isinstance(answer, dict) else None
+            if entry is None:
+                entry = {
+                    "id":           name,
+                    "label":        defn["label"],
+                    "description":  defn.get("description", ""),
+                    "port":         defn["port"],
+                    "managed":      defn.get("managed", False),
+                    "health_check": defn.get("health_check", "tcp"),
+                    "status":       "unknown",
+                    "pid":          None,
+                    "agent_error":  str(answer) if isinstance(answer, Exception) else "not reported by agent",
+                }
+            result.append({**entry, "host": node})
+            continue
+
         alive   = _procs_alive(name)
         healthy = await _health_check(name)
+        if name not in SERVICE_DEFS:
+            continue  # removed by a reload meanwhile
 
-        if name in _starting:   status = "starting"
-        elif name in _stopping: status = "stopping"
-        elif healthy:           status = "online"
-        elif alive:             status = "unhealthy"
-        else:                   status = "offline"
+        status  = _status_of(name, alive, healthy)
 
         # Report the PID of the first process (launcher / primary)
         first_pid = _procs[name][0].pid if _procs[name] else None
+        log = _logs[name]
+        log_counts = log.counts
+        proxy = _proxies.get(name)
 
         result.append({
             "id":           name,
@@ -573,13 +1319,20 @@ async def list_services():
             "status":       status,
             "pid":          first_pid,
             "cwd":          defn.get("cwd", UI_DIR),
+            "error_count":  log_counts["error"],
+            "warn_count":   log_counts["warn"],
+            "hosting":      "inprocess" if any(isinstance(p, InProcessService) for p in _procs[name]) else "process",
+            "dropped_lines":    log.dropped,
+            "suppressed_lines": log.suppressed,
+            "host":         LAUNCHER_NODE,
+            "backend_port": proxy.backend if proxy else None,
         })
     return result
 
 
 @app.post("/launcher/services/{name}/start")
-async def start(name: str):
-    return await start_service(name)
+async def start(name: str, importtime: bool = False):
+    return await start_service(name, importtime=importtime)
 
 
 @app.post("/launcher/services/{name}/stop")
@@ -588,30 +1341,429 @@ async def stop(name: str):
 
 
 @app.post("/launcher/services/{name}/restart")
-async def restart(name: str):
+async def restart(name: str, mode: str = "auto"):
+    """`mode=auto` (default) does a zero-downtime rolling restart for services
+    with a `rolling` block that are running, and stop+start otherwise;
+    `mode=cold` always does stop+start."""
+    if mode not in ("auto", "rolling", "cold"):
+        raise HTTPException(400, f"Unknown restart mode: {mode}")
+    if name in SERVICE_DEFS and not _is_local(name):
+        return await _remote_call(name, "POST", f"/launcher/services/{name}/restart",
+                                  params={"mode": mode}, timeout=START_TIMEOUT)
+    defn = SERVICE_DEFS.get(name)
+    if mode == "rolling" and defn is not None and not defn.get("rolling"):
+        raise HTTPException(400, f"Service '{name}' has no rolling config")
+    if mode != "cold" and defn is not None and defn.get("rolling") and _procs_alive(name):
+        return await rolling_restart(name)
+    if name in _swapping:
+        return {"ok": False, "reason": "busy"}
     await stop_service(name)
     await asyncio.sleep(0.5)
     return await start_service(name)
 
 
 @app.get("/launcher/services/{name}/logs")
-async def get_logs(name: str, last: int = 150):
+async def get_logs(
+    name: str,
+    last: int = 150,
+    level: Optional[str] = None,
+    q: Optional[str] = None,
+    structured: bool = False,
+):
+    """Newest `last` lines, optionally only those at `level` or above
+    (`level=warn` means warn+error; `>=warn` is accepted too) and containing
+    the substring `q` (case-insensitive). `structured=true` adds the parsed
+    records alongside the legacy `lines` strings."""
     if name not in SERVICE_DEFS:
         raise HTTPException(404, f"Unknown service: {name}")
-    return {"lines": list(_logs[name])[-last:]}
+    if not _is_local(name):
+        params = {k: v for k, v in {"last": last, "level": level, "q": q,
+                                    "structured": structured}.items() if v is not None}
+        return await _remote_call(name, "GET", f"/launcher/services/{name}/logs", params=params)
+    try:
+        min_level = normalize_level(level)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    log = _logs[name]
+    records = log.query(last=last, min_level=min_level, contains=q)
+    payload: Dict[str, Any] = {
+        "lines":  [r.line for r in records],
+        "counts": dict(log.counts),
+        "errors": log.error_positions(),
+        "dropped":    log.dropped,
+        "suppressed": log.suppressed,
+    }
+    if structured:
+        payload["records"] = [r.to_dict() for r in records]
+    return payload
 
 
 @app.delete("/launcher/services/{name}/logs")
 async def clear_logs(name: str):
     if name not in SERVICE_DEFS:
         raise HTTPException(404, f"Unknown service: {name}")
+    if not _is_local(name):
+        return await _remote_call(name, "DELETE", f"/launcher/services/{name}/logs")
     _logs[name].clear()
     return {"ok": True}
 
 
+# ── Cross-service timeline ───────────────────────────────────────────────────
+
+TIMELINE_FOLLOW_S = 0.2
+TIMELINE_MAX      = 20000   # records per request
+
+
+def _timeline_entry(name: str, rec) -> Dict[str, Any]:
+    return {"service": name, **rec.to_dict(),
+            "time_ms": time.strftime("%H:%M:%S", time.localtime(rec.ts)) + f".{int(rec.ts * 1000) % 1000:03d}"}
+
+
+def _to_mono(t: Optional[float]) -> Optional[int]:
+    # Epoch seconds, or ≤ 0 for "seconds before now" (from=-5 → the last 5s).
+    if t is None:
+        return None
+    return wall_to_mono_ns(time.time() + t if t <= 0 else t)
+
+
+@app.get("/launcher/timeline")
+async def timeline(
+    request: Request,
+    services: Optional[str] = None,
+    from_ts: Optional[float] = Query(None, alias="from"),
+    to_ts:   Optional[float] = Query(None, alias="to"),
+    level:   Optional[str] = None,
+    limit:   int = Query(2000, ge=1, le=TIMELINE_MAX),
+    follow:  bool = False,
+):
+    """One stream of the chosen services' log records (comma-separated
+    `services`, default all local ones), ordered by ingest time to the
+    nanosecond. `from`/`to` are epoch seconds or ≤ 0 for "seconds ago".
+    With `follow=true` the response is NDJSON that keeps streaming new
+    records until the client disconnects."""
+    names = [n.strip() for n in services.split(",") if n.strip()] if services else _local_services()
+    unknown = [n for n in names if n not in SERVICE_DEFS]
+    if unknown:
+        raise HTTPException(404, f"Unknown service(s): {', '.join(unknown)}")
+    names = [n for n in names if _is_local(n)]
+    try:
+        min_rank = LEVEL_RANK[normalize_level(level)] if level else 0
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    mono_from, mono_to = _to_mono(from_ts), _to_mono(to_ts)
+
+    windows = {n: _logs[n].window(mono_from, mono_to) for n in names}
+    # Where each service's backlog ends, so following picks up right after it.
+    cursors = {n: (w[-1].seq if w else _logs[n].last_seq) for n, w in windows.items()}
+    merged = (e for e in merge_timeline(windows) if LEVEL_RANK[e[1].level] >= min_rank)
+
+    if not follow:
+        out = [_timeline_entry(n, r) for n, r in itertools.islice(merged, limit + 1)]
+        return {"services": names, "records": out[:limit], "truncated": len(out) > limit}
+
+    async def stream():
+        for n, r in itertools.islice(merged, limit):
+            yield json.dumps(_timeline_entry(n, r), ensure_ascii=False) + "\n"
+        while not await request.is_disconnected():
+            await asyncio.sleep(TIMELINE_FOLLOW_S)
+            fresh = {}
+            for n in names:
+                log = _logs.get(n)
+                if log is None:
+                    continue
+                recs = log.since(cursors[n])
+                if recs:
+                    cursors[n] = recs[-1].seq
+                    fresh[n] = recs
+            for n, r in merge_timeline(fresh):
+                if LEVEL_RANK[r.level] >= min_rank and (mono_to is None or r.mono < mono_to):
+                    yield json.dumps(_timeline_entry(n, r), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# ── Import profiling & bytecode pre-warm ─────────────────────────────────────
+
+@app.get("/launcher/services/{name}/imports")
+async def get_imports(name: str, top: int = 20, depth: int = 3):
+    """Slowest imports of the service's last boot started with importtime on."""
+    if name not in SERVICE_DEFS:
+        raise HTTPException(404, f"Unknown service: {name}")
+    if not _is_local(name):
+        return await _remote_call(name, "GET", f"/launcher/services/{name}/imports",
+                                  params={"top": top, "depth": depth})
+    profile = _import_profiles.get(name)
+    if profile is None:
+        raise HTTPException(404, f"No import profile for {name} — start it with ?importtime=true")
+    return {"service": name, **profile.report(top=top, depth=depth)}
+
+
+@app.get("/launcher/services/{name}/profile")
+async def profile_service(
+    name: str,
+    seconds:  float = Query(10.0, gt=0, le=live_profiler.MAX_SECONDS),
+    interval: float = Query(0.01, ge=live_profiler.MIN_INTERVAL, le=live_profiler.MAX_INTERVAL),
+    step: Optional[str] = None,
+    format: str = "json",
+):
+    """Sample a running service's stacks for `seconds` (needs "profiling": True
+    in its def). `format=collapsed` returns flamegraph.pl / speedscope text."""
+    if name not in SERVICE_DEFS:
+        raise HTTPException(404, f"Unknown service: {name}")
+    if format not in ("json", "collapsed"):
+        raise HTTPException(400, f"Unknown format: {format}")
+    if not _is_local(name):
+        params = {k: v for k, v in {"seconds": seconds, "interval": interval,
+                                    "step": step, "format": format}.items() if v is not None}
+        if format == "collapsed":
+            node = SERVICE_DEFS[name].get("host", "local")
+            try:
+                r = await _agents.get(node).client.get(f"/launcher/services/{name}/profile",
+                                                       params=params, timeout=seconds + 15.0)
+            except Exception as e:
+                raise HTTPException(502, f"agent {node} unreachable: {e}")
+            return PlainTextResponse(r.text, status_code=r.status_code)
+        return await _remote_call(name, "GET", f"/launcher/services/{name}/profile",
+                                  params=params, timeout=seconds + 15.0)
+    if not SERVICE_DEFS[name].get("profiling"):
+        raise HTTPException(400, f"Service '{name}' doesn't have profiling enabled in SERVICE_DEFS")
+    if not _procs_alive(name):
+        raise HTTPException(409, f"Service '{name}' is not running")
+
+    path = live_profiler.socket_path(name, step)
+    try:
+        result = await live_profiler.request_profile(path, seconds, interval)
+    except (OSError, asyncio.TimeoutError, RuntimeError, ValueError) as e:
+        raise HTTPException(502, f"Profiler for {name} not reachable at {path}: {e}")
+    if not result.get("ok"):
+        raise HTTPException(409, f"Profiler for {name}: {result.get('reason')}")
+    if format == "collapsed":
+        return PlainTextResponse(live_profiler.collapsed(result))
+    return {"service": name, **live_profiler.summarize(result)}
+
+
+async def _prewarm_service(name: str) -> Dict[str, Any]:
+    if not _is_local(name):
+        return await _remote_call(name, "POST", f"/launcher/services/{name}/prewarm", timeout=START_TIMEOUT)
+    targets = import_profile.prewarm_targets(SERVICE_DEFS[name], UI_DIR)
+    results = [await import_profile.prewarm(py, d) for py, d in targets]
+    ok = all(r["ok"] for r in results)
+    _append_log(name, f"{'✅' if ok else '⚠️ '} Bytecode pre-warm of {len(results)} dir(s) "
+                      f"{'done' if ok else 'had errors'}")
+    return {"ok": ok, "targets": results}
+
+
+@app.post("/launcher/services/{name}/prewarm")
+async def prewarm_one(name: str):
+    if name not in SERVICE_DEFS:
+        raise HTTPException(404, f"Unknown service: {name}")
+    return await _prewarm_service(name)
+
+
+@app.post("/launcher/prewarm")
+async def prewarm_all():
+    """Precompile every managed Python service's sources before booting."""
+    names = [n for n, d in SERVICE_DEFS.items() if d.get("managed")]
+    results = await asyncio.gather(*(_prewarm_service(n) for n in names), return_exceptions=True)
+    out = {}
+    for name, result in zip(names, results):
+        out[name] = {"ok": False, "reason": str(result)} if isinstance(result, Exception) else result
+    return {"ok": all(r.get("ok") for r in out.values()), "services": out}
+
+
+# ── Session log archives ─────────────────────────────────────────────────────
+
+@app.get("/launcher/archive")
+async def list_archives():
+    return {
+        "current":  _archive.session_id if _archive else None,
+        "sessions": log_archive.list_sessions(ARCHIVE_DIR),
+    }
+
+
+@app.get("/launcher/archive/{session}/{name}")
+async def download_archive(
+    session: str,
+    name: str,
+    from_ts: Optional[float] = Query(None, alias="from"),
+    to_ts:   Optional[float] = Query(None, alias="to"),
+    decompress: bool = False,
+):
+    """Stream a service's archived output for one session.
+
+    Without a time window the compressed file is streamed as-is; with
+    `from`/`to` (epoch seconds) — or `decompress=true` — only the matching
+    chunks are decompressed, one at a time, and streamed as JSONL."""
+    if _archive and session == _archive.session_id:
+        await asyncio.to_thread(_archive.flush)
+    path = log_archive.find_archive(ARCHIVE_DIR, session, name)
+    if not path:
+        raise HTTPException(404, f"No archive for {name} in session {session}")
+
+    if from_ts is None and to_ts is None and not decompress:
+        fname = os.path.basename(path)
+        return StreamingResponse(
+            log_archive.iter_raw(path),
+            media_type=log_archive.media_type_for(path),
+            headers={"Content-Disposition": f'attachment; filename="{session}-{fname}"'},
+        )
+    return StreamingResponse(
+        log_archive.iter_slice(path, from_ts, to_ts),
+        media_type="application/x-ndjson",
+    )
+
+
+# ── Hub traffic ─────────────────────────────────────────────────────────────
+
+@app.get("/launcher/hub_stats")
+async def hub_stats():
+    if not _hub_tap:
+        return {"enabled": False, "reason": "set LAUNCHER_HUB_TAP=1 to enable"}
+    return {"enabled": True, **_hub_tap.snapshot()}
+
+
+# ── Chat-replay load generator ───────────────────────────────────────────────
+
+class LoadgenStart(BaseModel):
+    hub:        Optional[str]   = None      # defaults to LAUNCHER_HUB_URL
+    speed:      float           = 1.0
+    rate:       Optional[float] = None      # constant events/s; overrides speed
+    burst:      Optional[Dict[str, float]] = None   # {every_s, size, rate}
+    duration_s: Optional[float] = 300.0     # wall-clock seconds of sending
+
+
+@app.post("/launcher/loadgen/start")
+async def loadgen_start(req: LoadgenStart):
+    """Replay past-chats into the hub and measure reply latency (see chat_replay.py)."""
+    global _replay
+    if _replay and _replay.state in ("idle", "running"):
+        raise HTTPException(409, "A replay is already running")
+    try:
+        run = ReplayRun(req.hub or HUB_URL, speed=req.speed, rate=req.rate,
+                        burst=req.burst, duration_s=req.duration_s)
+    except (RuntimeError, ValueError) as e:
+        raise HTTPException(400, str(e))
+    _replay = run
+    run.start()
+    pace = f"{req.rate:g}/s" if req.rate else f"{req.speed:g}×"
+    print(f"[Loadgen] 📣 Replaying {len(run.corpus)} lines into {run.hub_url} at {pace}")
+    return {"ok": True, "lines": len(run.corpus)}
+
+
+@app.post("/launcher/loadgen/stop")
+async def loadgen_stop():
+    if not _replay:
+        raise HTTPException(404, "No replay has been started")
+    await _replay.stop()
+    return _replay.report()
+
+
+@app.get("/launcher/loadgen")
+async def loadgen_status():
+    if not _replay:
+        return {"state": "idle"}
+    return _replay.report()
+
+
+# ── Pipeline latency spans ───────────────────────────────────────────────────
+
+@app.post("/launcher/spans")
+async def post_spans(request: Request):
+    """Ingest a batch of timing spans (JSON or line protocol, see span_collector)."""
+    body = await request.body()
+    try:
+        spans = parse_batch(body, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(400, f"Bad span batch: {e}")
+    return {"ok": True, "accepted": _spans.add(spans)}
+
+
+@app.get("/launcher/traces/stats")
+async def trace_stats(window: Optional[float] = None):
+    if window is not None and not (math.isfinite(window) and window > 0):
+        raise HTTPException(400, f"window must be a positive number of seconds, got {window}")
+    return _spans.stats(window)
+
+
+@app.get("/launcher/traces")
+async def recent_traces(last: int = 20):
+    return {"traces": _spans.recent(last)}
+
+
+@app.get("/launcher/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    trace = _spans.trace(trace_id)
+    if trace is None:
+        raise HTTPException(404, f"Unknown trace: {trace_id}")
+    return trace
+
+
+@app.get("/launcher/loop_stats")
+async def loop_stats(window: float = 60.0):
+    """Scheduling-delay histogram of the launcher's own event loop, plus the
+    callbacks that blocked it for longer than LAUNCHER_SLOW_CALLBACK_MS."""
+    if not LOOP_MONITOR_ENABLED:
+        return {"enabled": False}
+    return {"enabled": True, **_loop_monitor.snapshot(window)}
+
+
+# ── Service history ───────────────────────────────────────────────────────────
+
+def _require_history() -> HistoryStore:
+    if not _history:
+        raise HTTPException(404, "Service history is disabled (LAUNCHER_HISTORY=0)")
+    return _history
+
+
+@app.get("/launcher/history")
+async def history_summary(
+    service: Optional[str] = None,
+    days: float = Query(7.0, gt=0, le=HOUR_KEEP / 86400),
+):
+    """Uptime %, starts, crashes and per-day CPU/RSS/latency trends per
+    service over the last `days`, from the minute/hour rollups."""
+    store = _require_history()
+    return await asyncio.to_thread(store.summary, service, days)
+
+
+@app.get("/launcher/history/{name}/series")
+async def history_series(
+    name: str,
+    resolution: str = "minute",
+    hours: float = Query(24.0, gt=0, le=HOUR_KEEP / 3600),
+):
+    if resolution not in ("minute", "hour"):
+        raise HTTPException(400, "resolution must be 'minute' or 'hour'")
+    store = _require_history()
+    return {"service": name, "resolution": resolution,
+            "points": await asyncio.to_thread(store.series, name, resolution, hours)}
+
+
+@app.get("/launcher/history/{name}/events")
+async def history_events(name: str, last: int = Query(100, ge=1, le=HISTORY_EVENTS_MAX)):
+    store = _require_history()
+    return {"service": name, "events": await asyncio.to_thread(store.events, name, last)}
+
+
+@app.get("/launcher/agents")
+async def list_agents():
+    return {"node": LAUNCHER_NODE, "role": LAUNCHER_ROLE,
+            "agents": [l.status() for l in _agents.links.values()]}
+
+
+@app.post("/launcher/reload")
+async def reload_service_defs():
+    """Re-read service_defs.py / services.json and apply what changed."""
+    result = await reload_defs()
+    if not result["ok"]:
+        raise HTTPException(409 if result.get("busy") else 400, result["errors"])
+    return result
+
+
 @app.get("/launcher/health")
 async def health():
-    return {"status": "ok", "service": "launcher", "port": LAUNCHER_PORT}
+    return {"status": "ok", "service": "launcher", "port": LAUNCHER_PORT,
+            "role": LAUNCHER_ROLE, "node": LAUNCHER_NODE}
 
 
 # ── Live state ───────────────────────────────────────────────────────────────
@@ -0,0 +1,102 @@
+"""
+Launcher side of the on-demand sampling profiler.
+
+Services whose def has "profiling": True get profiler_bootstrap/ prepended
+to PYTHONPATH and a control-socket path in NAMI_PROFILER_SOCKET (see
+profiler_bootstrap/sitecustomize.py). `request_profile` asks a running
+service to sample itself for N seconds and returns the aggregated stacks,
+which `collapsed` turns into the `frame;frame;frame count` text that
+flamegraph.pl and speedscope read directly.
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# Same limits the bootstrap enforces on its side.
+MAX_SECONDS  = 300.0
+MIN_INTERVAL = 0.001
+MAX_INTERVAL = 1.0
+
+BOOTSTRAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiler_bootstrap")
+
+# Unix socket paths are limited to ~104 bytes on macOS, so keep them short
+# rather than under the (possibly deep) launcher state dir.
+SOCKET_DIR = os.environ.get(
+    "LAUNCHER_PROFILER_DIR",
+    f"/tmp/nami-profiler-{os.getuid()}" if hasattr(os, "getuid") else os.path.join(BOOTSTRAP_DIR, ".sockets"),
+)
+
+
+def socket_path(name: str, step: Optional[str] = None) -> str:
+    suffix = "" if step is None else "." + "".join(c if c.isalnum() else "_" for c in step)
+    return os.path.join(SOCKET_DIR, f"{name}{suffix}.sock")
+
+
+def bootstrap_env(env: Dict[str, str], name: str, step: Optional[str] = None) -> None:
+    """Add the bootstrap to a child's environment, in place."""
+    os.makedirs(SOCKET_DIR, mode=0o700, exist_ok=True)
+    existing = env.get("PYTHONPATH")
+    env["PYTHONPATH"] = BOOTSTRAP_DIR + (os.pathsep + existing if existing else "")
+    env["NAMI_PROFILER_SOCKET"] = socket_path(name, step)
+
+
+async def _call(path: str, request: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    if sys.platform == "win32":
+        raise RuntimeError("live profiling needs Unix domain sockets")
+    reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(path), 2.0)
+    try:
+        writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+    finally:
+        writer.close()
+    if not line:
+        raise RuntimeError("profiler closed the connection")
+    return json.loads(line)
+
+
+def check_params(seconds: float, interval: float) -> None:
+    """Raise ValueError unless seconds/interval are finite and within limits."""
+    if not (math.isfinite(seconds) and 0 < seconds <= MAX_SECONDS):
+        raise ValueError(f"seconds must be in (0, {MAX_SECONDS:g}], got {seconds}")
+    if not (math.isfinite(interval) and MIN_INTERVAL <= interval <= MAX_INTERVAL):
+        raise ValueError(f"interval must be in [{MIN_INTERVAL:g}, {MAX_INTERVAL:g}], got {interval}")
+
+
+async def request_profile(path: str, seconds: float, interval: float) -> Dict[str, Any]:
+    check_params(seconds, interval)
+    return await _call(path, {"cmd": "profile", "seconds": seconds, "interval": interval},
+                       timeout=seconds + 10.0)
+
+
+def summarize(result: Dict[str, Any], top: int = 30) -> Dict[str, Any]:
+    """Stacks sorted hottest-first, plus per-function self/total sample counts."""
+    stacks = result.get("stacks", {})
+    self_counts: Dict[str, int] = {}
+    total_counts: Dict[str, int] = {}
+    for stack, n in stacks.items():
+        frames = stack.split(";")
+        self_counts[frames[-1]] = self_counts.get(frames[-1], 0) + n
+        for f in set(frames[1:]):
+            total_counts[f] = total_counts.get(f, 0) + n
+
+    def ranked(counts: Dict[str, int]) -> List[Dict[str, Any]]:
+        return [{"frame": f, "samples": n}
+                for f, n in sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:top]]
+
+    return {
+        **{k: v for k, v in result.items() if k != "stacks"},
+        "top_self":  ranked(self_counts),
+        "top_total": ranked(total_counts),
+        "stacks":    [{"stack": s, "samples": n}
+                      for s, n in sorted(stacks.items(), key=lambda kv: kv[1], reverse=True)],
+    }
+
+
+def collapsed(result: Dict[str, Any]) -> str:
+    return "".join(f"{stack} {n}\n" for stack, n in
+                   sorted(result.get("stacks", {}).items(), key=lambda kv: kv[1], reverse=True))
@@ -0,0 +1,296 @@
+"""
+Compressed per-session log archives for the Nami Launcher.
+
+Every launcher run opens a session directory under the launcher state dir
+and appends every record each service logs to `<service>.jsonl.<ext>`.
+The in-memory ServiceLog deques only keep the last 500 lines; the archive
+keeps everything, so a multi-hour stream can be pulled for post-mortem.
+
+Layout of one session:
+
+    sessions/20260612-181502/
+        director.jsonl.gz      concatenated, independently-compressed chunks
+        director.idx           one JSON line per chunk: t0, t1, off, len, n
+
+Chunks are compressed on a background writer thread; the ingest hot path
+(`submit`) only enqueues. Because each chunk is a complete gzip member (or
+zstd frame), the whole file is still a valid `.gz`/`.zst` — it can be
+streamed out as-is — and a time slice only needs the chunks whose [t0, t1]
+overlaps the requested window, each decompressed on its own.
+
+zstd is used when the optional `zstandard` package is installed; otherwise
+gzip from the standard library.
+"""
+
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+CHUNK_BYTES   = 256 * 1024   # flush a service's buffer once it reaches this size…
+CHUNK_SECONDS = 5.0          # …or once its oldest record is this old
+READ_BLOCK    = 64 * 1024
+
+_SESSION_RE = re.compile(r"^\d{8}-\d{6}$")
+
+
+# ── Codecs ────────────────────────────────────────────────────────────────────
+
+class _GzipCodec:
+    ext = "gz"
+    media_type = "application/gzip"
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=6)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class _ZstdCodec:
+    ext = "zst"
+    media_type = "application/zstd"
+
+    def __init__(self) -> None:
+        self._c = zstandard.ZstdCompressor(level=3)
+        self._d = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._d.decompress(data)
+
+
+def _pick_codec(name: Optional[str] = None):
+    name = (name or os.environ.get("LAUNCHER_ARCHIVE_CODEC", "")).lower()
+    if name == "gzip":
+        return _GzipCodec()
+    if zstandard is not None and name in ("", "zstd"):
+        return _ZstdCodec()
+    return _GzipCodec()
+
+
+def _codec_for_ext(ext: str):
+    if ext == "zst":
+        if zstandard is None:
+            raise RuntimeError("Archive is zstd-compressed but `zstandard` is not installed")
+        return _ZstdCodec()
+    return _GzipCodec()
+
+
+# ── Writer ────────────────────────────────────────────────────────────────────
+
+class _Pending:
+    __slots__ = ("parts", "size", "n", "t0", "t1", "opened")
+
+    def __init__(self) -> None:
+        self.parts: List[bytes] = []
+        self.size = 0
+        self.n = 0
+        self.t0 = 0.0
+        self.t1 = 0.0
+        self.opened = 0.0
+
+
+class SessionArchive:
+    """Background-compressed archive of one launcher session."""
+
+    def __init__(self, root: str, codec: Optional[str] = None, keep: int = 20) -> None:
+        self.root = root
+        self.session_id = time.strftime("%Y%m%d-%H%M%S")
+        self.dir = os.path.join(root, self.session_id)
+        os.makedirs(self.dir, exist_ok=True)
+        self._codec = _pick_codec(codec)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending: Dict[str, _Pending] = {}
+        self._thread = threading.Thread(target=self._run, name="log-archive", daemon=True)
+        self._closed = False
+        self._failing: Dict[str, str] = {}   # service → last write error, until a write succeeds
+        self.lost = 0                         # records dropped because their chunk couldn't be written
+        _prune_sessions(root, keep)
+        self._thread.start()
+
+    # Hot path: called from the pipe reader threads for every line.
+    def submit(self, name: str, record: Dict[str, Any]) -> None:
+        if not self._closed:
+            self._queue.put((name, record))
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Write out every buffered chunk now (e.g. before serving this session)."""
+        done = threading.Event()
+        self._queue.put(("__flush__", done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=10.0)
+
+    def _paths(self, name: str):
+        base = os.path.join(self.dir, name)
+        return f"{base}.jsonl.{self._codec.ext}", f"{base}.idx"
+
+    def _write_chunk(self, name: str, pend: _Pending) -> None:
+        if not pend.n:
+            return
+        blob = self._codec.compress(b"".join(pend.parts))
+        data_path, idx_path = self._paths(name)
+        with open(data_path, "ab") as f:
+            off = f.tell()
+            f.write(blob)
+        entry = {"t0": pend.t0, "t1": pend.t1, "off": off, "len": len(blob), "n": pend.n}
+        with open(idx_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._pending[name] = _Pending()
+
+    def _try_write(self, name: str, pend: _Pending) -> None:
+        try:
+            self._write_chunk(name, pend)
+        except Exception as e:
+            # Drop the chunk rather than keep buffering into a broken file —
+            # otherwise the buffer grows for as long as the disk stays broken.
+            self._pending[name] = _Pending()
+            self.lost += pend.n
+            if name not in self._failing:
+                print(f"[Archive] ❌ write failed for {name}: {e} — dropping its records until writes succeed")
+            self._failing[name] = str(e)
+        else:
+            if self._failing.pop(name, None) is not None:
+                print(f"[Archive] ✅ writes for {name} recovered")
+
+    def _flush_all(self) -> None:
+        for name, pend in list(self._pending.items()):
+            self._try_write(name, pend)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                self._flush_all()
+                return
+            if item:
+                name, payload = item
+                if name == "__flush__":
+                    self._flush_all()
+                    payload.set()
+                    continue
+                pend = self._pending.get(name)
+                if pend is None:
+                    pend = self._pending[name] = _Pending()
+                line = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+                ts = payload.get("ts", time.time())
+                if not pend.n:
+                    pend.t0 = ts
+                    pend.opened = time.monotonic()
+                pend.t1 = ts
+                pend.parts.append(line)
+                pend.size += len(line)
+                pend.n += 1
+                if pend.size >= CHUNK_BYTES:
+                    self._try_write(name, pend)
+
+            now = time.monotonic()
+            for name, pend in list(self._pending.items()):
+                if pend.n and now - pend.opened >= CHUNK_SECONDS:
+                    self._try_write(name, pend)
+
+
+def _prune_sessions(root: str, keep: int) -> None:
+    sessions = list_sessions(root)
+    for s in sessions[keep:]:
+        shutil.rmtree(os.path.join(root, s["session"]), ignore_errors=True)
+
+
+# ── Readers ───────────────────────────────────────────────────────────────────
+
+def list_sessions(root: str) -> List[Dict[str, Any]]:
+    """Sessions newest-first, with each archived service's compressed size."""
+    if not os.path.isdir(root):
+        return []
+    out = []
+    for sid in sorted(os.listdir(root), reverse=True):
+        sdir = os.path.join(root, sid)
+        if not _SESSION_RE.match(sid) or not os.path.isdir(sdir):
+            continue
+        services = {}
+        for fname in os.listdir(sdir):
+            if ".jsonl." in fname:
+                services[fname.split(".jsonl.")[0]] = os.path.getsize(os.path.join(sdir, fname))
+        out.append({"session": sid, "services": services})
+    return out
+
+
+def find_archive(root: str, session: str, service: str) -> Optional[str]:
+    """Path of the service's archive in `session`, or None. Rejects traversal."""
+    if not _SESSION_RE.match(session) or not re.match(r"^[\w.-]+$", service):
+        return None
+    sdir = os.path.join(root, session)
+    for ext in ("zst", "gz"):
+        path = os.path.join(sdir, f"{service}.jsonl.{ext}")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def media_type_for(path: str) -> str:
+    return "application/zstd" if path.endswith(".zst") else "application/gzip"
+
+
+def iter_raw(path: str) -> Iterator[bytes]:
+    """Stream the compressed file as-is (it is a valid .gz / .zst)."""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(READ_BLOCK)
+            if not block:
+                return
+            yield block
+
+
+def iter_slice(path: str, t_from: Optional[float] = None,
+               t_to: Optional[float] = None) -> Iterator[bytes]:
+    """Stream decompressed JSONL records with t_from <= ts <= t_to.
+
+    Only chunks overlapping the window are read; at most one chunk is
+    decompressed in memory at a time.
+    """
+    codec = _codec_for_ext(path.rsplit(".", 1)[-1])
+    idx_path = path.rsplit(".jsonl.", 1)[0] + ".idx"
+    lo = t_from if t_from is not None else float("-inf")
+    hi = t_to if t_to is not None else float("inf")
+
+    with open(idx_path, encoding="utf-8") as idx, open(path, "rb") as data:
+        for raw in idx:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue  # half-written trailing line
+            if entry["t1"] < lo or entry["t0"] > hi:
+                continue
+            data.seek(entry["off"])
+            chunk = codec.decompress(data.read(entry["len"]))
+            if lo <= entry["t0"] and entry["t1"] <= hi:
+                yield chunk
+                continue
+            for line in chunk.splitlines(keepends=True):
+                try:
+                    ts = json.loads(line).get("ts", 0.0)
+                except ValueError:
+                    continue
+                if lo <= ts <= hi:
+                    yield line
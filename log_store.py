@@ -0,0 +1,374 @@
+"""
+Structured per-service log buffers for the Nami Launcher.
+
+Every line a managed service writes is parsed once, on ingest, into a
+LogRecord (timestamp, level, source step, message). Each ServiceLog keeps
+per-level counters and a small index of where the errors sit in the buffer,
+so `/launcher/services/{name}/logs?level=error` can jump straight to them
+instead of scanning (or shipping) all 500 lines.
+
+Severity is inferred from the conventions the services already use:
+emoji prefixes (❌ ⚠️ ✅), `ERROR:` / `WARNING:` style prefixes from the
+logging module, and Python tracebacks (every line of a traceback is an error).
+
+Ingest is also where a misbehaving child is kept in check, before any
+parsing happens:
+  - identical consecutive lines (per step, ignoring the child's own
+    timestamp) are counted instead of stored, and written out as a single
+    `↻ repeated ×N` record when the run ends or every REPEAT_FLUSH_S (the
+    launcher sweeps pending runs, so a service that goes quiet mid-run
+    still gets its record). Snapshot reads show a run still in progress
+    as an unstored preview record, so polling never commits one early
+  - a per-service token bucket (`rate` lines/s, `burst` deep) drops what
+    is left over; a `dropped N lines` record marks the gap once the
+    service calms down
+Both are counted (`suppressed`, `dropped`) so the panel can show them.
+
+Besides the wall-clock `ts`, every record carries `mono` — time.monotonic_ns()
+at ingest. It never goes backwards, so each buffer is already sorted by it
+and several services' buffers can be interleaved with a lazy k-way merge
+(`merge_timeline`) instead of a copy-and-sort.
+"""
+
+import heapq
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+LEVELS: List[str] = ["debug", "info", "warn", "error"]
+LEVEL_RANK: Dict[str, int] = {lvl: i for i, lvl in enumerate(LEVELS)}
+
+# Accepted spellings for the `level` query parameter.
+_LEVEL_ALIASES: Dict[str, str] = {
+    "debug":    "debug",
+    "info":     "info",
+    "warn":     "warn",
+    "warning":  "warn",
+    "error":    "error",
+    "err":      "error",
+    "critical": "error",
+    "fatal":    "error",
+}
+
+# Match leading `[HH:MM:SS]` or `[HH:MM:SS.fff]` stamps the child already wrote.
+_PRESTAMP_RE = re.compile(r"^\[(\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?)\]\s")
+
+# "Exception" only counts in traceback shapes (`FooError: …`, `pkg.BarException: …`,
+# `Exception in thread …`) — not as a word in ordinary prose.
+_ERROR_RE = re.compile(
+    r"❌|🔥|\b(ERROR|CRITICAL|FATAL)\b|\bTraceback \(most recent call last\)"
+    r"|^[\w.]*(Error|Exception):|^Exception in\b",
+)
+_WARN_RE  = re.compile(r"⚠|(?i:\b(warn|warning)\b)|\w+Warning\b")
+_DEBUG_RE = re.compile(r"^\s*(DEBUG\b|\[DEBUG\])")
+
+_TRACEBACK_START = "Traceback (most recent call last):"
+
+DEFAULT_RATE   = 200.0    # sustained lines/s per service
+DEFAULT_BURST  = 1000.0   # bucket depth — a normal boot banner never hits it
+REPEAT_FLUSH_S = 5.0      # long repeat runs are reported at least this often
+
+
+def normalize_level(level: Optional[str]) -> Optional[str]:
+    """Map a user-supplied level name (or `>=warn` form) to a canonical level."""
+    if not level:
+        return None
+    key = level.strip().lstrip(">=").strip().lower()
+    if key not in _LEVEL_ALIASES:
+        raise ValueError(f"Unknown log level: {level!r} (expected one of {', '.join(LEVELS)})")
+    return _LEVEL_ALIASES[key]
+
+
+def wall_to_mono_ns(wall: float) -> int:
+    """Map an epoch timestamp onto the monotonic clock records carry."""
+    return time.monotonic_ns() - int((time.time() - wall) * 1e9)
+
+
+class LogRecord:
+    __slots__ = ("seq", "ts", "mono", "time", "level", "step", "message")
+
+    def __init__(self, seq: int, ts: float, mono: int, time_str: str, level: str,
+                 step: Optional[str], message: str) -> None:
+        self.seq     = seq
+        self.ts      = ts
+        self.mono    = mono
+        self.time    = time_str
+        self.level   = level
+        self.step    = step
+        self.message = message
+
+    @property
+    def line(self) -> str:
+        """The legacy `[HH:MM:SS] message` rendering the log panel shows."""
+        return f"[{self.time}] {self.message}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq":     self.seq,
+            "ts":      self.ts,
+            "mono_ns": self.mono,
+            "time":    self.time,
+            "level":   self.level,
+            "step":    self.step,
+            "message": self.message,
+        }
+
+
+class ServiceLog:
+    """Bounded, thread-safe record buffer for one service.
+
+    Reader threads (one per child pipe) append; the event loop queries.
+    Records carry a monotonically increasing `seq`, so a record's position in
+    the deque is always `seq - first_seq` — that's what the error index stores.
+    """
+
+    def __init__(
+        self,
+        maxlen: int = 500,
+        error_index_len: int = 64,
+        rate: float = DEFAULT_RATE,
+        burst: float = DEFAULT_BURST,
+        sink: Optional[Callable[[LogRecord], None]] = None,
+    ) -> None:
+        self._lock       = threading.Lock()
+        self._records: Deque[LogRecord] = deque(maxlen=maxlen)
+        self._errors:  Deque[int]       = deque(maxlen=error_index_len)
+        self._next_seq   = 0
+        self._in_tb: Dict[Optional[str], bool] = {}
+        self.counts: Dict[str, int] = {lvl: 0 for lvl in LEVELS}
+        # Every stored record (including synthetic ones) is also handed to
+        # `sink`, e.g. the session archive.
+        self.sink        = sink
+        self.rate        = rate
+        self.burst       = burst
+        self._tokens     = burst
+        self._refilled   = time.monotonic()
+        self.dropped     = 0
+        self._dropped_run = 0
+        self.suppressed  = 0
+        # step → [message, level, repeat count, run start (monotonic)]
+        self._last: Dict[Optional[str], List[Any]] = {}
+
+    # ── Ingest ───────────────────────────────────────────────────────────────
+
+    def _classify(self, step: Optional[str], message: str) -> str:
+        # Tracebacks span many lines; only the first one says "Traceback".
+        # Indented continuation lines and the final `FooError: ...` line
+        # belong to it too. Tracked per step since steps share one buffer.
+        if message.startswith(_TRACEBACK_START):
+            self._in_tb[step] = True
+            return "error"
+        if self._in_tb.get(step):
+            if message[:1].isspace() or not message:
+                return "error"
+            self._in_tb[step] = False
+            return "error"
+        if _ERROR_RE.search(message):
+            return "error"
+        if _WARN_RE.search(message):
+            return "warn"
+        if _DEBUG_RE.match(message):
+            return "debug"
+        return "info"
+
+    def _store(self, now: float, time_str: str, level: str,
+               step: Optional[str], message: str) -> LogRecord:
+        rec = LogRecord(self._next_seq, now, time.monotonic_ns(), time_str, level, step, message)
+        self._next_seq += 1
+        self._records.append(rec)
+        self.counts[level] += 1
+        if level == "error":
+            self._errors.append(rec.seq)
+        if self.sink is not None:
+            self.sink(rec)
+        return rec
+
+    def _flush_repeat(self, step: Optional[str], now: float) -> None:
+        last = self._last.get(step)
+        if last is None or last[2] == 0:
+            return
+        message, level, n, _ = last
+        self._store(now, time.strftime("%H:%M:%S", time.localtime(now)), level, step,
+                    f"↻ repeated ×{n}: {message[:120]}")
+        last[2] = 0
+        last[3] = time.monotonic()
+
+    def _take_token(self) -> bool:
+        mono = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (mono - self._refilled) * self.rate)
+        self._refilled = mono
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def append(self, line: str, step: Optional[str] = None) -> Optional[LogRecord]:
+        """Ingest one line. Returns its record, or None if it was collapsed
+        into a repeat run or dropped by the rate limit."""
+        stripped = line.rstrip()
+        now = time.time()
+        # If the child already wrote a timestamp at write-time, trust it — it's
+        # more accurate than our read-time clock when the pipe drains in a burst.
+        m = _PRESTAMP_RE.match(stripped)
+        if m:
+            time_str = m.group(1)
+            message  = stripped[m.end():]
+        else:
+            time_str = None
+            message  = stripped
+
+        with self._lock:
+            last = self._last.get(step)
+            if last is not None and last[0] == message:
+                last[2] += 1
+                self.suppressed += 1
+                if time.monotonic() - last[3] >= REPEAT_FLUSH_S:
+                    self._flush_repeat(step, now)
+                return None
+
+            if not self._take_token():
+                self.dropped += 1
+                self._dropped_run += 1
+                return None
+
+            if time_str is None:
+                time_str = time.strftime("%H:%M:%S", time.localtime(now))
+            self._flush_repeat(step, now)
+            if self._dropped_run:
+                self._store(now, time_str, "warn", None,
+                            f"⚠️  {self._dropped_run} line(s) dropped — over {self.rate:g} lines/s")
+                self._dropped_run = 0
+            level = self._classify(step, message)
+            self._last[step] = [message, level, 0, time.monotonic()]
+            return self._store(now, time_str, level, step, message)
+
+    def flush(self, min_age_s: float = 0.0) -> None:
+        """Write out pending `repeated ×N` records — only those whose run has
+        gone unreported for at least `min_age_s` (the periodic sweep)."""
+        now = time.time()
+        mono = time.monotonic()
+        with self._lock:
+            for step, last in list(self._last.items()):
+                if mono - last[3] >= min_age_s:
+                    self._flush_repeat(step, now)
+
+    def _pending(self) -> List[LogRecord]:
+        """Unstored previews of the repeat runs still being counted. They
+        reuse the last stored seq so followers' cursors stay valid; the
+        real record arrives later through `flush` or the next line."""
+        now = time.time()
+        time_str = time.strftime("%H:%M:%S", time.localtime(now))
+        return [LogRecord(self._next_seq - 1, now, time.monotonic_ns(), time_str, level, step,
+                          f"↻ repeated ×{n}: {message[:120]}")
+                for step, (message, level, n, _) in self._last.items() if n]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            self._errors.clear()
+            self._in_tb.clear()
+            self._last.clear()
+            self.counts = {lvl: 0 for lvl in LEVELS}
+            self.dropped = self.suppressed = self._dropped_run = 0
+
+    # ── Query ────────────────────────────────────────────────────────────────
+
+    def _first_seq(self) -> int:
+        return self._records[0].seq if self._records else self._next_seq
+
+    def error_positions(self) -> List[int]:
+        """Seqs of indexed errors still present in the buffer (oldest first)."""
+        with self._lock:
+            first = self._first_seq()
+            return [s for s in self._errors if s >= first]
+
+    def query(
+        self,
+        last: int = 150,
+        min_level: Optional[str] = None,
+        contains: Optional[str] = None,
+    ) -> List[LogRecord]:
+        """Return up to `last` newest records matching the filters, oldest first."""
+        if last <= 0:
+            return []
+        needle = contains.lower() if contains else None
+        with self._lock:
+            pending = self._pending()
+            if min_level == "error" and len(self._errors) < self._errors.maxlen:
+                # The index covers every error still buffered — no scan needed.
+                first = self._first_seq()
+                candidates = [self._records[s - first] for s in self._errors if s >= first]
+            elif min_level is None and needle is None:
+                return (list(self._records) + pending)[-last:]
+            else:
+                candidates = list(self._records)
+        candidates += pending
+
+        rank = LEVEL_RANK[min_level] if min_level else 0
+        out: List[LogRecord] = []
+        for rec in reversed(candidates):
+            if LEVEL_RANK[rec.level] < rank:
+                continue
+            if needle is not None and needle not in rec.message.lower():
+                continue
+            out.append(rec)
+            if len(out) >= last:
+                break
+        out.reverse()
+        return out
+
+    def _bisect_mono(self, mono: int) -> int:
+        """Index of the first buffered record with `mono` >= the given one."""
+        lo, hi = 0, len(self._records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._records[mid].mono < mono:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, mono_from: Optional[int] = None, mono_to: Optional[int] = None) -> List[LogRecord]:
+        """Records with mono_from <= mono < mono_to, oldest first. Only the
+        window itself is copied out of the buffer."""
+        with self._lock:
+            lo = self._bisect_mono(mono_from) if mono_from is not None else 0
+            hi = self._bisect_mono(mono_to) if mono_to is not None else len(self._records)
+            out = list(itertools.islice(self._records, lo, hi))
+            out += [r for r in self._pending()
+                    if (mono_from is None or r.mono >= mono_from) and (mono_to is None or r.mono < mono_to)]
+            return out
+
+    def since(self, seq: int) -> List[LogRecord]:
+        """Records newer than `seq` (for live-following). Only stored records:
+        a pending repeat run reaches followers once it is flushed."""
+        with self._lock:
+            first = self._first_seq()
+            start = max(seq + 1 - first, 0)
+            return list(itertools.islice(self._records, start, None))
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counts":     dict(self.counts),
+                "buffered":   len(self._records),
+                "dropped":    self.dropped,
+                "suppressed": self.suppressed,
+            }
+
+
+def merge_timeline(streams: Dict[str, List[LogRecord]]) -> Iterator[Tuple[str, LogRecord]]:
+    """Lazily interleave per-service record lists (each already in `mono`
+    order) into one `(service, record)` stream ordered by `mono`."""
+    def tag(name: str, recs: List[LogRecord]) -> Iterator[Tuple[str, LogRecord]]:
+        for rec in recs:
+            yield name, rec
+
+    return heapq.merge(*(tag(n, r) for n, r in streams.items()), key=lambda item: item[1].mono)
@@ -0,0 +1,133 @@
+"""
+Event-loop lag monitor for the Nami Launcher.
+
+Everything in the launcher — health checks, the live-state driver, every
+HTTP route — shares one asyncio loop, so a single blocking call stalls all
+of it. This module measures that:
+
+  - a sampler task sleeps for `interval_s` and records how late it woke up
+    (scheduling delay) into a histogram and a recent-samples window
+  - a thin wrapper around asyncio.Handle._run times every callback and
+    remembers the ones over the threshold by name (task coroutine or
+    callback qualname), so "the loop stalled 800ms" comes with "in
+    start_service"
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the lag histogram buckets; the last bucket is open.
+LAG_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+RECENT_SAMPLES = 1200          # ~5 minutes at the default interval
+SLOW_KEEP      = 50
+
+
+def _describe(handle: asyncio.Handle) -> str:
+    cb = getattr(handle, "_callback", None)
+    owner = getattr(cb, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        qual = getattr(coro, "__qualname__", None) or repr(coro)
+        return f"task {owner.get_name()} ({qual})"
+    qual = getattr(cb, "__qualname__", None)
+    if qual:
+        return f"callback {getattr(cb, '__module__', '?')}.{qual}"
+    return repr(handle)[:200]
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_s: float = 0.25, slow_ms: float = 100.0) -> None:
+        self.interval_s = interval_s
+        self.slow_ms    = slow_ms
+        self.hist       = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples    = 0
+        self.max_ms     = 0.0
+        self.recent: Deque[Tuple[float, float]] = deque(maxlen=RECENT_SAMPLES)
+        self.slow:   Deque[Dict[str, Any]]      = deque(maxlen=SLOW_KEEP)
+        self._task: Optional[asyncio.Task] = None
+        self._orig_run = None
+
+    # ── Lag sampler ──────────────────────────────────────────────────────────
+
+    def _record_lag(self, lag_ms: float) -> None:
+        for i, bound in enumerate(LAG_BUCKETS_MS):
+            if lag_ms <= bound:
+                self.hist[i] += 1
+                break
+        else:
+            self.hist[-1] += 1
+        self.samples += 1
+        self.max_ms = max(self.max_ms, lag_ms)
+        self.recent.append((time.time(), lag_ms))
+
+    async def _sampler(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.interval_s)
+            lag_ms = max((loop.time() - t0 - self.interval_s) * 1000.0, 0.0)
+            self._record_lag(lag_ms)
+
+    # ── Slow-callback attribution ────────────────────────────────────────────
+
+    def _install_timer(self) -> None:
+        # Works for the stock asyncio loop. Under uvloop, handles are C types
+        # that ignore this hook — the lag sampler still works, attribution doesn't.
+        # The hook is process-wide; only handles of the loop that started the
+        # monitor are timed, so services hosted on their own loops in launcher
+        # threads (inprocess_host, static_site) don't show up as launcher stalls.
+        monitor = self
+        orig = asyncio.Handle._run
+        self._orig_run = orig
+        threshold_s = self.slow_ms / 1000.0
+        loop = asyncio.get_running_loop()
+
+        def _run(handle):
+            if handle._loop is not loop:
+                return orig(handle)
+            t0 = time.perf_counter()
+            try:
+                return orig(handle)
+            finally:
+                dt = time.perf_counter() - t0
+                if dt >= threshold_s:
+                    name = _describe(handle)
+                    monitor.slow.append({"at": time.time(), "ms": round(dt * 1000, 1), "callback": name})
+                    print(f"[Loop] 🐢 {dt * 1000:.0f}ms blocking in {name}")
+
+        asyncio.Handle._run = _run
+
+    def start(self) -> None:
+        self._install_timer()
+        self._task = asyncio.create_task(self._sampler())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+        if self._orig_run is not None:
+            asyncio.Handle._run = self._orig_run
+            self._orig_run = None
+
+    # ── Report ───────────────────────────────────────────────────────────────
+
+    def snapshot(self, window_s: float = 60.0) -> Dict[str, Any]:
+        cutoff = time.time() - window_s
+        vals = sorted(v for t, v in self.recent if t >= cutoff)
+
+        def pct(p: float) -> Optional[float]:
+            return round(vals[min(int(len(vals) * p), len(vals) - 1)], 2) if vals else None
+
+        labels = [f"<={b:g}ms" for b in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]:g}ms"]
+        return {
+            "interval_ms":    self.interval_s * 1000,
+            "slow_threshold_ms": self.slow_ms,
+            "samples":        self.samples,
+            "max_ms":         round(self.max_ms, 2),
+            "histogram":      dict(zip(labels, self.hist)),
+            "window_s":       window_s,
+            "window":         {"p50_ms": pct(0.50), "p99_ms": pct(0.99),
+                               "max_ms": round(vals[-1], 2) if vals else None},
+            "slow_callbacks": list(reversed(self.slow)),
+        }
@@ -0,0 +1,115 @@
+"""
+Launcher-managed local TCP proxy for blue/green service restarts.
+
+A service def with a `rolling` block never binds its public port itself.
+The launcher listens on the public port and forwards every connection to
+whichever backend instance is currently live, on one of the service's two
+spare ports:
+
+    clients ──► :8009 (TcpProxy) ──► :18009 (blue)   or   :18109 (green)
+
+A rolling restart boots the new instance on the idle port, waits until it
+is healthy, flips `backend` (new connections go to the new instance),
+drains the old instance's open connections, and only then stops it.
+Plain TCP forwarding means HTTP, WebSocket and Socket.IO all work unchanged.
+"""
+
+import asyncio
+from typing import Dict, Optional
+
+BUFFER = 64 * 1024
+
+
+class TcpProxy:
+    def __init__(self, listen_port: int, host: str = "0.0.0.0") -> None:
+        self.listen_port = listen_port
+        self.host        = host
+        self.backend: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._active: Dict[int, int] = {}          # backend port → open connections
+        self._idle:   Dict[int, asyncio.Event] = {}
+        self.total_connections = 0
+
+    @property
+    def listening(self) -> bool:
+        return self._server is not None
+
+    async def start(self) -> None:
+        if self._server is None:
+            self._server = await asyncio.start_server(self._handle, self.host, self.listen_port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.backend = None
+
+    def set_backend(self, port: int) -> None:
+        self.backend = port
+
+    def connections(self, port: int) -> int:
+        return self._active.get(port, 0)
+
+    async def drain(self, port: int, timeout: float) -> bool:
+        """Wait until no connections to `port` remain. True if fully drained."""
+        if not self._active.get(port):
+            return True
+        event = self._idle.setdefault(port, asyncio.Event())
+        event.clear()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                data = await reader.read(BUFFER)
+                if not data:
+                    break
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+    async def _handle(self, c_reader: asyncio.StreamReader, c_writer: asyncio.StreamWriter) -> None:
+        port = self.backend
+        if port is None:
+            c_writer.close()
+            return
+        try:
+            b_reader, b_writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            c_writer.close()
+            return
+
+        self.total_connections += 1
+        self._active[port] = self._active.get(port, 0) + 1
+        try:
+            await asyncio.gather(
+                self._pipe(c_reader, b_writer),
+                self._pipe(b_reader, c_writer),
+            )
+        finally:
+            self._active[port] -= 1
+            if self._active[port] <= 0:
+                self._active.pop(port, None)
+                event = self._idle.get(port)
+                if event:
+                    event.set()
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "listen_port":       self.listen_port,
+            "listening":         self.listening,
+            "backend":           self.backend,
+            "open_connections":  dict(self._active),
+            "total_connections": self.total_connections,
+        }
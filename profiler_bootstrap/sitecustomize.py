@@ -0,0 +1,160 @@
+"""
+Sampling-profiler bootstrap injected into managed Python services.
+
+The launcher puts this directory first on PYTHONPATH for services whose def
+has "profiling": True, and passes a control-socket path in
+NAMI_PROFILER_SOCKET. Python imports `sitecustomize` automatically at
+startup, so this runs before the service's own code and starts one idle
+daemon thread listening on that Unix socket. Nothing is sampled until the
+launcher asks:
+
+    → {"cmd": "profile", "seconds": 30, "interval": 0.01}\n
+    ← {"ok": true, "samples": 2981, "stacks": {"main (main.py:1);run (loop.py:40)": 1200, ...}}\n
+
+Sampling walks sys._current_frames() every `interval` seconds from that
+thread — no tracing hooks, so the service runs at full speed in between.
+Must stay stdlib-only: it runs inside every profiled service's interpreter.
+"""
+
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+
+_ENV_SOCKET = "NAMI_PROFILER_SOCKET"
+_MAX_SECONDS = 300.0
+_MIN_INTERVAL = 0.001
+_MAX_INTERVAL = 1.0
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _sample(seconds: float, interval: float) -> dict:
+    me = threading.get_ident()
+    names = {}
+    stacks = {}
+    samples = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names.update({t.ident: t.name for t in threading.enumerate()})
+        for tid, frame in sys._current_frames().items():
+            # Leave our own listener/connection threads out of the picture.
+            if tid == me or str(names.get(tid, "")).startswith("nami-profiler"):
+                continue
+            parts = []
+            while frame is not None:
+                parts.append(_frame_label(frame))
+                frame = frame.f_back
+            parts.append(f"thread:{names.get(tid, tid)}")
+            key = ";".join(reversed(parts))
+            stacks[key] = stacks.get(key, 0) + 1
+        samples += 1
+        time.sleep(interval)
+    return {
+        "ok":       True,
+        "pid":      os.getpid(),
+        "seconds":  seconds,
+        "interval": interval,
+        "samples":  samples,
+        "stacks":   stacks,
+    }
+
+
+def _params(req: dict):
+    """(seconds, interval) from a profile request, or None if unusable."""
+    try:
+        seconds  = float(req.get("seconds", 10))
+        interval = float(req.get("interval", 0.01))
+    except (TypeError, ValueError):
+        return None
+    if not (math.isfinite(seconds) and 0 < seconds <= _MAX_SECONDS):
+        return None
+    if not (math.isfinite(interval) and _MIN_INTERVAL <= interval <= _MAX_INTERVAL):
+        return None
+    return seconds, interval
+
+
+def _handle(conn, busy: threading.Lock) -> None:
+    with conn:
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            data += chunk
+        try:
+            req = json.loads(data)
+        except ValueError:
+            req = {}
+        if req.get("cmd") == "ping":
+            reply = {"ok": True, "pid": os.getpid()}
+        elif req.get("cmd") == "profile":
+            params = _params(req)
+            if params is None:
+                reply = {"ok": False, "reason": (
+                    f"need 0 < seconds <= {_MAX_SECONDS:g} and "
+                    f"{_MIN_INTERVAL:g} <= interval <= {_MAX_INTERVAL:g}")}
+            elif not busy.acquire(blocking=False):
+                reply = {"ok": False, "reason": "busy"}
+            else:
+                try:
+                    reply = _sample(*params)
+                finally:
+                    busy.release()
+        else:
+            reply = {"ok": False, "reason": f"unknown cmd {req.get('cmd')!r}"}
+        conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+def _serve(path: str) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    srv.bind(path)
+    srv.listen(2)
+    busy = threading.Lock()
+    while True:
+        conn, _ = srv.accept()
+        threading.Thread(target=_handle, args=(conn, busy), daemon=True,
+                         name="nami-profiler-conn").start()
+
+
+def _start() -> None:
+    # Pop it so subprocesses of the service don't fight over the same socket.
+    path = os.environ.pop(_ENV_SOCKET, None)
+    if not path or not hasattr(socket, "AF_UNIX"):
+        return
+    threading.Thread(target=_serve, args=(path,), daemon=True, name="nami-profiler").start()
+
+
+def _chain() -> None:
+    """Run the sitecustomize we shadowed (e.g. a conda env's own), if any."""
+    import importlib.machinery
+    import importlib.util
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    rest = [p for p in sys.path if os.path.abspath(p or os.curdir) != here]
+    spec = importlib.machinery.PathFinder.find_spec("sitecustomize", rest)
+    if spec is None or spec.loader is None:
+        return
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+
+try:
+    _start()
+except Exception as e:  # never take the service down
+    print(f"[profiler] bootstrap failed: {e}", file=sys.stderr)
+
+try:
+    _chain()
+except Exception as e:
+    print(f"[profiler] chained sitecustomize failed: {e}", file=sys.stderr)
@@ -0,0 +1,151 @@
+"""
+Remote launcher agents for multi-node service placement.
+
+A service def may carry a `host` naming the machine it runs on. Each
+machine other than the streaming PC runs launcher.py in agent mode:
+
+    LAUNCHER_ROLE=agent LAUNCHER_NODE=gpu-box LAUNCHER_PORT=8010 python launcher.py
+
+and the primary launcher is told where its agents live:
+
+    LAUNCHER_AGENTS="gpu-box=http://192.168.1.20:8010"
+
+The primary keeps one persistent (keep-alive) HTTP connection per agent,
+heartbeats it, and proxies start/stop/restart/logs for remote services to
+the agent's own /launcher routes; `/launcher/services` merges the agents'
+answers with the local ones, so the UI doesn't need to know where anything
+runs. Two launchers on localhost with different ports is a valid setup.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+HEARTBEAT_S      = 5.0
+REQUEST_TIMEOUT  = 10.0
+# Starting a service waits for its health check (youtube_hub: minutes).
+START_TIMEOUT    = 600.0
+
+
+class AgentUnavailable(Exception):
+    """The agent couldn't be reached or gave an unusable answer (→ 502)."""
+    status = 502
+
+
+class AgentRejected(AgentUnavailable):
+    """The agent answered with a 4xx; `status` and `detail` are passed through."""
+
+    def __init__(self, status: int, detail: Any) -> None:
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def parse_agents(spec: str) -> Dict[str, str]:
+    """`"a=http://h:8010,b=http://h2:8010"` → {"a": "http://h:8010", ...}."""
+    agents: Dict[str, str] = {}
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        node, sep, url = part.partition("=")
+        if not sep or not node.strip() or not url.strip():
+            raise ValueError(f"Bad LAUNCHER_AGENTS entry {part!r} (expected node=url)")
+        agents[node.strip()] = url.strip().rstrip("/")
+    return agents
+
+
+class AgentLink:
+    """Persistent connection to one remote launcher agent."""
+
+    def __init__(self, node: str, url: str) -> None:
+        self.node = node
+        self.url  = url
+        self.client = httpx.AsyncClient(
+            base_url=url,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=120.0),
+        )
+        self.reachable  = False
+        self.last_seen: Optional[float] = None
+        self.last_error: Optional[str]  = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def request(self, method: str, path: str, timeout: Optional[float] = None, **kw) -> Any:
+        try:
+            r = await self.client.request(method, path, timeout=timeout or REQUEST_TIMEOUT, **kw)
+        except httpx.HTTPError as e:
+            self.reachable  = False
+            self.last_error = str(e) or type(e).__name__
+            raise AgentUnavailable(f"agent {self.node} ({self.url}) unreachable: {self.last_error}")
+        self.reachable = True
+        self.last_seen = time.time()
+        if r.status_code >= 400:
+            try:
+                detail = r.json().get("detail", r.text)
+            except (ValueError, AttributeError):
+                detail = r.text
+            if r.status_code < 500:
+                raise AgentRejected(r.status_code, detail)
+            raise AgentUnavailable(f"agent {self.node} returned {r.status_code}: {detail}")
+        try:
+            return r.json()
+        except ValueError:
+            raise AgentUnavailable(f"agent {self.node} sent a non-JSON answer: {r.text[:200]}") from None
+
+    async def _heartbeat(self) -> None:
+        # Keeps the connection warm and `reachable` current between UI polls.
+        while True:
+            try:
+                await self.request("GET", "/launcher/health", timeout=3.0)
+            except AgentUnavailable:
+                pass
+            await asyncio.sleep(HEARTBEAT_S)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._heartbeat())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+        await self.client.aclose()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "node":       self.node,
+            "url":        self.url,
+            "reachable":  self.reachable,
+            "last_seen":  self.last_seen,
+            "last_error": self.last_error,
+        }
+
+
+class AgentPool:
+    def __init__(self, agents: Dict[str, str]) -> None:
+        self.links: Dict[str, AgentLink] = {n: AgentLink(n, u) for n, u in agents.items()}
+
+    def get(self, node: str) -> AgentLink:
+        link = self.links.get(node)
+        if link is None:
+            raise AgentUnavailable(f"no agent configured for host {node!r} (see LAUNCHER_AGENTS)")
+        return link
+
+    def start(self) -> None:
+        for link in self.links.values():
+            link.start()
+
+    async def close(self) -> None:
+        await asyncio.gather(*(l.close() for l in self.links.values()), return_exceptions=True)
+
+    async def services(self, nodes: List[str]) -> Dict[str, Any]:
+        """Fetch `/launcher/services` from each node in parallel.
+
+        Returns {node: [service dicts]} or {node: AgentUnavailable} per node.
+        """
+        async def one(node: str):
+            return await self.get(node).request("GET", "/launcher/services")
+
+        results = await asyncio.gather(*(one(n) for n in nodes), return_exceptions=True)
+        return dict(zip(nodes, results))
@@ -1,10 +1,35 @@
 """
 Service definitions and conda environment resolution for the Nami Launcher.
+
+The built-in defs below can be extended or overridden without touching this
+file through services.json (LAUNCHER_SERVICES_FILE) next to it:
+
+    {
+      "services": {
+        "my_service":     {"label": "My Service", "port": 8030,
+                           "cmd": ["${PYTHON}", "${PARENT_DIR}/my_service/main.py"],
+                           "health_check": "tcp", "managed": true},
+        "nami":           {"env": {"NAMI_DEBUG": "1"}},
+        "testing_engine": null
+      },
+      "boot_retries": {"my_service": 20}
+    }
+
+An entry for an existing service is merged over its built-in def key by key;
+null removes the service. String values may use ${PYTHON}, ${PARENT_DIR},
+${UI_DIR} and ${CONDA:<env>} (→ that conda env's python).
+
+The launcher watches both files and hot-reloads on change (or on
+POST /launcher/reload): the new defs are validated first, then only the
+services whose def actually changed are touched.
 """
 
+import copy
+import json
 import os
+import re
 import sys
-from typing import Dict, Any
+from typing import Any, Dict, List, Tuple
 
 UI_DIR     = os.path.dirname(os.path.abspath(__file__))
 PARENT_DIR = os.path.dirname(UI_DIR)
@@ -47,6 +72,11 @@ def conda_python(env_name: str) -> str:
 _YH_DIR = os.path.join(PARENT_DIR, "youtube_hub")
 _YH_NG  = os.path.join(_YH_DIR, "node_modules", ".bin", "ng")
 
+_MEMORY_ROLLING = os.environ.get("LAUNCHER_MEMORY_ROLLING", "0") == "1"
+
+# Services whose cmd runs under sys.executable may add "hosting": "inprocess"
+# (optionally with "app": "module:attr") to run on a launcher thread instead of
+# a child process — see inprocess_host.py for what that changes.
 SERVICE_DEFS: Dict[str, Dict[str, Any]] = {
     # ── YouTube Hub ──────────────────────────────────────────────────────────
     "youtube_hub": {
@@ -73,6 +103,13 @@ SERVICE_DEFS: Dict[str, Dict[str, Any]] = {
                 "cmd":          [_YH_NG, "serve", "--port", "4201"],
                 "cwd":          _YH_DIR,
                 "port":         4201,
+                # "static" serves a cached production build (rebuilt only when
+                # the sources change) instead of running `ng serve`.
+                "mode":         os.environ.get("LAUNCHER_UI_MODE", "serve"),
+                "static": {
+                    "build_cmd":    [_YH_NG, "build", "--configuration", "production"],
+                    "proxy_config": "proxy.conf.json",
+                },
                 "health_check": "http",
                 "health_url":   "http://localhost:4201/",
             },
@@ -136,9 +173,19 @@ SERVICE_DEFS: Dict[str, Dict[str, Any]] = {
     "memory_service": {
         "label":        "Memory Service",
         "description":  "Semantic memory store -- retrieval, compression, and decay",
-        "cmd":          [conda_python("memory-service"), "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8009"],
+        # With LAUNCHER_MEMORY_ROLLING=1 it runs on a blue/green backend port
+        # behind the launcher's proxy on 8009, so /restart swaps instances
+        # without downtime (`{port}` is filled in with the backend port). Off by
+        # default: the proxy lives in the launcher, so in detached mode 8009
+        # goes away with it even though the instance survives.
+        # Behind the proxy the backend only needs loopback; standalone it
+        # serves LAN and remote-node clients directly.
+        "cmd":          [conda_python("memory-service"), "-m", "uvicorn", "main:app",
+                         "--host", "127.0.0.1" if _MEMORY_ROLLING else "0.0.0.0",
+                         "--port", "{port}" if _MEMORY_ROLLING else "8009"],
         "cwd":          os.path.join(PARENT_DIR, "memory_service"),
         "port":         8009,
+        **({"rolling": {"ports": [18009, 18109]}} if _MEMORY_ROLLING else {}),
         "health_check": "http",
         "health_url":   "http://localhost:8009/health",
         "managed":      True,
@@ -152,6 +199,8 @@ SERVICE_DEFS: Dict[str, Dict[str, Any]] = {
         "health_check": "http",
         "health_url":   "http://localhost:8006/health",
         "managed":      True,
+        # Injects profiler_bootstrap/ so /launcher/services/director/profile works live.
+        "profiling":    True,
     },
     "tts_service": {
         "label":        "TTS Service",
@@ -203,6 +252,7 @@ SERVICE_DEFS: Dict[str, Dict[str, Any]] = {
         "health_check": "http",
         "health_url":   "http://localhost:8020/health",
         "managed":      True,
+        "profiling":    True,
     },
     "event_interpreter": {
         "label":        "Event Interpreter",
@@ -228,7 +278,7 @@ SERVICE_DEFS: Dict[str, Dict[str, Any]] = {
 }
 
 BOOT_RETRIES: Dict[str, int] = {
-    "youtube_hub":              84,   # 42 retries per step × 2 steps (Python ~30s, Angular ~3min)
+    "youtube_hub":              84,   # 42 retries per step × 2 steps (Python ~30s, Angular ~3min; static mode: seconds once built)
     "hub":                      15,
     "nami":                     60,
     "tts_service":              20,
@@ -242,4 +292,171 @@ BOOT_RETRIES: Dict[str, int] = {
     "sensory_data":             30,
     "event_interpreter":        30,
     "testing_engine":           15,
-}
\ No newline at end of file
+}
+
+
+# ── Data-file overrides ──────────────────────────────────────────────────────
+
+SERVICES_FILE = os.environ.get("LAUNCHER_SERVICES_FILE", os.path.join(UI_DIR, "services.json"))
+
+# Keys that can change on a running service without restarting it.
+RELOAD_IN_PLACE = {"label", "description", "open_url", "autostart", "log_rate"}
+
+_PLACEHOLDER_RE = re.compile(r"\$\{(PYTHON|PARENT_DIR|UI_DIR|CONDA:[\w.-]+)\}")
+_NAME_RE        = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def _expand(value: Any) -> Any:
+    if isinstance(value, str):
+        def sub(m: "re.Match") -> str:
+            key = m.group(1)
+            if key == "PYTHON":
+                return sys.executable
+            if key.startswith("CONDA:"):
+                return conda_python(key[len("CONDA:"):])
+            return {"PARENT_DIR": PARENT_DIR, "UI_DIR": UI_DIR}[key]
+        return _PLACEHOLDER_RE.sub(sub, value)
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    return value
+
+
+def apply_overrides(defs: Dict[str, Dict[str, Any]], retries: Dict[str, int],
+                    path: str = SERVICES_FILE) -> None:
+    """Merge the data file at `path` (if any) into `defs` / `retries` in place.
+
+    Raises ValueError if the file exists but can't be used."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path}: {e}") from None
+    if not isinstance(data, dict) or not isinstance(data.get("services", {}), dict) \
+            or not isinstance(data.get("boot_retries", {}), dict):
+        raise ValueError(f"{path}: expected {{\"services\": {{…}}, \"boot_retries\": {{…}}}}")
+
+    for name, entry in data.get("services", {}).items():
+        if entry is None:
+            defs.pop(name, None)
+            retries.pop(name, None)
+        elif not isinstance(entry, dict):
+            raise ValueError(f"{path}: services.{name} must be an object or null")
+        else:
+            defs[name] = {**defs.get(name, {}), **_expand(entry)}
+    retries.update(data.get("boot_retries", {}))
+
+
+def _check_cmd(where: str, cmd: Any, errors: List[str]) -> None:
+    if not isinstance(cmd, list) or not cmd or not all(isinstance(c, str) for c in cmd):
+        errors.append(f"{where}.cmd must be a non-empty list of strings")
+
+
+def _check_health(where: str, d: Dict[str, Any], errors: List[str]) -> None:
+    hc = d.get("health_check", "tcp")
+    if hc not in ("http", "tcp"):
+        errors.append(f"{where}.health_check must be 'http' or 'tcp', not {hc!r}")
+    elif hc == "http" and not str(d.get("health_url", "")).startswith("http"):
+        errors.append(f"{where}.health_url is required for http health checks")
+
+
+def _valid_port(port: Any) -> bool:
+    return isinstance(port, int) and not isinstance(port, bool) and 0 < port < 65536
+
+
+def validate_defs(defs: Dict[str, Dict[str, Any]], retries: Dict[str, int]) -> List[str]:
+    """Everything wrong with a set of defs (empty list ⇒ safe to apply)."""
+    errors: List[str] = []
+    ports: Dict[Tuple[str, int], str] = {}
+    for name, d in defs.items():
+        if not _NAME_RE.match(name):
+            errors.append(f"{name!r}: service names may only use letters, digits, '_' and '-'")
+        if not isinstance(d, dict):
+            errors.append(f"{name}: definition must be an object")
+            continue
+        if not isinstance(d.get("label"), str):
+            errors.append(f"{name}.label is required")
+        if not _valid_port(d.get("port")):
+            errors.append(f"{name}.port must be an integer port number")
+        if not isinstance(d.get("env", {}), dict) or \
+                not all(isinstance(v, str) for v in d.get("env", {}).values()):
+            errors.append(f"{name}.env must map names to strings")
+        if d.get("hosting", "process") not in ("process", "inprocess"):
+            errors.append(f"{name}.hosting must be 'process' or 'inprocess'")
+
+        if d.get("steps") is not None:
+            if not isinstance(d["steps"], list) or not d["steps"]:
+                errors.append(f"{name}.steps must be a non-empty list")
+            else:
+                for i, step in enumerate(d["steps"]):
+                    where = f"{name}.steps[{i}]"
+                    if not isinstance(step, dict):
+                        errors.append(f"{where} must be an object")
+                        continue
+                    _check_cmd(where, step.get("cmd"), errors)
+                    _check_health(where, step, errors)
+        else:
+            _check_cmd(name, d.get("cmd"), errors)
+        _check_health(name, d, errors)
+
+        rolling = d.get("rolling")
+        if rolling is not None:
+            rp = rolling.get("ports") if isinstance(rolling, dict) else None
+            if not isinstance(rp, list) or len(rp) != 2 or len(set(rp)) != 2 \
+                    or not all(_valid_port(p) for p in rp):
+                errors.append(f"{name}.rolling.ports must be two different port numbers")
+            if d.get("steps"):
+                errors.append(f"{name}: rolling services can't have steps")
+            elif isinstance(rolling, dict):
+                # Each instance must be told its backend port — otherwise it
+                # binds the public port the proxy already holds.
+                port_env = rolling.get("port_env")
+                if port_env is not None and not isinstance(port_env, str):
+                    errors.append(f"{name}.rolling.port_env must be a string")
+                uses_port = any(isinstance(c, str) and "{port}" in c for c in d.get("cmd") or [])
+                if not uses_port and not port_env:
+                    errors.append(f"{name}: rolling needs `{{port}}` in cmd or rolling.port_env")
+
+        # Two services on one node can't both own a port.
+        if d.get("managed") and _valid_port(d.get("port")):
+            owned = {d["port"]} | {s["port"] for s in d.get("steps") or []
+                                   if isinstance(s, dict) and _valid_port(s.get("port"))}
+            for port in owned:
+                key = (d.get("host", "local"), port)
+                if key in ports and ports[key] != name:
+                    errors.append(f"{name}: port {port} is already used by {ports[key]}")
+                ports.setdefault(key, name)
+
+    for name, n in retries.items():
+        if not isinstance(n, int) or isinstance(n, bool) or n <= 0:
+            errors.append(f"boot_retries.{name} must be a positive integer")
+    return errors
+
+
+def diff_defs(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """{"added": [...], "removed": [...], "changed": {name: [keys that differ]}}"""
+    changed = {}
+    for name in old.keys() & new.keys():
+        keys = sorted(k for k in old[name].keys() | new[name].keys()
+                      if old[name].get(k) != new[name].get(k))
+        if keys:
+            changed[name] = keys
+    return {
+        "added":   [n for n in new if n not in old],
+        "removed": [n for n in old if n not in new],
+        "changed": changed,
+    }
+
+
+# Pristine copies for reloads, which re-run this file and re-apply the data
+# file strictly; at import a broken data file only costs its overrides.
+BUILTIN_DEFS    = copy.deepcopy(SERVICE_DEFS)
+BUILTIN_RETRIES = dict(BOOT_RETRIES)
+
+try:
+    apply_overrides(SERVICE_DEFS, BOOT_RETRIES)
+except ValueError as e:
+    print(f"WARNING: Ignoring service overrides: {e}")
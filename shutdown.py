@@ -35,6 +35,7 @@ def collect_ports() -> List[int]:
         for step in defn.get("steps", []) or []:
             if "port" in step:
                 ports.add(step["port"])
+        ports.update((defn.get("rolling") or {}).get("ports", []))
     return sorted(ports)
 
 
@@ -0,0 +1,251 @@
+"""
+Span collector for end-to-end pipeline latency.
+
+Managed services POST small timing spans to the launcher, keyed by a
+correlation id that travels with the event through the pipeline
+(mic transcript → director directive → prompt_service gate → tts audio).
+The collector assembles spans into traces and keeps sliding windows of
+
+  - per-stage durations       (how long each stage itself took)
+  - per-hop gaps              (end of one stage → start of the next)
+  - end-to-end trace latency  (first span start → last span end)
+
+and reports p50/p95/p99 for each, so "why did Nami reply late" becomes
+"which hop's p95 moved".
+
+Accepted batch formats (all timestamps are epoch seconds):
+
+  JSON, one trace per object, spans as dicts or compact [stage, start, end]:
+      {"trace": "abc123", "service": "director",
+       "spans": [["directive", 1718200000.12, 1718200000.31]]}
+      [{"trace": "abc123", "stage": "tts", "start": ..., "end": ...}, ...]
+
+  Line protocol, one span per line:
+      <trace> <stage> <start> <end> [service]
+"""
+
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+MAX_TRACES     = 2000        # assembled traces kept for /launcher/traces/{id}
+MAX_SAMPLES    = 5000        # per-series cap inside the largest window
+WINDOWS_S      = (60, 300, 900)
+TRACE_IDLE_S   = 30.0        # a trace with no new spans for this long is complete
+
+
+class Span:
+    __slots__ = ("trace", "stage", "start", "end", "service")
+
+    def __init__(self, trace: str, stage: str, start: float, end: float,
+                 service: Optional[str] = None) -> None:
+        if not (math.isfinite(start) and math.isfinite(end)):
+            raise ValueError(f"span {stage!r} has a non-finite timestamp")
+        if end < start:
+            raise ValueError(f"span {stage!r} ends before it starts")
+        self.trace   = trace
+        self.stage   = stage
+        self.start   = start
+        self.end     = end
+        self.service = service
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage":       self.stage,
+            "service":     self.service,
+            "start":       self.start,
+            "end":         self.end,
+            "duration_ms": round(self.duration * 1000, 3),
+        }
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+
+def _span_from(trace: str, service: Optional[str], raw: Any) -> Span:
+    if isinstance(raw, (list, tuple)):
+        stage, start, end = raw[:3]
+        return Span(str(trace), str(stage), float(start), float(end), service)
+    if "duration_ms" in raw and "end" not in raw:
+        start = float(raw["start"])
+        end   = start + float(raw["duration_ms"]) / 1000.0
+    else:
+        start, end = float(raw["start"]), float(raw["end"])
+    return Span(
+        str(raw.get("trace", trace)),
+        str(raw["stage"]),
+        start,
+        end,
+        raw.get("service", service),
+    )
+
+
+def parse_batch(body: bytes, content_type: str = "") -> List[Span]:
+    """Parse a JSON or line-protocol batch. Raises ValueError on bad input."""
+    text = body.decode("utf-8").strip()
+    if not text:
+        return []
+    if "json" in content_type or text[0] in "[{":
+        data = json.loads(text)
+        items = data if isinstance(data, list) else [data]
+        spans: List[Span] = []
+        for item in items:
+            if not isinstance(item, dict):
+                raise ValueError("each JSON item must be an object")
+            try:
+                if "spans" in item:
+                    trace = item["trace"]
+                    spans.extend(_span_from(trace, item.get("service"), s) for s in item["spans"])
+                else:
+                    spans.append(_span_from(item["trace"], item.get("service"), item))
+            except (KeyError, TypeError, IndexError) as e:
+                raise ValueError(f"malformed span: {e!r}")
+        return spans
+
+    spans = []
+    for n, line in enumerate(text.splitlines(), 1):
+        parts = line.split()
+        if not parts or parts[0].startswith("#"):
+            continue
+        if len(parts) not in (4, 5):
+            raise ValueError(f"line {n}: expected '<trace> <stage> <start> <end> [service]'")
+        service = parts[4] if len(parts) == 5 else None
+        spans.append(Span(parts[0], parts[1], float(parts[2]), float(parts[3]), service))
+    return spans
+
+
+# ── Windows & percentiles ─────────────────────────────────────────────────────
+
+def _percentile(sorted_vals: List[float], p: float) -> float:
+    if len(sorted_vals) == 1:
+        return sorted_vals[0]
+    k = (len(sorted_vals) - 1) * p
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+class _Series:
+    """Sliding window of (observed_at, value) samples."""
+    __slots__ = ("samples",)
+
+    def __init__(self) -> None:
+        self.samples: Deque[Tuple[float, float]] = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, at: float, value: float) -> None:
+        self.samples.append((at, value))
+
+    def summary(self, now: float, window: float) -> Optional[Dict[str, Any]]:
+        cutoff = now - window
+        vals = sorted(v for t, v in self.samples if t >= cutoff)
+        if not vals:
+            return None
+        return {
+            "count":  len(vals),
+            "p50_ms": round(_percentile(vals, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(vals, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(vals, 0.99) * 1000, 2),
+            "max_ms": round(vals[-1] * 1000, 2),
+        }
+
+
+class _Trace:
+    __slots__ = ("spans", "updated", "finalized")
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.updated   = 0.0
+        self.finalized = False
+
+
+# ── Collector ─────────────────────────────────────────────────────────────────
+
+class SpanCollector:
+    def __init__(self) -> None:
+        self._lock   = threading.Lock()
+        self._traces: "OrderedDict[str, _Trace]" = OrderedDict()
+        self._stages: Dict[str, _Series] = {}
+        self._hops:   Dict[str, _Series] = {}
+        self._e2e     = _Series()
+        self.received = 0
+
+    def add(self, spans: Iterable[Span]) -> int:
+        now = time.time()
+        n = 0
+        with self._lock:
+            for span in spans:
+                tr = self._traces.get(span.trace)
+                if tr is None:
+                    tr = self._traces[span.trace] = _Trace()
+                    while len(self._traces) > MAX_TRACES:
+                        _, old = self._traces.popitem(last=False)
+                        self._finalize(old)
+                else:
+                    self._traces.move_to_end(span.trace)
+                tr.spans.append(span)
+                tr.updated = now
+                self._stages.setdefault(span.stage, _Series()).add(now, span.duration)
+                n += 1
+            self.received += n
+            self._finalize_idle(now)
+        return n
+
+    def _finalize(self, tr: _Trace) -> None:
+        """Record hop gaps and end-to-end latency once a trace stops growing."""
+        if tr.finalized or not tr.spans:
+            return
+        tr.finalized = True
+        ordered = sorted(tr.spans, key=lambda s: s.start)
+        for prev, nxt in zip(ordered, ordered[1:]):
+            key = f"{prev.stage}→{nxt.stage}"
+            self._hops.setdefault(key, _Series()).add(tr.updated, max(nxt.start - prev.end, 0.0))
+        if len(ordered) > 1:
+            self._e2e.add(tr.updated, max(s.end for s in ordered) - ordered[0].start)
+
+    def _finalize_idle(self, now: float) -> None:
+        # OrderedDict is in last-update order, so idle traces are at the front.
+        for tr in self._traces.values():
+            if now - tr.updated < TRACE_IDLE_S:
+                break
+            self._finalize(tr)
+
+    def stats(self, window: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time()
+        windows = [window] if window is not None else list(WINDOWS_S)
+        with self._lock:
+            self._finalize_idle(now)
+            out: Dict[str, Any] = {"received": self.received, "traces": len(self._traces), "windows": {}}
+            for w in windows:
+                out["windows"][f"{int(w)}s"] = {
+                    "stages":     {k: s for k, v in sorted(self._stages.items()) if (s := v.summary(now, w))},
+                    "hops":       {k: s for k, v in sorted(self._hops.items()) if (s := v.summary(now, w))},
+                    "end_to_end": self._e2e.summary(now, w),
+                }
+        return out
+
+    def trace(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            tr = self._traces.get(trace_id)
+            if tr is None:
+                return None
+            ordered = sorted(tr.spans, key=lambda s: s.start)
+        t0 = ordered[0].start
+        return {
+            "trace":       trace_id,
+            "complete":    tr.finalized,
+            "total_ms":    round((max(s.end for s in ordered) - t0) * 1000, 3),
+            "spans":       [{**s.to_dict(), "offset_ms": round((s.start - t0) * 1000, 3)} for s in ordered],
+        }
+
+    def recent(self, last: int = 20) -> List[Dict[str, Any]]:
+        if last <= 0:
+            return []
+        with self._lock:
+            ids = list(self._traces.keys())[-last:]
+        return [t for t in (self.trace(i) for i in reversed(ids)) if t]
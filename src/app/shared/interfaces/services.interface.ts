@@ -5,6 +5,16 @@ export interface ServiceDetail extends ServiceStatus {
   pid: number | null;
   health_check: string;
   cwd?: string;
+  // Node the service runs on ('local' unless placed on a remote launcher agent).
+  host?: string;
+  // 'inprocess' when the launcher hosts it on a thread instead of a child process.
+  hosting?: 'process' | 'inprocess';
+  // Launcher-side counts of parsed log records at each severity.
+  error_count?: number;
+  warn_count?: number;
+  // Lines dropped by the ingest rate limit / collapsed into "repeated ×N".
+  dropped_lines?: number;
+  suppressed_lines?: number;
   logs?: string[];
   logsOpen?: boolean;
   actionPending?: boolean;
@@ -0,0 +1,211 @@
+"""
+On-disk state journal and process adoption for the Nami Launcher.
+
+The launcher keeps everything in memory, so by default a launcher restart
+means a cold boot of the whole stack. In detached mode (LAUNCHER_DETACHED=1)
+children are started in their own session with stdout going to a log file
+instead of a pipe, so they outlive the launcher. The journal records each
+managed PID with its OS start time and log file, plus the live-state flags.
+
+On boot the launcher reloads the journal and re-adopts every process that
+is still running *and* still has the same start time — a recycled PID
+belonging to some unrelated process is never adopted. Output capture is
+reattached by tailing the child's log file.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import psutil  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    psutil = None
+
+JOURNAL_VERSION   = 1
+START_TIME_SLACK  = 2.0          # seconds; `ps -o lstart` only has 1s resolution
+TAIL_BACKFILL     = 64 * 1024    # bytes of existing output re-read on adoption
+TAIL_POLL_S       = 0.2
+VERIFY_EVERY_S    = 5.0          # how often an adopted PID's start time is re-checked
+
+
+# ── Journal file ──────────────────────────────────────────────────────────────
+
+def save(path: str, state: Dict[str, Any]) -> None:
+    """Atomically replace the journal (write tmp + rename)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": JOURNAL_VERSION, "saved_at": time.time(), **state}, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"[Journal] ⚠️  Ignoring unreadable journal {path}: {e}")
+        return {}
+    if data.get("version") != JOURNAL_VERSION:
+        return {}
+    return data
+
+
+# ── Process identity ──────────────────────────────────────────────────────────
+
+def _proc_boot_time() -> Optional[float]:
+    try:
+        with open("/proc/stat") as f:
+            for line in f:
+                if line.startswith("btime "):
+                    return float(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def process_start_time(pid: int) -> Optional[float]:
+    """Epoch seconds at which `pid` started, or None if it doesn't exist."""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).create_time()
+        except Exception:
+            return None
+
+    if os.path.exists(f"/proc/{pid}/stat"):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # comm (field 2) may contain spaces — split after its ')'.
+                fields = f.read().rsplit(")", 1)[1].split()
+            ticks = int(fields[19])
+            btime = _proc_boot_time()
+            if btime is not None:
+                return btime + ticks / os.sysconf("SC_CLK_TCK")
+        except (OSError, IndexError, ValueError):
+            return None
+
+    # macOS / BSD: no /proc — ask ps.
+    try:
+        out = subprocess.check_output(
+            ["ps", "-o", "lstart=", "-p", str(pid)],
+            text=True, stderr=subprocess.DEVNULL,
+            env={**os.environ, "LC_ALL": "C"},
+        ).strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    try:
+        return datetime.strptime(out, "%a %b %d %H:%M:%S %Y").timestamp()
+    except ValueError:
+        return None
+
+
+def same_process(pid: int, start_time: Optional[float]) -> bool:
+    """True if `pid` is alive and is the same process we journaled."""
+    if start_time is None:
+        return False
+    actual = process_start_time(pid)
+    return actual is not None and abs(actual - start_time) <= START_TIME_SLACK
+
+
+class AdoptedProcess:
+    """Popen look-alike for a child started by a previous launcher instance.
+
+    It's not our child any more, so there's no exit status to reap; once it
+    is gone `returncode` is reported as -1 (unknown).
+    """
+
+    def __init__(self, pid: int, start_time: float, args: Any = None) -> None:
+        self.pid        = pid
+        self.start_time = start_time
+        self.args       = args
+        self.returncode: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        # Only the cheap liveness probe here — poll() is called from route
+        # handlers on the event loop. PID reuse is caught by verify().
+        if self.returncode is not None:
+            return self.returncode
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            self.returncode = -1
+        except PermissionError:
+            pass
+        return self.returncode
+
+    def verify(self) -> Optional[int]:
+        """Re-check the start time to catch PID reuse. May shell out to `ps`,
+        so run it off the event loop (every VERIFY_EVERY_S)."""
+        if self.poll() is None and not same_process(self.pid, self.start_time):
+            self.returncode = -1
+        return self.returncode
+
+    def _signal(self, sig: int) -> None:
+        if self.poll() is not None:
+            return
+        try:
+            os.kill(self.pid, sig)
+        except ProcessLookupError:
+            self.returncode = -1
+
+    def terminate(self) -> None:
+        self._signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self._signal(signal.SIGKILL if sys.platform != "win32" else signal.SIGTERM)
+
+
+# ── Output capture from log files ─────────────────────────────────────────────
+
+def follow_file(
+    path: str,
+    on_line: Callable[[str], None],
+    proc,
+    backfill: int = 0,
+) -> None:
+    """Tail `path`, feeding complete lines to `on_line` until `proc` exits.
+
+    With `backfill` > 0 the last `backfill` bytes already in the file are
+    replayed first (starting at the next full line).
+    """
+    try:
+        f = open(path, "rb")
+    except OSError as e:
+        on_line(f"⚠️  Cannot read output file {path}: {e}")
+        return
+    with f:
+        if backfill:
+            size = os.fstat(f.fileno()).st_size
+            if size > backfill:
+                f.seek(size - backfill)
+                f.readline()  # drop the partial first line
+        buf = b""
+        while True:
+            chunk = f.readline()
+            if chunk:
+                buf += chunk
+                if buf.endswith(b"\n"):
+                    on_line(buf.decode("utf-8", errors="replace"))
+                    buf = b""
+                continue
+            if proc.poll() is not None:
+                rest = buf + f.read()
+                for line in rest.splitlines():
+                    on_line(line.decode("utf-8", errors="replace"))
+                return
+            time.sleep(TAIL_POLL_S)
+
+
+def start_follower(path: str, on_line: Callable[[str], None], proc, backfill: int = 0) -> None:
+    threading.Thread(
+        target=follow_file, args=(path, on_line, proc, backfill), daemon=True,
+    ).start()
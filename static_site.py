@@ -0,0 +1,303 @@
+"""
+Prebuilt static mode for Angular UI steps.
+
+Instead of keeping `ng serve` (a resident dev server that takes minutes to
+come up) running, a step with `"mode": "static"` and a `static` block
+
+    "static": {
+        "build_cmd":    [ng, "build", "--configuration", "production"],
+        "inputs":       ["src", "public", "angular.json", ...],   # optional
+        "proxy_config": "proxy.conf.json",                        # optional
+    }
+
+is started by:
+  1. hashing its build inputs (file contents; unchanged files are skipped
+     via a size/mtime manifest)
+  2. building only if no cached bundle exists for that hash — into
+     <cache>/<hash>/, with every text asset also written as .gz (and .br if
+     the optional `brotli` module is installed)
+  3. serving the cached bundle on the step's port from a launcher thread
+     (see inprocess_host.py), honouring the same proxy.conf.json the dev
+     server used so API calls keep working
+
+Precompressed files are sent as-is when the browser accepts the encoding.
+Files the build emitted under content-hashed names (recorded per build in
+.immutable.json) are cached as immutable; everything else — index.html and
+public/ assets — revalidates.
+The proxy forwards plain HTTP (including Socket.IO long-polling) but not
+WebSocket upgrades — Socket.IO clients fall back to polling.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import brotli  # optional
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+DEFAULT_INPUTS = [
+    "src", "public", "angular.json", "package.json", "package-lock.json",
+    "tsconfig.json", "tsconfig.app.json",
+]
+KEEP_BUILDS     = 3
+COMPRESS_EXTS   = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".map", ".txt",
+                   ".xml", ".ico", ".webmanifest"}
+COMPRESS_MIN    = 1024
+# Angular's output hashing: `main-ABCD1234.js`, `chunk-…`, `styles-…`.
+_HASHED_NAME_RE = re.compile(r"-[A-Z0-9]{8}\.(?:js|mjs|css)$")
+_OK_MARKER      = ".build-ok"
+_IMMUTABLE      = ".immutable.json"
+
+
+# ── Input hashing ─────────────────────────────────────────────────────────────
+
+def _walk(project_dir: str, inputs: List[str]) -> List[str]:
+    files = []
+    for item in inputs:
+        path = os.path.join(project_dir, item)
+        if os.path.isfile(path):
+            files.append(item)
+        elif os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in ("node_modules", ".angular", "dist"))
+                files.extend(os.path.relpath(os.path.join(root, n), project_dir) for n in names)
+    return sorted(files)
+
+
+def source_hash(project_dir: str, inputs: List[str], build_cmd: List[str], cache_root: str) -> str:
+    """Content hash of the build inputs (plus the build command). File
+    digests are reused from the last run when size and mtime are unchanged."""
+    manifest_path = os.path.join(cache_root, "inputs.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    fresh: Dict[str, List[Any]] = {}
+    h = hashlib.sha256(json.dumps(build_cmd).encode("utf-8"))
+    for rel in _walk(project_dir, inputs):
+        full = os.path.join(project_dir, rel)
+        try:
+            st = os.stat(full)
+        except OSError:
+            continue
+        cached = manifest.get(rel)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            digest = cached[2]
+        else:
+            with open(full, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        fresh[rel] = [st.st_mtime_ns, st.st_size, digest]
+        h.update(rel.encode("utf-8") + b"\0" + digest.encode("ascii") + b"\n")
+
+    os.makedirs(cache_root, exist_ok=True)
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(fresh, f)
+    os.replace(tmp, manifest_path)
+    return h.hexdigest()[:16]
+
+
+# ── Build + cache ─────────────────────────────────────────────────────────────
+
+def _precompress(root: str) -> int:
+    count = 0
+    for dirpath, _, names in os.walk(root):
+        for n in names:
+            path = os.path.join(dirpath, n)
+            if os.path.splitext(n)[1] not in COMPRESS_EXTS or os.path.getsize(path) < COMPRESS_MIN:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            with open(path + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(path + ".br", "wb") as f:
+                    f.write(brotli.compress(data))
+            count += 1
+    return count
+
+
+def _hashed_files(site_root: str, project_dir: str) -> List[str]:
+    """Bundle files whose names carry a content hash. Files copied verbatim
+    from public/ (or src/assets/) are left out even if their name looks
+    hashed — they keep their name across rebuilds and must revalidate."""
+    out = []
+    for dirpath, _, names in os.walk(site_root):
+        for n in names:
+            rel = os.path.relpath(os.path.join(dirpath, n), site_root).replace(os.sep, "/")
+            if not _HASHED_NAME_RE.search(n):
+                continue
+            if os.path.exists(os.path.join(project_dir, "public", rel)) or \
+                    os.path.exists(os.path.join(project_dir, "src", rel)):
+                continue
+            out.append(rel)
+    return sorted(out)
+
+
+def _prune(cache_root: str, keep: str) -> None:
+    builds = [d for d in os.listdir(cache_root)
+              if os.path.isfile(os.path.join(cache_root, d, _OK_MARKER))]
+    builds.sort(key=lambda d: os.path.getmtime(os.path.join(cache_root, d, _OK_MARKER)), reverse=True)
+    for d in builds[KEEP_BUILDS:]:
+        if d != keep:
+            shutil.rmtree(os.path.join(cache_root, d), ignore_errors=True)
+    for d in os.listdir(cache_root):
+        if d.endswith(".building"):
+            shutil.rmtree(os.path.join(cache_root, d), ignore_errors=True)
+
+
+def ensure_build(
+    project_dir: str,
+    spec: Dict[str, Any],
+    cache_root: str,
+    on_line: Callable[[str], None],
+) -> Tuple[str, bool]:
+    """Return (directory to serve, whether a build ran). Blocking."""
+    inputs = spec.get("inputs", DEFAULT_INPUTS)
+    build_cmd = [str(c) for c in spec["build_cmd"]]
+    t0 = time.monotonic()
+    digest = source_hash(project_dir, inputs, build_cmd, cache_root)
+    final = os.path.join(cache_root, digest)
+    if os.path.isfile(os.path.join(final, _OK_MARKER)):
+        os.utime(os.path.join(final, _OK_MARKER))
+        on_line(f"📦 Using cached build {digest} (inputs hashed in {time.monotonic() - t0:.1f}s)")
+        return _site_root(final), False
+
+    on_line(f"🔨 Sources changed — building {digest}: {' '.join(build_cmd)}")
+    tmp = final + ".building"
+    shutil.rmtree(tmp, ignore_errors=True)
+    proc = subprocess.Popen(
+        build_cmd + ["--output-path", tmp], cwd=project_dir,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+    )
+    for raw in iter(proc.stdout.readline, b""):
+        on_line(raw.decode("utf-8", errors="replace").rstrip())
+    code = proc.wait()
+    if code != 0 or not os.path.isfile(os.path.join(_site_root(tmp), "index.html")):
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise RuntimeError(f"static build failed (exit code {code})")
+
+    site = _site_root(tmp)
+    with open(os.path.join(site, _IMMUTABLE), "w", encoding="utf-8") as f:
+        json.dump(_hashed_files(site, project_dir), f)
+    n = _precompress(site)
+    with open(os.path.join(tmp, _OK_MARKER), "w") as f:
+        f.write(json.dumps({"built_at": time.time(), "cmd": build_cmd}))
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    _prune(cache_root, digest)
+    on_line(f"✅ Built {digest} in {time.monotonic() - t0:.0f}s ({n} assets precompressed)")
+    return _site_root(final), True
+
+
+def _site_root(build_dir: str) -> str:
+    # The Angular application builder writes the site to <output-path>/browser.
+    browser = os.path.join(build_dir, "browser")
+    return browser if os.path.isdir(browser) else build_dir
+
+
+# ── Serving ───────────────────────────────────────────────────────────────────
+
+def load_proxy_config(path: Optional[str]) -> List[Tuple[str, str, List[Tuple[str, str]]]]:
+    """proxy.conf.json → [(prefix, target, [(regex, replacement)])], longest prefix first."""
+    if not path or not os.path.isfile(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        conf = json.load(f)
+    rules = [(prefix, opts["target"].rstrip("/"), list((opts.get("pathRewrite") or {}).items()))
+             for prefix, opts in conf.items()]
+    return sorted(rules, key=lambda r: len(r[0]), reverse=True)
+
+
+_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "upgrade", "host",
+                "proxy-connection", "te", "trailer", "content-length"}
+
+
+def make_app(root: str, proxy_rules: List[Tuple[str, str, List[Tuple[str, str]]]]):
+    """ASGI app serving `root` as a single-page app, plus the dev-server proxy."""
+    import httpx
+    from starlette.applications import Starlette
+    from starlette.background import BackgroundTask
+    from starlette.requests import Request
+    from starlette.responses import FileResponse, Response, StreamingResponse
+    from starlette.routing import Route
+
+    root = os.path.realpath(root)
+    state: Dict[str, Any] = {}
+    try:
+        with open(os.path.join(root, _IMMUTABLE), encoding="utf-8") as f:
+            immutable = set(json.load(f))
+    except (OSError, ValueError):
+        immutable = set()   # built before the manifest existed — revalidate everything
+
+    async def proxy(request: Request, target: str, rewrites) -> Response:
+        client = state.get("client")
+        if client is None:
+            # Created on first use so it belongs to this server's event loop.
+            client = state["client"] = httpx.AsyncClient(timeout=None)
+        path = request.url.path
+        for pattern, repl in rewrites:
+            path = re.sub(pattern, repl, path)
+        url = target + path + (f"?{request.url.query}" if request.url.query else "")
+        headers = [(k, v) for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS]
+        try:
+            upstream = await client.send(
+                client.build_request(request.method, url, headers=headers, content=await request.body()),
+                stream=True,
+            )
+        except httpx.HTTPError as e:
+            return Response(f"Proxy error: {e}", status_code=502)
+        return StreamingResponse(
+            upstream.aiter_raw(), status_code=upstream.status_code,
+            headers={k: v for k, v in upstream.headers.items() if k.lower() not in _HOP_HEADERS},
+            background=BackgroundTask(upstream.aclose),
+        )
+
+    def static_file(request: Request, path: str) -> Response:
+        headers = {"Vary": "Accept-Encoding"}
+        if os.path.relpath(path, root).replace(os.sep, "/") in immutable:
+            headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            headers["Cache-Control"] = "no-cache"
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        accept = request.headers.get("accept-encoding", "")
+        for enc, ext in (("br", ".br"), ("gzip", ".gz")):
+            if enc in accept and os.path.isfile(path + ext):
+                return FileResponse(path + ext, media_type=media_type,
+                                    headers={**headers, "Content-Encoding": enc})
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    async def handle(request: Request) -> Response:
+        path = request.url.path
+        for prefix, target, rewrites in proxy_rules:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/") or path.startswith(prefix + "?"):
+                return await proxy(request, target, rewrites)
+        if request.method not in ("GET", "HEAD"):
+            return Response(status_code=405)
+        full = os.path.realpath(os.path.join(root, path.lstrip("/")))
+        if full != root and not full.startswith(root + os.sep):
+            return Response(status_code=404)
+        if any(part.startswith(".") for part in os.path.relpath(full, root).split(os.sep) if part != "."):
+            return Response(status_code=404)   # build bookkeeping (.immutable.json, .build-ok)
+        if os.path.isfile(full):
+            return static_file(request, full)
+        if "." in os.path.basename(path):
+            return Response(status_code=404)
+        # Client-side route → the SPA shell.
+        return static_file(request, os.path.join(root, "index.html"))
+
+    methods = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+    app = Starlette(routes=[Route("/{path:path}", handle, methods=methods)])
+    app.__name__ = f"static:{os.path.basename(os.path.dirname(root))}"
+    return app
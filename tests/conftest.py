@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The launcher's modules live flat at the repo root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing launcher must not touch the real state dir or start archiving.
+os.environ.setdefault("LAUNCHER_STATE_DIR", tempfile.mkdtemp(prefix="launcher-test-"))
+os.environ.setdefault("LAUNCHER_ARCHIVE", "0")
+os.environ.setdefault("LAUNCHER_HISTORY", "0")
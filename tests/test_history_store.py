@@ -0,0 +1,112 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import history_store
+import launcher
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HistoryStore(str(tmp_path / "history.sqlite3"))
+    s.close()   # stop the writer thread; tests drive the rollup themselves
+    conn = history_store._connect(s.path)
+    yield s, conn
+    conn.close()
+
+
+def insert(conn, rows):
+    with conn:
+        conn.executemany("INSERT INTO samples VALUES (?,?,?,?,?,?)", rows)
+
+
+def minute_row(conn, service, bucket):
+    return conn.execute("SELECT n, up_n, lat_sum, lat_max FROM minute WHERE service = ? AND bucket = ?",
+                        (service, bucket)).fetchone()
+
+
+def test_late_samples_are_rolled_up(store):
+    s, conn = store
+    now = int(time.time())
+    m = now - now % 60 - 600          # a minute 10 minutes ago
+    insert(conn, [(m + 1, "api", 1, 10.0, 1.0, 100.0), (m + 2, "api", 1, 20.0, 1.0, 100.0)])
+    s._rollup(conn)
+    assert minute_row(conn, "api", m) == (2, 2, 30.0, 20.0)
+
+    # A batch that shows up after its minute was rolled up, out of order.
+    insert(conn, [(now, "api", 1, 5.0, 1.0, 100.0),
+                  (m + 30, "api", 0, 90.0, 1.0, 100.0),
+                  (m - 60, "api", 1, 7.0, 1.0, 100.0)])
+    s._rollup(conn)
+    assert minute_row(conn, "api", m) == (3, 2, 120.0, 90.0)
+    assert minute_row(conn, "api", m - 60) == (1, 1, 7.0, 7.0)
+    assert minute_row(conn, "api", now - now % 60) == (1, 1, 5.0, 5.0)
+
+    # Nothing new: a rollup leaves the counts alone.
+    s._rollup(conn)
+    assert minute_row(conn, "api", m) == (3, 2, 120.0, 90.0)
+
+
+def test_late_samples_reach_completed_hours(store):
+    s, conn = store
+    now = int(time.time())
+    h = now - now % 3600 - 7200      # a complete hour, two hours back
+    insert(conn, [(h + 10, "api", 1, 10.0, None, None)])
+    s._rollup(conn)
+    hour = lambda: conn.execute("SELECT n, up_n FROM hour WHERE service = 'api' AND bucket = ?",
+                                (h,)).fetchone()
+    assert hour() == (1, 1)
+    insert(conn, [(h + 1800, "api", 0, None, None, None)])
+    s._rollup(conn)
+    assert hour() == (2, 1)
+
+
+def test_rollup_mark_survives_retention(store, monkeypatch):
+    s, conn = store
+    now = int(time.time())
+    insert(conn, [(now - history_store.RAW_KEEP - 120, "api", 1, None, None, None)])
+    s._rollup(conn)                   # rolls it up, then retention deletes it
+    assert conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0] == 0
+    insert(conn, [(now, "api", 1, 3.0, None, None)])   # may reuse the deleted rowid
+    s._rollup(conn)
+    assert minute_row(conn, "api", now - now % 60) == (1, 1, 3.0, 3.0)
+
+
+def test_summary(store):
+    s, conn = store
+    now = int(time.time())
+    h = now - now % 3600 - 3 * 3600
+    insert(conn, [(h + i * 60, "api", int(i % 4 != 0), 10.0 * (i + 1), 50.0, 200.0) for i in range(8)])
+    insert(conn, [(now - 30, "api", 1, 40.0, 10.0, 100.0), (now - 30, "db", 0, None, None, None)])
+    with conn:
+        conn.executemany("INSERT INTO events VALUES (?,?,?,?)", [
+            (now - 100, "api", "start", None), (now - 90, "api", "exit", "code 1"),
+            (now - 80, "api", "start", None), (now - 10 * 86400, "api", "start", None)])
+    s._rollup(conn)
+
+    out = s.summary(days=7)
+    api, db = out["services"]["api"], out["services"]["db"]
+    assert api["samples"] == 9
+    assert api["uptime_pct"] == round(100 * 7 / 9, 2)
+    assert api["latency_max_ms"] == 80.0
+    assert api["latency_avg_ms"] == round((sum(10.0 * (i + 1) for i in range(8)) + 40.0) / 9, 1)
+    assert api["cpu_max"] == 50.0 and api["rss_max_mb"] == 200.0
+    assert (api["starts"], api["crashes"]) == (2, 1)
+    assert sum(d["samples"] for d in api["trend"]) == 9
+    assert db["uptime_pct"] == 0.0 and db["latency_avg_ms"] is None
+    assert list(s.summary("db", days=7)["services"]) == ["db"]
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/launcher/history", {"days": "nan"}),
+    ("/launcher/history", {"days": "-1"}),
+    ("/launcher/history", {"days": "1e9"}),
+    ("/launcher/history/api/series", {"hours": "nan"}),
+    ("/launcher/history/api/series", {"hours": "0"}),
+    ("/launcher/history/api/events", {"last": "-1"}),
+    ("/launcher/history/api/events", {"last": "0"}),
+])
+def test_history_routes_validate_params(path, params):
+    assert TestClient(launcher.app).get(path, params=params).status_code == 422
@@ -0,0 +1,77 @@
+import asyncio
+import socket
+
+import pytest
+
+import hub_stats
+from hub_stats import EventStats, HubTap, WINDOW_S
+
+socketio = pytest.importorskip("socketio")
+web = pytest.importorskip("aiohttp.web")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_recent_stays_bounded_without_snapshots():
+    st = EventStats()
+    for i in range(100_000):
+        st.record(i * 0.01, 10)   # 100 events/s for 1000s, never polled
+    assert len(st.recent) <= WINDOW_S + 1
+    snap = st.snapshot(1000.0)
+    assert snap["count"] == 100_000
+    assert snap["rate_per_s"] == pytest.approx(100, rel=0.05)
+
+
+async def _run_hub_standin(port: int, emits, ticks: int, interval_s: float):
+    sio = socketio.AsyncServer(async_mode="aiohttp")
+    app = web.Application()
+    sio.attach(app)
+    connected = asyncio.Event()
+
+    @sio.event
+    async def connect(sid, environ):
+        connected.set()
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+
+    tap = HubTap(f"http://127.0.0.1:{port}")
+    await tap.start()
+    try:
+        await asyncio.wait_for(connected.wait(), 10)
+        await asyncio.sleep(0.2)
+        for _ in range(ticks):
+            for event, payload in emits:
+                await sio.emit(event, payload)
+            await asyncio.sleep(interval_s)
+        for _ in range(50):
+            if sum(st.count for st in tap.events.values()) >= ticks * len(emits):
+                break
+            await asyncio.sleep(0.1)
+        return tap.snapshot()
+    finally:
+        await tap.stop()
+        await runner.cleanup()
+
+
+def test_tap_counts_events_from_hub_standin(monkeypatch):
+    monkeypatch.setattr(hub_stats, "RECONNECT_S", 0.2)
+    snap = asyncio.run(_run_hub_standin(free_port(), [
+        ("vision_context", {"text": "x" * 100}),
+        ("twitch_message", {"username": "a", "message": "hi"}),
+    ], ticks=20, interval_s=0.1))
+    assert snap["connected"]
+    vision = snap["events"]["vision_context"]
+    assert vision["count"] == 20
+    assert vision["bytes"] == 20 * len('{"text":"' + "x" * 100 + '"}')
+    assert snap["events"]["twitch_message"]["count"] == 20
+    # 20 events over ~2s.
+    assert vision["rate_per_s"] == pytest.approx(10, rel=0.25)
+    assert vision["typical_gap_s"] == pytest.approx(0.1, rel=0.5)
+    assert snap["total_rate_per_s"] == pytest.approx(20, rel=0.25)
+    assert not snap["bursting"] and not snap["silent"]
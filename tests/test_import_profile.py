@@ -0,0 +1,82 @@
+import sys
+
+from import_profile import ImportProfile, prewarm_targets
+
+# What `python -X importtime -c "import json, fake"` writes: children come
+# before their parent, nesting is two spaces per level.
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       210 |        210 |   _json
+import time:        90 |         90 |     re._constants
+import time:       150 |        240 |   re
+import time:       400 |        850 | json
+import time:        30 |         30 |     fake.inner
+import time:        20 |         50 |   fake.util
+import time:        70 |        120 | fake
+"""
+
+
+def fed(step=None):
+    prof = ImportProfile()
+    for line in IMPORTTIME.splitlines():
+        prof.feed(line, step)
+    return prof
+
+
+def test_feed_rebuilds_the_import_tree():
+    prof = fed()
+    assert prof.lines == 7
+    assert [r["module"] for r in prof.roots] == ["json", "fake"]
+    json_node = prof.roots[0]
+    assert (json_node["self_us"], json_node["cumulative_us"]) == (400, 850)
+    assert [c["module"] for c in json_node["children"]] == ["_json", "re"]
+    re_node = json_node["children"][1]
+    assert (re_node["self_us"], re_node["cumulative_us"]) == (150, 240)
+    assert [c["module"] for c in re_node["children"]] == ["re._constants"]
+    assert [c["module"] for c in prof.roots[1]["children"][0]["children"]] == ["fake.inner"]
+    assert not prof._pending
+
+
+def test_report_totals_and_slowest_self():
+    rep = fed().report(top=3)
+    assert rep["imports"] == 7
+    assert rep["total_ms"] == round((850 + 120) / 1000, 1)
+    assert [n["module"] for n in rep["tree"]] == ["json", "fake"]
+    assert [n["module"] for n in rep["slowest_self"]] == ["json", "_json", "re"]
+
+
+def test_steps_keep_separate_trees():
+    prof = ImportProfile()
+    lines = IMPORTTIME.splitlines()
+    # Interleave two processes' stderr: nothing should cross between them.
+    for a, b in zip(lines, lines):
+        prof.feed(a, "api")
+        prof.feed(b, "worker")
+    assert sorted((r["step"], r["module"]) for r in prof.roots) == [
+        ("api", "fake"), ("api", "json"), ("worker", "fake"), ("worker", "json")]
+    for root in prof.roots:
+        assert all(c["step"] == root["step"] for c in root["children"])
+
+
+def test_prewarm_targets_pick_python_steps(tmp_path):
+    pkg = tmp_path / "app"
+    pkg.mkdir()
+    script_dir = tmp_path / "scripts"
+    script_dir.mkdir()
+    defn = {"cwd": str(tmp_path), "steps": [
+        {"cmd": [sys.executable, "-m", "app.main"]},
+        {"cmd": [sys.executable, str(script_dir / "worker.py")]},
+        {"cmd": ["npm", "run", "dev"]},
+        {"cmd": [sys.executable, "-m", "app.other"]},      # same target, listed once
+        {"cmd": [sys.executable, str(tmp_path / "missing" / "x.py")]},
+    ]}
+    assert prewarm_targets(defn, "/nowhere") == [
+        (sys.executable, str(pkg)),
+        (sys.executable, str(script_dir)),
+    ]
+
+
+def test_prewarm_targets_single_cmd_falls_back_to_cwd(tmp_path):
+    defn = {"cmd": [sys.executable, "-m", "uvicorn", "main:app"]}
+    assert prewarm_targets(defn, str(tmp_path)) == [(sys.executable, str(tmp_path))]
+    assert prewarm_targets({"cmd": ["node", "server.js"]}, str(tmp_path)) == []
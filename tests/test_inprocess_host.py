@@ -0,0 +1,36 @@
+import sys
+import time
+
+import inprocess_host
+from inprocess_host import InProcessService
+
+
+def test_defs_with_env_are_not_eligible():
+    defn = {"cmd": [sys.executable, "main.py"], "port": 1, "env": {"FOO": "1"}}
+    assert inprocess_host.eligible(defn)
+    del defn["env"]
+    assert inprocess_host.eligible(defn) is None
+
+
+def test_sys_path_and_modules_are_restored_on_stop(tmp_path):
+    (tmp_path / "main.py").write_text(
+        "import asyncio\n"
+        "async def serve():\n"
+        "    print('up')\n"
+        "    await asyncio.sleep(3600)\n"
+    )
+    lines = []
+    defn = {"cmd": [sys.executable, str(tmp_path / "main.py")], "port": 1, "app": "main:serve"}
+    svc = InProcessService("pathsvc", defn, str(tmp_path), lines.append).start()
+    for _ in range(50):
+        if "up" in lines:
+            break
+        time.sleep(0.05)
+    assert "up" in lines
+    assert str(tmp_path) in sys.path
+
+    svc.terminate()
+    assert svc.wait(5) == 0
+    assert str(tmp_path) not in sys.path
+    assert not [m for m in sys.modules if m.startswith("_inproc_pathsvc_")]
+    assert "pathsvc" not in inprocess_host._owned_modules
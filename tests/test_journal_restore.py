@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+import launcher
+import state_journal
+
+
+@pytest.fixture
+def fresh_live_state(monkeypatch, tmp_path):
+    monkeypatch.setattr(launcher, "JOURNAL_PATH", str(tmp_path / "journal.json"))
+    monkeypatch.setattr(launcher, "_live_state", dict(launcher._live_state))
+    monkeypatch.setattr(launcher, "_last_journal", None)
+    return tmp_path
+
+
+def test_old_journal_does_not_fire_offline_safety(fresh_live_state, monkeypatch):
+    # A journal written hours ago, with the safety timer armed but not fired.
+    state_journal.save(launcher.JOURNAL_PATH, {
+        "detached": False,
+        "services": {},
+        "live_state": {
+            "auto_live": False, "override": True, "manual_live": True, "applied_live": True,
+            "armed_at": time.time() - 72000, "safety_fired": False, "prev_auto_live": False,
+        },
+    })
+    stopped = []
+
+    async def fake_stop(name):
+        stopped.append(name)
+        return {"ok": True}
+
+    monkeypatch.setattr(launcher, "stop_service", fake_stop)
+    monkeypatch.setattr(launcher, "_procs_alive", lambda name: True)
+
+    launcher._journal_restore()
+    asyncio.run(launcher._offline_safety_tick())
+    asyncio.run(launcher._offline_safety_tick())
+
+    assert stopped == []
+    assert launcher._live_state["override"] is True
+    assert launcher._live_state["manual_live"] is True
+    assert launcher._live_state["safety_fired"] is False
+    assert time.time() - launcher._live_state["armed_at"] < 5
+
+
+def test_journal_keeps_only_operator_choices(fresh_live_state):
+    launcher._live_state.update(override=True, manual_live=False, armed_at=123.0)
+    asyncio.run(launcher._journal_save())
+    assert state_journal.load(launcher.JOURNAL_PATH)["live_state"] == {"override": True, "manual_live": False}
+
+
+def test_other_nodes_services_are_not_adopted(fresh_live_state, monkeypatch):
+    monkeypatch.setitem(launcher.SERVICE_DEFS, "remote_svc",
+                        {"label": "Remote", "managed": True, "port": 1, "host": "gpu-box"})
+    monkeypatch.setitem(launcher._procs, "remote_svc", [])
+    me = {"pid": os.getpid(), "start_time": state_journal.process_start_time(os.getpid()),
+          "log_path": str(fresh_live_state / "remote.log")}
+    state_journal.save(launcher.JOURNAL_PATH, {"services": {"remote_svc": [me]}, "live_state": {}})
+
+    launcher._journal_restore()
+
+    assert launcher._procs["remote_svc"] == []
+
+
+def test_services_with_in_process_steps_are_not_journaled(fresh_live_state, monkeypatch):
+    class Real:
+        pid = os.getpid()
+
+        def poll(self):
+            return None
+
+    hosted = launcher.InProcessService("yh", {"port": 1}, ".", lambda line: None, target=object())
+    monkeypatch.setitem(launcher.SERVICE_DEFS, "yh", {"label": "YH", "managed": True, "port": 1})
+    monkeypatch.setitem(launcher._procs, "yh", [Real(), hosted])
+
+    asyncio.run(launcher._journal_save())
+
+    assert "yh" not in state_journal.load(launcher.JOURNAL_PATH)["services"]
+
+
+def test_adopted_poll_never_runs_the_start_time_check(monkeypatch):
+    def slow_check(pid, start_time):
+        raise AssertionError("same_process called from poll()")
+
+    monkeypatch.setattr(state_journal, "same_process", slow_check)
+    p = state_journal.AdoptedProcess(os.getpid(), time.time())
+    for _ in range(3):
+        assert p.poll() is None
+
+
+def test_verify_adopted_catches_pid_reuse(monkeypatch):
+    reused = state_journal.AdoptedProcess(os.getpid(), 0.0)   # wrong start time
+    mine = state_journal.AdoptedProcess(os.getpid(), state_journal.process_start_time(os.getpid()))
+    monkeypatch.setattr(launcher, "_procs", {"reused": [reused], "mine": [mine]})
+
+    assert launcher._verify_adopted() == 1
+    assert reused.poll() == -1
+    assert mine.poll() is None
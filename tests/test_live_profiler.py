@@ -0,0 +1,87 @@
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import live_profiler
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="needs Unix domain sockets")
+
+CHILD = """
+import time
+def spin_here():
+    while True:
+        sum(range(1000))
+        time.sleep(0)
+spin_here()
+"""
+
+
+@pytest.fixture
+def profiled_child(tmp_path, monkeypatch):
+    # Short path: AF_UNIX socket paths are length-limited.
+    sock_dir = f"/tmp/nami-prof-test-{os.getpid()}"
+    monkeypatch.setattr(live_profiler, "SOCKET_DIR", sock_dir)
+    env = dict(os.environ)
+    live_profiler.bootstrap_env(env, "spinner")
+    path = env["NAMI_PROFILER_SOCKET"]
+    proc = subprocess.Popen([sys.executable, "-c", CHILD], env=env)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(path):
+            assert proc.poll() is None, "child exited before opening its profiler socket"
+            assert time.monotonic() < deadline, "profiler socket never appeared"
+            time.sleep(0.05)
+        yield path
+    finally:
+        proc.kill()
+        proc.wait()
+        try:
+            os.unlink(path)
+            os.rmdir(sock_dir)
+        except OSError:
+            pass
+
+
+def test_bootstrapped_child_returns_folded_profile(profiled_child):
+    result = asyncio.run(live_profiler.request_profile(profiled_child, 0.5, 0.005))
+    assert result["ok"] and result["samples"] > 0
+    folded = live_profiler.collapsed(result)
+    assert folded.strip()
+    for line in folded.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("thread:") and int(count) > 0
+    assert "spin_here (<string>:" in folded
+
+
+def test_bootstrap_rejects_bad_params(profiled_child):
+    for seconds, interval in ((float("nan"), 0.01), (-1, 0.01), (1, 0), (1, float("inf"))):
+        reply = asyncio.run(live_profiler._call(
+            profiled_child, {"cmd": "profile", "seconds": seconds, "interval": interval}, 5.0))
+        assert reply["ok"] is False and "seconds" in reply["reason"]
+
+
+@pytest.mark.parametrize("seconds,interval", [
+    (math.nan, 0.01), (-1, 0.01), (0, 0.01), (1e9, 0.01),
+    (1, math.nan), (1, -0.01), (1, 0), (1, math.inf),
+])
+def test_request_profile_checks_params(seconds, interval):
+    with pytest.raises(ValueError):
+        live_profiler.check_params(seconds, interval)
+
+
+@pytest.mark.parametrize("params", [
+    {"seconds": "nan"}, {"seconds": "-1"}, {"seconds": "0"}, {"seconds": "1e9"},
+    {"interval": "nan"}, {"interval": "-0.01"}, {"interval": "inf"},
+])
+def test_profile_route_rejects_bad_params(params):
+    from fastapi.testclient import TestClient
+
+    import launcher
+    name = next(iter(launcher.SERVICE_DEFS))
+    r = TestClient(launcher.app).get(f"/launcher/services/{name}/profile", params=params)
+    assert r.status_code == 422
@@ -0,0 +1,31 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import launcher
+
+
+@pytest.mark.parametrize("body", [
+    {"rate": 0},
+    {"rate": -5},
+    {"speed": 0},
+    {"duration_s": 0},
+    {"burst": {"every_s": 0, "size": 10, "rate": 5}},
+    {"burst": {"every_s": -1, "size": 10, "rate": 5}},
+    {"burst": {"every_s": 30, "size": 0, "rate": 5}},
+    {"burst": {"every_s": 30, "size": 10, "rate": 0}},
+    {"burst": {"every_s": 30, "size": 10}},
+])
+def test_bad_loadgen_params_are_rejected(body, monkeypatch):
+    monkeypatch.setattr(launcher, "_replay", None)
+    r = TestClient(launcher.app).post("/launcher/loadgen/start", json=body)
+    assert r.status_code == 400
+    assert launcher._replay is None
+
+
+@pytest.mark.parametrize("value", ["NaN", "Infinity"])
+def test_non_finite_rate_is_rejected(value, monkeypatch):
+    monkeypatch.setattr(launcher, "_replay", None)
+    r = TestClient(launcher.app).post("/launcher/loadgen/start", content=f'{{"rate": {value}}}',
+                                      headers={"content-type": "application/json"})
+    assert r.status_code in (400, 422)
+    assert launcher._replay is None
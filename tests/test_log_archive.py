@@ -0,0 +1,66 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import log_archive
+from log_archive import SessionArchive, find_archive, iter_raw, iter_slice
+
+
+def records(n, t0=1000.0):
+    return [{"seq": i, "ts": t0 + i, "level": "info", "message": f"line {i}"} for i in range(n)]
+
+
+def archive_of(tmp_path, recs, codec=None):
+    arc = SessionArchive(str(tmp_path), codec=codec)
+    for r in recs:
+        arc.submit("svc", r)
+    arc.close()
+    return find_archive(str(tmp_path), arc.session_id, "svc")
+
+
+def read(chunks):
+    return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+
+def test_round_trip(tmp_path):
+    recs = records(50)
+    path = archive_of(tmp_path, recs)
+    assert read(iter_slice(path)) == recs
+
+
+def test_slice_across_chunk_boundary(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_archive, "CHUNK_BYTES", 400)   # a few records per chunk
+    recs = records(40)
+    path = archive_of(tmp_path, recs)
+    with open(path.rsplit(".jsonl.", 1)[0] + ".idx") as f:
+        chunks = [json.loads(l) for l in f]
+    assert len(chunks) > 3
+    # A window starting inside the first chunk and ending inside a later one.
+    lo, hi = chunks[0]["t1"] - 1, chunks[2]["t0"] + 1
+    got = read(iter_slice(path, lo, hi))
+    assert got == [r for r in recs if lo <= r["ts"] <= hi]
+    assert len({c["off"] for c in chunks}) == len(chunks)
+
+
+def test_gzip_when_zstd_missing(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_archive, "zstandard", None)
+    recs = records(10)
+    path = archive_of(tmp_path, recs)
+    assert path.endswith(".jsonl.gz")
+    # The file is a plain multi-member gzip stream.
+    assert [json.loads(l) for l in gzip.decompress(b"".join(iter_raw(path))).splitlines()] == recs
+    assert read(iter_slice(path)) == recs
+
+
+def test_failed_write_drops_the_chunk(tmp_path, monkeypatch):
+    arc = SessionArchive(str(tmp_path))
+    data_path, _ = arc._paths("svc")
+    os.makedirs(data_path)            # opening it for append now fails
+    for r in records(5):
+        arc.submit("svc", r)
+    arc.flush()
+    assert arc.lost == 5
+    assert arc._pending["svc"].n == 0 and arc._pending["svc"].parts == []
+    arc.close()
@@ -0,0 +1,92 @@
+import pytest
+
+from log_store import ServiceLog
+
+
+def level_of(line: str) -> str:
+    return ServiceLog().append(line).level
+
+
+@pytest.mark.parametrize("line", [
+    "No exception handler configured",
+    "Exception count: 0",
+    "Handled 3 exceptions in total",
+    "ErrorBoundary mounted",
+])
+def test_prose_mentioning_exceptions_is_info(line):
+    assert level_of(line) == "info"
+
+
+@pytest.mark.parametrize("line", [
+    "ValueError: bad value",
+    "requests.exceptions.ConnectionError: refused",
+    "RuntimeException: boom",
+    "Exception in thread worker-1:",
+    "ERROR:    Exception in ASGI application",
+    "❌ failed to bind",
+])
+def test_error_shapes(line):
+    assert level_of(line) == "error"
+
+
+@pytest.mark.parametrize("line", [
+    "warning: config file missing",
+    "Warning: deprecated flag",
+    "WARNING:root:slow",
+    "/x.py:3: DeprecationWarning: use y",
+    "⚠️  retrying",
+])
+def test_warn_is_case_insensitive(line):
+    assert level_of(line) == "warn"
+
+
+def test_traceback_lines_are_errors():
+    log = ServiceLog()
+    lines = ["Traceback (most recent call last):", '  File "x.py", line 1, in <module>',
+             "KeyError: 'a'", "back to normal"]
+    assert [log.append(l).level for l in lines] == ["error", "error", "error", "info"]
+
+
+def test_reads_preview_pending_repeats_without_storing_them():
+    sunk = []
+    log = ServiceLog(sink=sunk.append)
+    first = log.append("polling...")
+    for _ in range(4):
+        assert log.append("polling...") is None
+    for _ in range(3):   # polling must not commit the run
+        assert [r.message for r in log.query()] == ["polling...", "↻ repeated ×4: polling..."]
+        assert [r.message for r in log.window()] == ["polling...", "↻ repeated ×4: polling..."]
+        assert log.since(first.seq) == []
+    assert [r.message for r in sunk] == ["polling..."]
+    assert log.last_seq == first.seq
+
+    log.append("polling...")
+    assert log.query(min_level="info", contains="repeated")[-1].message == "↻ repeated ×5: polling..."
+    log.append("done")
+    # The run ended: one stored record with the final count, then the new line.
+    assert [r.message for r in log.since(first.seq)] == ["↻ repeated ×5: polling...", "done"]
+    assert [r.message for r in sunk] == ["polling...", "↻ repeated ×5: polling...", "done"]
+    assert [r.message for r in log.query()] == ["polling...", "↻ repeated ×5: polling...", "done"]
+
+
+def test_window_preview_respects_bounds():
+    log = ServiceLog()
+    first = log.append("tick")
+    log.append("tick")
+    assert [r.message for r in log.window(mono_to=first.mono + 1)] == ["tick"]
+    assert [r.message for r in log.window(mono_from=first.mono + 1)] == ["↻ repeated ×1: tick"]
+
+
+def test_periodic_flush_only_reports_stale_runs(monkeypatch):
+    import log_store
+    clock = [1000.0]
+    monkeypatch.setattr(log_store.time, "monotonic", lambda: clock[0])
+    sunk = []
+    log = ServiceLog(sink=sunk.append)
+    log.append("tick")
+    log.append("tick")
+    log.flush(min_age_s=log_store.REPEAT_FLUSH_S)
+    assert [r.message for r in sunk] == ["tick"]
+    clock[0] += log_store.REPEAT_FLUSH_S
+    log.flush(min_age_s=log_store.REPEAT_FLUSH_S)
+    assert [r.message for r in sunk] == ["tick", "↻ repeated ×1: tick"]
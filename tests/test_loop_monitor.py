@@ -0,0 +1,29 @@
+import asyncio
+import threading
+import time
+
+from loop_monitor import LoopLagMonitor
+
+
+def test_only_the_monitored_loop_is_timed():
+    def block_other_loop():
+        async def stall():
+            time.sleep(0.15)
+        asyncio.run(stall())
+
+    async def main():
+        monitor = LoopLagMonitor(interval_s=0.05, slow_ms=100)
+        monitor.start()
+        try:
+            other = threading.Thread(target=block_other_loop)
+            other.start()
+            await asyncio.to_thread(other.join)
+            assert list(monitor.slow) == []
+
+            time.sleep(0.15)        # stall the monitored loop itself
+            await asyncio.sleep(0)
+            assert [s["callback"] for s in monitor.slow]
+        finally:
+            monitor.stop()
+
+    asyncio.run(main())
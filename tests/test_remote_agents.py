@@ -0,0 +1,124 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import sys
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
+
+import launcher
+from remote_agents import AgentLink, AgentPool, AgentRejected, AgentUnavailable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def asgi_link(node: str, app) -> AgentLink:
+    link = AgentLink(node, "http://agent")
+    link.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://agent")
+    return link
+
+
+# ── AgentLink error mapping ───────────────────────────────────────────────────
+
+fake_agent = FastAPI()
+
+
+@fake_agent.get("/conflict")
+async def conflict():
+    raise HTTPException(409, "already_starting")
+
+
+@fake_agent.get("/boom")
+async def boom():
+    raise HTTPException(500, "kaput")
+
+
+@fake_agent.get("/text")
+async def text():
+    return PlainTextResponse("not json")
+
+
+def test_agent_errors_are_mapped():
+    async def run():
+        link = asgi_link("gpu", fake_agent)
+        with pytest.raises(AgentRejected) as e:
+            await link.request("GET", "/conflict")
+        assert (e.value.status, e.value.detail) == (409, "already_starting")
+        with pytest.raises(AgentUnavailable) as e:
+            await link.request("GET", "/boom")
+        assert e.value.status == 502 and not isinstance(e.value, AgentRejected)
+        with pytest.raises(AgentUnavailable, match="not json"):
+            await link.request("GET", "/text")
+        await link.close()
+    asyncio.run(run())
+
+
+# ── Primary + agent ───────────────────────────────────────────────────────────
+
+SERVER = "import socket, sys, time; s = socket.socket(); s.bind(('127.0.0.1', int(sys.argv[1]))); " \
+         "s.listen(); print('listening', flush=True); time.sleep(60)"
+
+
+@pytest.fixture
+def two_launchers(monkeypatch, tmp_path):
+    port = free_port()
+    defn = {"label": "Remote Echo", "managed": True, "host": "gpu-box", "port": port,
+            "health_check": "tcp", "cmd": [sys.executable, "-c", SERVER, str(port)],
+            "no_entry_check": True}
+    monkeypatch.setitem(launcher.SERVICE_DEFS, "remote_echo", defn)
+    monkeypatch.setitem(launcher._procs, "remote_echo", [])
+    monkeypatch.setitem(launcher._logs, "remote_echo", launcher._new_log("remote_echo"))
+
+    # A second, independent copy of the launcher module acting as the agent.
+    monkeypatch.setenv("LAUNCHER_ROLE", "agent")
+    monkeypatch.setenv("LAUNCHER_NODE", "gpu-box")
+    monkeypatch.setenv("LAUNCHER_STATE_DIR", str(tmp_path / "agent"))
+    spec = importlib.util.spec_from_file_location("launcher_agent", os.path.join(ROOT, "launcher.py"))
+    agent = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(agent)
+
+    async def no_journal():
+        pass
+    monkeypatch.setattr(agent, "_journal_save", no_journal)
+    pool = AgentPool({})
+    pool.links["gpu-box"] = asgi_link("gpu-box", agent.app)
+    monkeypatch.setattr(launcher, "_agents", pool)
+    yield agent
+    for p in agent._procs.get("remote_echo", []):
+        p.kill()
+
+
+def test_primary_proxies_start_status_and_logs(two_launchers):
+    agent = two_launchers
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=launcher.app),
+                                     base_url="http://primary") as c:
+            r = await c.post("/launcher/services/remote_echo/start")
+            assert r.status_code == 200 and r.json()["ok"], r.text
+            assert agent._procs["remote_echo"] and launcher._procs["remote_echo"] == []
+
+            r = await c.post("/launcher/services/remote_echo/start")
+            assert r.json() == {"ok": False, "reason": "already_running"}
+
+            services = {s["id"]: s for s in (await c.get("/launcher/services")).json()}
+            assert services["remote_echo"]["status"] == "online"
+
+            r = await c.get("/launcher/services/remote_echo/logs")
+            assert r.status_code == 200
+            assert any("listening" in line for line in r.json()["lines"])
+
+            r = await c.post("/launcher/services/remote_echo/stop")
+            assert r.json()["ok"]
+            assert not agent._procs_alive("remote_echo")
+        await launcher._agents.close()
+    asyncio.run(run())
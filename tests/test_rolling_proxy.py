@@ -0,0 +1,138 @@
+import asyncio
+import socket
+import sys
+
+import pytest
+
+import launcher
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def port_is_free(port: int) -> bool:
+    # Like a server would bind it — TIME_WAIT leftovers don't count.
+    with socket.socket() as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            s.bind(("0.0.0.0", port))
+            return True
+        except OSError:
+            return False
+
+
+@pytest.fixture
+def rolling_def(monkeypatch):
+    public, blue, green = free_port(), free_port(), free_port()
+    monkeypatch.setitem(launcher.SERVICE_DEFS, "flaky", {
+        "label": "Flaky", "managed": True, "port": public, "health_check": "tcp",
+        "cmd": [sys.executable, "-c", "import sys; sys.exit(3)", "{port}"],
+        "no_entry_check": True, "rolling": {"ports": [blue, green]},
+    })
+    monkeypatch.setitem(launcher.BOOT_RETRIES, "flaky", 4)
+    monkeypatch.setitem(launcher._procs, "flaky", [])
+    monkeypatch.setitem(launcher._logs, "flaky", launcher._new_log("flaky"))
+    async def no_journal():
+        pass
+    monkeypatch.setattr(launcher, "_journal_save", no_journal)
+    return public
+
+
+def test_failed_first_start_releases_public_port(rolling_def):
+    async def run():
+        result = await launcher.start_service("flaky")
+        assert not result["ok"]
+        assert "flaky" not in launcher._proxies
+        assert port_is_free(rolling_def)
+        assert not await launcher._health_check("flaky")
+    asyncio.run(run())
+
+
+def test_proxy_without_backend_is_unhealthy_and_stop_closes_it(rolling_def):
+    async def run():
+        await launcher._rolling_prepare("flaky")
+        assert not await launcher._health_check("flaky")
+        result = await launcher.stop_service("flaky")
+        assert result["reason"] == "not_running"
+        assert "flaky" not in launcher._proxies
+        assert port_is_free(rolling_def)
+    asyncio.run(run())
+
+
+# Each instance answers every connection with the backend port it runs on.
+WHOAMI = ("import socket, sys\n"
+          "port = int(sys.argv[1])\n"
+          "s = socket.socket(); s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)\n"
+          "s.bind(('127.0.0.1', port)); s.listen()\n"
+          "while True:\n"
+          "    c, _ = s.accept(); c.sendall(str(port).encode()); c.close()\n")
+
+
+@pytest.fixture
+def whoami_def(monkeypatch):
+    public, blue, green = free_port(), free_port(), free_port()
+    monkeypatch.setitem(launcher.SERVICE_DEFS, "whoami", {
+        "label": "WhoAmI", "managed": True, "port": public, "health_check": "tcp",
+        "cmd": [sys.executable, "-c", WHOAMI, "{port}"],
+        "no_entry_check": True, "rolling": {"ports": [blue, green]},
+    })
+    monkeypatch.setitem(launcher.BOOT_RETRIES, "whoami", 20)
+    monkeypatch.setitem(launcher._procs, "whoami", [])
+    monkeypatch.setitem(launcher._logs, "whoami", launcher._new_log("whoami"))
+    monkeypatch.setattr(launcher, "ROLLING_DRAIN_S", 2.0)
+
+    async def no_journal():
+        pass
+    monkeypatch.setattr(launcher, "_journal_save", no_journal)
+    yield public, blue, green
+    for p in launcher._procs.get("whoami", []):
+        p.kill()
+
+
+async def ask(port: int) -> int:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = await reader.read()
+    writer.close()
+    return int(data)
+
+
+def test_rolling_swap_serves_before_and_after(whoami_def):
+    public, blue, green = whoami_def
+
+    async def run():
+        assert (await launcher.start_service("whoami"))["ok"]
+        assert await ask(public) == blue
+        old = launcher._procs["whoami"][0]
+
+        result = await launcher.rolling_restart("whoami")
+        assert result["ok"] and result["active_port"] == green and result["drained"]
+        assert await ask(public) == green
+        assert old.poll() is not None
+        assert await launcher._health_check("whoami")
+
+        assert (await launcher.stop_service("whoami"))["ok"]
+        assert port_is_free(public)
+    asyncio.run(run())
+
+
+def test_stop_during_swap_is_refused(whoami_def):
+    public, blue, green = whoami_def
+
+    async def run():
+        assert (await launcher.start_service("whoami"))["ok"]
+        swap = asyncio.create_task(launcher.rolling_restart("whoami"))
+        while "whoami" not in launcher._swapping:
+            await asyncio.sleep(0.01)
+
+        assert await launcher.stop_service("whoami") == {"ok": False, "reason": "busy"}
+        assert await launcher.restart("whoami", mode="cold") == {"ok": False, "reason": "busy"}
+
+        assert (await swap)["ok"]
+        assert await ask(public) == green
+        assert (await launcher.stop_service("whoami"))["ok"]
+        assert "whoami" not in launcher._proxies
+        assert not launcher._procs_alive("whoami")
+    asyncio.run(run())
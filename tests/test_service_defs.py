@@ -0,0 +1,25 @@
+import sys
+
+from service_defs import validate_defs
+
+
+def rolling_def(**over):
+    d = {"label": "Mem", "port": 8009, "managed": True, "health_check": "tcp",
+         "cmd": [sys.executable, "-m", "uvicorn", "main:app", "--port", "{port}"],
+         "rolling": {"ports": [18009, 18109]}}
+    d.update(over)
+    return {"mem": d}
+
+
+def test_rolling_with_port_placeholder_is_valid():
+    assert validate_defs(rolling_def(), {}) == []
+
+
+def test_rolling_with_port_env_is_valid():
+    defs = rolling_def(cmd=[sys.executable, "main.py"], rolling={"ports": [18009, 18109], "port_env": "PORT"})
+    assert validate_defs(defs, {}) == []
+
+
+def test_rolling_without_backend_port_is_rejected():
+    errors = validate_defs(rolling_def(cmd=[sys.executable, "main.py"]), {})
+    assert any("rolling needs" in e for e in errors)
@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from span_collector import SpanCollector, parse_batch
+
+
+@pytest.mark.parametrize("body", [
+    b"t1 tts nan 2.0",
+    b"t1 tts 1.0 inf",
+    b'{"trace": "t1", "spans": [["tts", 1.0, Infinity]]}',
+    b'{"trace": "t1", "stage": "tts", "start": 1.0, "duration_ms": NaN}',
+])
+def test_non_finite_timestamps_are_rejected(body):
+    with pytest.raises(ValueError):
+        parse_batch(body)
+
+
+def test_recent_zero_or_negative_is_empty():
+    col = SpanCollector()
+    now = time.time()
+    col.add(parse_batch(f"t1 tts {now} {now + 0.1}\nt2 tts {now} {now + 0.2}".encode()))
+    assert len(col.recent(2)) == 2
+    assert col.recent(0) == []
+    assert col.recent(-1) == []
+
+
+def test_explicit_zero_window_is_not_all_windows():
+    assert list(SpanCollector().stats(window=0)["windows"]) == ["0s"]
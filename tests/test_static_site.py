@@ -0,0 +1,52 @@
+import sys
+
+import pytest
+
+pytest.importorskip("starlette")
+from starlette.testclient import TestClient
+
+import static_site
+
+BUILD_SCRIPT = """
+import os, shutil, sys
+out = os.path.join(sys.argv[sys.argv.index("--output-path") + 1], "browser")
+os.makedirs(out)
+shutil.copytree("public", out, dirs_exist_ok=True)
+open(os.path.join(out, "index.html"), "w").write("<html>" + "x" * 2000 + "</html>")
+open(os.path.join(out, "main-AB12CD34.js"), "w").write("console.log(1);" * 200)
+"""
+
+
+@pytest.fixture
+def site(tmp_path):
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "app.ts").write_text("export {}")
+    (project / "public").mkdir()
+    (project / "public" / "logo-horizontal.svg").write_text("<svg/>")
+    (project / "public" / "banner-ABCDEFGH.css").write_text("body{}")
+    (project / "build.py").write_text(BUILD_SCRIPT)
+    spec = {"build_cmd": [sys.executable, str(project / "build.py")], "inputs": ["src", "public"]}
+    root, built = static_site.ensure_build(str(project), spec, str(tmp_path / "cache"), lambda line: None)
+    assert built
+    return root
+
+
+def test_only_build_hashed_files_are_immutable(site):
+    c = TestClient(static_site.make_app(site, []))
+    assert "immutable" in c.get("/main-AB12CD34.js").headers["cache-control"]
+    for path in ("/logo-horizontal.svg", "/banner-ABCDEFGH.css", "/", "/some/route"):
+        r = c.get(path)
+        assert r.status_code == 200, path
+        assert r.headers["cache-control"] == "no-cache", path
+
+
+def test_build_bookkeeping_is_not_served(site):
+    c = TestClient(static_site.make_app(site, []))
+    assert c.get("/.immutable.json").status_code == 404
+
+
+def test_precompressed_variant_is_served(site):
+    r = TestClient(static_site.make_app(site, [])).get("/main-AB12CD34.js", headers={"accept-encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.text == "console.log(1);" * 200
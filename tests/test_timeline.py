@@ -0,0 +1,73 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import launcher
+from log_store import LogRecord, ServiceLog, merge_timeline
+
+
+def rec(seq, mono, msg):
+    return LogRecord(seq, mono / 1e9, mono, "00:00:00", "info", None, msg)
+
+
+def test_merge_interleaves_by_mono():
+    streams = {
+        "a": [rec(0, 10, "a0"), rec(1, 40, "a1"), rec(2, 70, "a2")],
+        "b": [rec(0, 20, "b0"), rec(1, 30, "b1"), rec(2, 80, "b2")],
+        "c": [rec(0, 5, "c0"), rec(1, 60, "c1")],
+        "d": [],
+    }
+    merged = [(n, r.message) for n, r in merge_timeline(streams)]
+    assert [m for _, m in merged] == ["c0", "a0", "b0", "b1", "a1", "c1", "a2", "b2"]
+    assert all(n == m[0] for n, m in merged)
+
+
+def test_merge_equal_timestamps_keep_stream_and_buffer_order():
+    streams = {
+        "a": [rec(0, 10, "a0"), rec(1, 10, "a1")],
+        "b": [rec(0, 10, "b0"), rec(1, 20, "b1")],
+    }
+    merged = [r.message for _, r in merge_timeline(streams)]
+    assert merged == ["a0", "a1", "b0", "b1"]
+    # Each service's own records never swap places.
+    for name in streams:
+        assert [m for m in merged if m[0] == name] == [r.message for r in streams[name]]
+
+
+def test_merge_is_lazy():
+    def endless():
+        mono = 0
+        while True:
+            mono += 1
+            yield rec(mono, mono, str(mono))
+
+    merged = merge_timeline({"a": endless(), "b": [rec(0, 3, "b")]})
+    assert [r.message for _, r in (next(merged) for _ in range(4))] == ["1", "2", "3", "b"]
+
+
+def test_window_and_since_are_in_mono_order():
+    log = ServiceLog()
+    recs = [log.append(f"line {i}") for i in range(50)]
+    monos = [r.mono for r in log.window()]
+    assert monos == sorted(monos) and len(monos) == 50
+    mid = recs[25].mono
+    assert [r.seq for r in log.window(mono_from=mid)] == list(range(25, 50))
+    assert [r.seq for r in log.window(mono_to=mid)] == list(range(25))
+    tail = log.since(recs[39].seq)
+    assert [r.seq for r in tail] == list(range(40, 50))
+    assert [r.mono for r in tail] == sorted(r.mono for r in tail)
+
+
+@pytest.mark.parametrize("limit", ["-1", "0", str(launcher.TIMELINE_MAX + 1)])
+def test_timeline_rejects_bad_limit(limit):
+    r = TestClient(launcher.app).get("/launcher/timeline", params={"limit": limit})
+    assert r.status_code == 422
+
+
+def test_timeline_limit_truncates():
+    name = launcher._local_services()[0]
+    for i in range(5):
+        launcher._logs[name].append(f"timeline test {i}")
+    r = TestClient(launcher.app).get("/launcher/timeline", params={"services": name, "limit": 2})
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body["records"]) == 2 and body["truncated"]